@@ -1,10 +1,9 @@
-import os
-
 import pandas as pd
 from requests import RequestException
 
 from compliance_track.validation import download_latest_dataset, get_sub_directories, get_exceeded_shape_dist
 from tools.constants import GTFS
+from tools.helpers import get_dataset_cache
 from tools.operations import get_sources
 
 pd.options.mode.chained_assignment = None
@@ -46,7 +45,7 @@ if __name__ == '__main__':
             rule_2_results = pd.concat([rule_2_results, exceeded_max_dist], axis=0)
 
         # clean up
-        os.remove(dataset_path)
+        get_dataset_cache().release(dataset_path)
         print(mdb_id)
     with pd.ExcelWriter('details.xlsx', engine='xlsxwriter') as writer:
         rule_1_results.to_excel(writer, sheet_name=f'Subfolders Details', index=False)
@@ -2,11 +2,11 @@ import os
 
 import numpy as np
 import pandas as pd
-from requests import RequestException
 
 from compliance_track.constants import BEST_PRACTICES_RULES, GC_COPY_PATH, BAD_PRACTICES_RULES, VALIDATOR
-from compliance_track.validation import download_latest_dataset
+from compliance_track.validation import get_latest_dataset_arguments
 from tools.constants import GTFS
+from tools.helpers import download_datasets, get_dataset_cache
 from tools.operations import get_sources
 
 pd.options.mode.chained_assignment = None
@@ -61,6 +61,7 @@ if __name__ == '__main__':
     best_practice_results = init_results_container(BEST_PRACTICES_RULES)
     bad_practice_results = init_results_container(BAD_PRACTICES_RULES)
 
+    report_folder_paths = {}
     for data in dataset.values():
         mdb_id = data['mdb_source_id']
 
@@ -69,20 +70,22 @@ if __name__ == '__main__':
         if len(report_folder_path) != 1:
             continue
 
-        report_folder_path = report_folder_path[0]
+        report_folder_paths[mdb_id] = report_folder_path[0]
 
-        # retrieve data
-        try:
-            dataset_path = download_latest_dataset(data)
-        except RequestException as e:
+    # retrieve data, validating each dataset while the next ones download
+    latest_datasets = {mdb_id: get_latest_dataset_arguments(dataset[mdb_id]) for mdb_id in report_folder_paths}
+    dataset_cache = get_dataset_cache()
+    for mdb_id, dataset_path in download_datasets(latest_datasets, cache=dataset_cache):
+        if dataset_path is None:
             continue
+        report_folder_path = report_folder_paths[mdb_id]
 
         # validate compliance
         validate_practices(BEST_PRACTICES_RULES, best_practice_results)
         validate_practices(BAD_PRACTICES_RULES, bad_practice_results)
 
         # clean up
-        os.remove(dataset_path)
+        dataset_cache.release(dataset_path)
         print(mdb_id)
 
     # formatting and saving the results
@@ -4,11 +4,11 @@ from zipfile import ZipFile
 import pandas as pd
 
 from tools.constants import AUTHENTICATION_TYPE, API_KEY_PARAMETER_NAME, API_KEY_PARAMETER_VALUE
-from tools.helpers import download_dataset
+from tools.helpers import download_dataset, get_dataset_cache
 from update_gtfs_schedule_sources import has_extension_file
 
 
-def download_latest_dataset(data):
+def get_latest_dataset_arguments(data):
     urls = data['urls']
     latest_url = urls['latest']
 
@@ -21,9 +21,17 @@ def download_latest_dataset(data):
     if API_KEY_PARAMETER_VALUE in urls:
         api_key_parameter_value = urls[API_KEY_PARAMETER_VALUE]
 
+    return {
+        'url': latest_url,
+        'authentication_type': authentication_type,
+        'api_key_parameter_name': api_key_parameter_name,
+        'api_key_parameter_value': api_key_parameter_value,
+    }
+
+
+def download_latest_dataset(data):
     # retrieve data
-    return download_dataset(latest_url, authentication_type, api_key_parameter_name,
-                            api_key_parameter_value)
+    return download_dataset(**get_latest_dataset_arguments(data), cache=get_dataset_cache())
 
 
 def extension_file_has_columns(file_path, extension_file_name, columns):
@@ -0,0 +1,67 @@
+# Benchmark the serial and parallel loading of the catalog of sources.
+# The GTFS Schedule catalog is replicated into synthetic catalogs of 1x, 10x and 100x its size,
+# which are then aggregated serially, with a thread pool and with a process pool.
+# Run from the project root with: python -m scripts.benchmark_catalog_loading [SCALE ...] [--workers N]
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from tools.constants import GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT, MDB_SOURCE_ID, THREAD, PROCESS
+from tools.representations import Catalog, GtfsScheduleSource
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = [1, 10, 100]
+REPEATS = 3
+
+
+def create_synthetic_catalog(catalog_path, scale):
+    """
+    Create a synthetic catalog made of `scale` copies of the GTFS Schedule catalog, with unique ids.
+    """
+    source_path = os.path.join(ROOT, GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT)
+    sources = []
+    for file in sorted(os.listdir(source_path)):
+        with open(os.path.join(source_path, file), encoding="utf-8") as fp:
+            sources.append(json.load(fp))
+    mdb_source_id = 0
+    for copy in range(scale):
+        for source in sources:
+            mdb_source_id += 1
+            source[MDB_SOURCE_ID] = mdb_source_id
+            with open(os.path.join(catalog_path, f"source-{mdb_source_id}.json"), "w", encoding="utf-8") as fp:
+                json.dump(source, fp, indent=4, ensure_ascii=False)
+    return mdb_source_id
+
+
+def measure(catalog_path, **kwargs):
+    """
+    Return the best time out of REPEATS aggregations of the catalog.
+    """
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        Catalog.aggregate(catalog_path=catalog_path, id_key=MDB_SOURCE_ID, entity_cls=GtfsScheduleSource, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the serial and parallel loading of the catalog.")
+    parser.add_argument("scales", nargs="*", type=int, default=SCALES)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'sources':>8} {'serial':>9} {'threads':>9} {'processes':>10}")
+    for scale in args.scales:
+        catalog_path = tempfile.mkdtemp()
+        try:
+            count = create_synthetic_catalog(catalog_path, scale)
+            serial = measure(catalog_path)
+            threads = measure(catalog_path, max_workers=args.workers, executor=THREAD)
+            processes = measure(catalog_path, max_workers=args.workers, executor=PROCESS)
+            print(f"{scale:>5}x {count:>8} {serial:>8.2f}s {threads:>8.2f}s {processes:>9.2f}s")
+        finally:
+            shutil.rmtree(catalog_path)
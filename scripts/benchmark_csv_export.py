@@ -0,0 +1,124 @@
+# Benchmark the CSV export of the catalog of sources.
+# The previous export, which re-read the catalog files and normalized them with pandas, is compared with
+# the columnar export of the loaded catalogs, in time and in peak memory, and both outputs are compared.
+# Run from the project root with: python -m scripts.benchmark_csv_export [--repeats N]
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from tools.constants import (
+    GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT,
+    GTFS_REALTIME_CATALOG_PATH_FROM_ROOT,
+    CSV_COLUMNS,
+    GTFS_RT,
+    MDB_SOURCE_ID,
+    DATA_TYPE,
+    LOCATION,
+    COUNTRY_CODE,
+    SUBDIVISION_NAME,
+    MUNICIPALITY,
+    STATIC_REFERENCE,
+    ENTITY_TYPE,
+    UNKNOWN,
+    FEATURES,
+    REDIRECTS,
+    REDIRECTS_ID,
+    REDIRECTS_COMMENT,
+    URLS_AUTHENTICATION_TYPE,
+)
+from tools.representations import GtfsScheduleSourcesCatalog, GtfsRealtimeSourcesCatalog
+from tools.operations import export_to_csv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPEATS = 5
+
+
+def previous_export(path):
+    """
+    Export the catalog of sources as the previous scripts/export_to_csv.py did.
+    """
+    catalog = {}
+    for catalog_path in [GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT, GTFS_REALTIME_CATALOG_PATH_FROM_ROOT]:
+        for dir_path, sub_dirs, files in os.walk(os.path.join(ROOT, catalog_path)):
+            for file in files:
+                with open(os.path.join(dir_path, file)) as fp:
+                    entity_json = json.load(fp)
+                    catalog[entity_json[MDB_SOURCE_ID]] = entity_json
+    for source_id, source in catalog.items():
+        if source.get(DATA_TYPE) == GTFS_RT:
+            if len(source.get(STATIC_REFERENCE, [])) > 0:
+                if catalog.get(source.get(STATIC_REFERENCE)[0], {}).get(LOCATION) is not None:
+                    source[LOCATION] = catalog.get(source.get(STATIC_REFERENCE)[0], {}).get(LOCATION)
+                source[STATIC_REFERENCE] = "|".join([str(ref_id) for ref_id in source.get(STATIC_REFERENCE)])
+            else:
+                source[LOCATION] = {COUNTRY_CODE: UNKNOWN, SUBDIVISION_NAME: UNKNOWN, MUNICIPALITY: UNKNOWN}
+            source[ENTITY_TYPE] = "|".join(source.get(ENTITY_TYPE))
+        if len(source.get(FEATURES, [])) > 0:
+            source[FEATURES] = "|".join(source.get(FEATURES))
+        redirects = source.pop(REDIRECTS, [])
+        source[REDIRECTS_ID] = "|".join([str(item["id"]) for item in redirects])
+        source[REDIRECTS_COMMENT] = "|".join([item.get("comment", "") for item in redirects])
+        for key in source.keys():
+            if isinstance(source[key], str):
+                source[key] = source[key].strip()
+    catalog = pd.json_normalize(list(dict(sorted(catalog.items())).values()))
+    tmp = pd.DataFrame()
+    for column in CSV_COLUMNS:
+        tmp[column] = catalog[column] if column in catalog else None
+    tmp[URLS_AUTHENTICATION_TYPE] = tmp[URLS_AUTHENTICATION_TYPE].astype("Int64")
+    tmp.to_csv(path, sep=",", index=False)
+
+
+def columnar_export(path):
+    """
+    Export the catalog of sources with the columnar export of the loaded catalogs.
+    """
+    export_to_csv(path=path, columns=CSV_COLUMNS)
+
+
+def measure(export, path, repeats):
+    """
+    Return the best time out of `repeats` exports, and the peak memory traced during one export.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        export(path)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    export(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the CSV export of the catalog of sources.")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    GtfsScheduleSourcesCatalog()
+    GtfsRealtimeSourcesCatalog()
+    loading = time.perf_counter() - start
+
+    output_path = tempfile.mkdtemp()
+    try:
+        previous_path = os.path.join(output_path, "previous.csv")
+        columnar_path = os.path.join(output_path, "columnar.csv")
+        previous, previous_peak = measure(previous_export, previous_path, args.repeats)
+        columnar, columnar_peak = measure(columnar_export, columnar_path, args.repeats)
+        print(f"{'export':<10} {'time':>8} {'peak memory':>12}")
+        print(f"{'previous':<10} {previous:>7.3f}s {previous_peak / 2 ** 20:>10.1f}MB")
+        print(f"{'columnar':<10} {columnar:>7.3f}s {columnar_peak / 2 ** 20:>10.1f}MB")
+        print(f"The catalogs were loaded once in {loading:.3f}s for the columnar export.")
+        print(f"Identical outputs: {filecmp.cmp(previous_path, columnar_path, shallow=False)}")
+    finally:
+        shutil.rmtree(output_path)
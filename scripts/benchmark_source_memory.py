@@ -0,0 +1,66 @@
+# Benchmark the memory footprint of the sources kept alive by the catalogs.
+# The GTFS Schedule and GTFS Realtime catalogs are parsed into sources 1x and 100x,
+# and the memory retained by the sources is traced with tracemalloc.
+# Run from the project root with: python -m scripts.benchmark_source_memory [SCALE ...]
+import argparse
+import gc
+import json
+import os
+import tracemalloc
+
+from tools.constants import (
+    GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT,
+    GTFS_REALTIME_CATALOG_PATH_FROM_ROOT,
+)
+from tools.representations import GtfsScheduleSource, GtfsRealtimeSource
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCALES = [1, 100]
+CATALOGS = [
+    (GTFS_SCHEDULE_CATALOG_PATH_FROM_ROOT, GtfsScheduleSource),
+    (GTFS_REALTIME_CATALOG_PATH_FROM_ROOT, GtfsRealtimeSource),
+]
+
+
+def read_catalog(catalog_path):
+    """
+    Return the (filename, raw JSON text) of every source of the catalog.
+    """
+    contents = []
+    for file in sorted(os.listdir(catalog_path)):
+        with open(os.path.join(catalog_path, file), encoding="utf-8") as fp:
+            contents.append((file, fp.read()))
+    return contents
+
+
+def measure(contents, entity_cls, scale):
+    """
+    Return the number of sources and the bytes they retain once the parsed JSON is released.
+    """
+    gc.collect()
+    tracemalloc.start()
+    sources = [
+        entity_cls(filename=file, **json.loads(content))
+        for _ in range(scale)
+        for file, content in contents
+    ]
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(sources), retained
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the memory footprint of the sources.")
+    parser.add_argument("scales", nargs="*", type=int, default=SCALES)
+    args = parser.parse_args()
+
+    print(f"{'catalog':<14} {'scale':>6} {'sources':>8} {'total':>10} {'per source':>11}")
+    for catalog_path, entity_cls in CATALOGS:
+        contents = read_catalog(os.path.join(ROOT, catalog_path))
+        for scale in args.scales:
+            count, retained = measure(contents, entity_cls, scale)
+            print(
+                f"{entity_cls.__name__[:-6]:<14} {scale:>5}x {count:>8} "
+                f"{retained / 2 ** 20:>8.1f}MB {retained / count:>10.0f}B"
+            )
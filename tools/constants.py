@@ -21,6 +21,7 @@ CALENDAR_TXT = "calendar.txt"
 
 # FILENAME TEMPLATE
 MDB_SOURCE_FILENAME = "{country_code}-{subdivision_name}-{provider}-{data_type}-{mdb_source_id}.{extension}"
+MDB_SOURCE_FILENAME_ID_PATTERN = r"-(\d+)\.json$"
 
 # ARCHIVES TEMPLATE
 MDB_ARCHIVES_LATEST_URL_TEMPLATE = (
@@ -36,6 +37,22 @@ UNKNOWN = "unknown"
 FILENAME = "filename"
 CATALOGS = "catalogs"
 ALL = "all"
+SNAPSHOT = "snapshot"
+SNAPSHOT_VERSION = 2
+VERSION = "version"
+FILES = "files"
+ENTITIES = "entities"
+MAX_WORKERS = "max_workers"
+EXECUTOR = "executor"
+THREAD = "thread"
+PROCESS = "process"
+LAZY = "lazy"
+CACHE_SIZE = "cache_size"
+RESULTS_CACHE_SIZE = 256
+HITS = "hits"
+MISSES = "misses"
+SIZE = "size"
+MAX_SIZE = "max_size"
 
 # CATALOG ROOTS
 SOURCE_CATALOG_PATH_FROM_ROOT = "catalogs/sources"
@@ -44,6 +61,10 @@ GTFS_REALTIME_CATALOG_PATH_FROM_ROOT = "catalogs/sources/gtfs/realtime"
 GTFS_SCHEDULE_CATALOG_PATH = "gtfs/schedule"
 GTFS_REALTIME_CATALOG_PATH = "gtfs/realtime"
 
+# CATALOG SNAPSHOTS
+GTFS_SCHEDULE_CATALOG_SNAPSHOT_PATH_FROM_ROOT = ".cache/catalogs/gtfs_schedule.pickle"
+GTFS_REALTIME_CATALOG_SNAPSHOT_PATH_FROM_ROOT = ".cache/catalogs/gtfs_realtime.pickle"
+
 # SCHEMAS FILES
 GTFS_SCHEDULE_SOURCE_SCHEMA_PATH_FROM_ROOT = "schemas/gtfs_schedule_source_schema.json"
 GTFS_REALTIME_SOURCE_SCHEMA_PATH_FROM_ROOT = "schemas/gtfs_realtime_source_schema.json"
@@ -58,12 +79,14 @@ COUNTRY_CODE = "country_code"
 SUBDIVISION_NAME = "subdivision_name"
 MUNICIPALITY = "municipality"
 BOUNDING_BOX = "bounding_box"
+BOUNDING_BOXES = "bounding_boxes"
 STATUS = "status"
 ACTIVE = "active"
 DEPRECATED = "deprecated"
 INACTIVE = "inactive"
 DEVELOPMENT = "development"
 FEATURES = "features"
+FEATURE = "feature"
 FARES_V2 = "fares-v2"
 FARES_V1 = "fares-v1"
 FLEX_V2 = "flex-v2"
@@ -92,6 +115,117 @@ REDIRECT_ID = "id"
 REDIRECT_COMMENT = "comment"
 IS_OFFICIAL = "is_official"
 IS_PRODUCER_URL_UNSTABLE = "is_producer_url_unstable"
+# EXPORT CONSTANTS
+EXPORT_CHUNK_SIZE = 1000
+LOCATION_COUNTRY_CODE = "location.country_code"
+LOCATION_SUBDIVISION_NAME = "location.subdivision_name"
+LOCATION_MUNICIPALITY = "location.municipality"
+LOCATION_MINIMUM_LATITUDE = "location.bounding_box.minimum_latitude"
+LOCATION_MAXIMUM_LATITUDE = "location.bounding_box.maximum_latitude"
+LOCATION_MINIMUM_LONGITUDE = "location.bounding_box.minimum_longitude"
+LOCATION_MAXIMUM_LONGITUDE = "location.bounding_box.maximum_longitude"
+LOCATION_EXTRACTED_ON = "location.bounding_box.extracted_on"
+URLS_DIRECT_DOWNLOAD = "urls.direct_download"
+URLS_AUTHENTICATION_TYPE = "urls.authentication_type"
+URLS_AUTHENTICATION_INFO = "urls.authentication_info"
+URLS_API_KEY_PARAMETER_NAME = "urls.api_key_parameter_name"
+URLS_LATEST = "urls.latest"
+URLS_LICENSE = "urls.license"
+REDIRECTS_ID = "redirect.id"
+REDIRECTS_COMMENT = "redirect.comment"
+CSV_COLUMNS = [
+    MDB_SOURCE_ID,
+    DATA_TYPE,
+    ENTITY_TYPE,
+    LOCATION_COUNTRY_CODE,
+    LOCATION_SUBDIVISION_NAME,
+    LOCATION_MUNICIPALITY,
+    PROVIDER,
+    IS_OFFICIAL,
+    IS_PRODUCER_URL_UNSTABLE,
+    NAME,
+    NOTE,
+    FEED_CONTACT_EMAIL,
+    STATIC_REFERENCE,
+    URLS_DIRECT_DOWNLOAD,
+    URLS_AUTHENTICATION_TYPE,
+    URLS_AUTHENTICATION_INFO,
+    URLS_API_KEY_PARAMETER_NAME,
+    URLS_LATEST,
+    URLS_LICENSE,
+    LOCATION_MINIMUM_LATITUDE,
+    LOCATION_MAXIMUM_LATITUDE,
+    LOCATION_MINIMUM_LONGITUDE,
+    LOCATION_MAXIMUM_LONGITUDE,
+    LOCATION_EXTRACTED_ON,
+    STATUS,
+    FEATURES,
+    REDIRECTS_ID,
+    REDIRECTS_COMMENT,
+]
+# The Arrow and Parquet exports keep the lists, and the redirects as a list of IDs and comments
+ARROW_COLUMNS = [
+    column for column in CSV_COLUMNS if column not in [REDIRECTS_ID, REDIRECTS_COMMENT]
+] + [REDIRECTS]
+EXPORT_LIST_COLUMNS = [ENTITY_TYPE, STATIC_REFERENCE, FEATURES]
+ARROW = "arrow"
+PARQUET = "parquet"
+# The other columns hold strings, or booleans for the flags
+CSV_COLUMN_TYPES = {
+    MDB_SOURCE_ID: "Int64",
+    URLS_AUTHENTICATION_TYPE: "Int64",
+    LOCATION_MINIMUM_LATITUDE: "float64",
+    LOCATION_MAXIMUM_LATITUDE: "float64",
+    LOCATION_MINIMUM_LONGITUDE: "float64",
+    LOCATION_MAXIMUM_LONGITUDE: "float64",
+}
+# The incremental CSV export keeps the hash and byte span of each row in a sidecar manifest
+CSV_MANIFEST_SUFFIX = ".manifest.json"
+CSV_MANIFEST_VERSION = 1
+# The rows of a previous export are only reused if the code of the export did not change since
+CSV_EXPORT_CODE_PATHS_FROM_ROOT = ["tools/constants.py", "tools/helpers.py", "tools/representations.py"]
+COLUMNS = "columns"
+DIGEST = "digest"
+CODE_DIGEST = "code_digest"
+ROWS = "rows"
+# The binary catalog holds the bounding boxes in fixed-width columns, and the repeated values in dictionaries
+BINARY_CATALOG_MAGIC = b"MDBCAT\x00\x00"
+BINARY_CATALOG_VERSION = 1
+# The magic, version, number of entities, and the offsets of the index, columns and fields with the size of the fields
+BINARY_CATALOG_HEADER_FORMAT = "<8sIIQQQQ"
+BINARY_CATALOG_HEADER_SIZE = 64
+BINARY_COLUMN_FIELDS = [
+    LOCATION_MINIMUM_LATITUDE,
+    LOCATION_MAXIMUM_LATITUDE,
+    LOCATION_MINIMUM_LONGITUDE,
+    LOCATION_MAXIMUM_LONGITUDE,
+]
+BINARY_DICTIONARY_FIELDS = [
+    DATA_TYPE,
+    PROVIDER,
+    NAME,
+    IS_OFFICIAL,
+    IS_PRODUCER_URL_UNSTABLE,
+    LOCATION_COUNTRY_CODE,
+    LOCATION_SUBDIVISION_NAME,
+    LOCATION_MUNICIPALITY,
+    URLS_AUTHENTICATION_TYPE,
+    URLS_AUTHENTICATION_INFO,
+    URLS_API_KEY_PARAMETER_NAME,
+    URLS_LICENSE,
+    FEED_CONTACT_EMAIL,
+    NOTE,
+    STATUS,
+    FEATURES,
+    ENTITY_TYPE,
+]
+FIELDS = "fields"
+DICTIONARIES = "dictionaries"
+
+# IMPORT CONSTANTS
+ADDED = "added"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
 
 # TIME CONSTANTS
 SIX_MONTHS_IN_WEEKS = 26
@@ -102,6 +236,37 @@ LOAD_FUNC = "load_func"
 ZIP = "zip"
 JSON = "json"
 
+# DOWNLOAD CONSTANTS
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# The downloads share one HTTP session, keeping a pool of connections per host
+HTTP_POOL_CONNECTIONS = 32
+HTTP_POOL_MAXSIZE = 16
+HTTP_RETRIES = 3
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_RETRY_STATUSES = [429, 500, 502, 503, 504]
+# The connect and read timeouts, in seconds
+HTTP_TIMEOUT = (10, 60)
+# The bulk downloads run in a pool of workers, with a few concurrent downloads per host at most
+DOWNLOAD_WORKERS = 16
+DOWNLOAD_WORKERS_PER_HOST = 2
+# The latest datasets are all served by the archives host, which is sized for all the workers at once
+DOWNLOAD_WORKERS_BY_HOST = {"storage.googleapis.com": DOWNLOAD_WORKERS}
+# The validators of the previous downloads, which make the next ones conditional
+DOWNLOAD_VALIDATORS_PATH_FROM_ROOT = ".cache/downloads/validators.json"
+ETAG = "etag"
+LAST_MODIFIED = "last_modified"
+SHA256 = "sha256"
+# The datasets downloaded by the tools are shared in a cache on disk, keyed by URL and content
+DATASET_CACHE_PATH_FROM_ROOT = ".cache/datasets"
+DATASET_CACHE_INDEX = "index.json"
+DATASET_CACHE_LOCK = "index.lock"
+DATASET_CACHE_OBJECTS = "objects"
+DATASET_CACHE_TMP = "tmp"
+# The cached datasets are fresh for 12 hours, and the least recently used ones are evicted past 4 GiB
+DATASET_CACHE_MAX_AGE = 12 * 60 * 60
+DATASET_CACHE_MAX_SIZE = 4 << 30
+DOWNLOADED_AT = "downloaded_at"
+
 #browser header
 FALLBACK_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
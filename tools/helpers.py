@@ -1,16 +1,47 @@
+import contextlib
 import datetime
+import functools
+import hashlib
+import inspect
 import json
+import mmap
 import os
+import pickle
+import queue
+import struct
+import sys
+import threading
+import time
 import uuid
+import warnings
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
 from urllib.parse import urlparse
 
 import gtfs_kit
+import numpy as np
 import pandas as pd
 import requests
 from pandas.errors import ParserError
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, HTTPError
+from urllib3.util.retry import Retry
 from unidecode import unidecode
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # The Arrow and Parquet exports are optional, the other functions do not need pyarrow
+    pa = None
+    pq = None
+
+try:
+    import fcntl
+except ImportError:
+    # The dataset cache is only locked between threads where file locks are not available
+    fcntl = None
+
 from tools.constants import (
     STOP_LAT,
     STOP_LON,
@@ -18,6 +49,72 @@ from tools.constants import (
     MDB_SOURCE_FILENAME,
     ZIP,
     FALLBACK_HEADERS,
+    HITS,
+    MISSES,
+    SIZE,
+    MAX_SIZE,
+    MDB_SOURCE_ID,
+    DATA_TYPE,
+    ENTITY_TYPE,
+    PROVIDER,
+    NAME,
+    NOTE,
+    FEED_CONTACT_EMAIL,
+    STATIC_REFERENCE,
+    STATUS,
+    FEATURES,
+    IS_OFFICIAL,
+    IS_PRODUCER_URL_UNSTABLE,
+    REDIRECTS,
+    REDIRECT_ID,
+    REDIRECT_COMMENT,
+    LOCATION_COUNTRY_CODE,
+    LOCATION_SUBDIVISION_NAME,
+    LOCATION_MUNICIPALITY,
+    LOCATION_MINIMUM_LATITUDE,
+    LOCATION_MAXIMUM_LATITUDE,
+    LOCATION_MINIMUM_LONGITUDE,
+    LOCATION_MAXIMUM_LONGITUDE,
+    LOCATION_EXTRACTED_ON,
+    URLS_DIRECT_DOWNLOAD,
+    URLS_AUTHENTICATION_TYPE,
+    URLS_AUTHENTICATION_INFO,
+    URLS_API_KEY_PARAMETER_NAME,
+    URLS_LATEST,
+    URLS_LICENSE,
+    REDIRECTS_ID,
+    REDIRECTS_COMMENT,
+    ARROW,
+    PARQUET,
+    BINARY_CATALOG_MAGIC,
+    BINARY_CATALOG_VERSION,
+    BINARY_CATALOG_HEADER_FORMAT,
+    BINARY_CATALOG_HEADER_SIZE,
+    BINARY_COLUMN_FIELDS,
+    BINARY_DICTIONARY_FIELDS,
+    FIELDS,
+    DICTIONARIES,
+    DOWNLOAD_CHUNK_SIZE,
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_RETRY_STATUSES,
+    HTTP_TIMEOUT,
+    DOWNLOAD_WORKERS,
+    DOWNLOAD_WORKERS_PER_HOST,
+    DOWNLOAD_WORKERS_BY_HOST,
+    ETAG,
+    LAST_MODIFIED,
+    SHA256,
+    DATASET_CACHE_PATH_FROM_ROOT,
+    DATASET_CACHE_INDEX,
+    DATASET_CACHE_LOCK,
+    DATASET_CACHE_OBJECTS,
+    DATASET_CACHE_TMP,
+    DATASET_CACHE_MAX_AGE,
+    DATASET_CACHE_MAX_SIZE,
+    DOWNLOADED_AT,
 )
 
 
@@ -26,19 +123,21 @@ from tools.constants import (
 #########################
 
 
-def to_json(path, obj):
+def to_json(path, obj, indent=4):
     """
     Saves a JSON object to the file with the given path.
 
     Args:
         path (str): The path to the file where the JSON object will be saved.
         obj (dict): The JSON compatible object to save.
+        indent (int, optional): The indentation of the JSON. Defaults to 4, None being the most compact.
 
     Returns:
         None
     """
+    # Unlike json.dump, json.dumps encodes the object in one go with the C encoder
     with open(path, "w") as fp:
-        json.dump(obj, fp, indent=4, ensure_ascii=False)
+        fp.write(json.dumps(obj, indent=indent, ensure_ascii=False))
 
 
 def from_json(path):
@@ -56,6 +155,44 @@ def from_json(path):
     return entity
 
 
+def to_snapshot(path, obj):
+    """
+    Saves an object to a binary snapshot file at the given path.
+
+    The snapshot is written to a temporary file first and then moved in place,
+    so a concurrent reader never sees a partially written snapshot.
+
+    Args:
+        path (str): The path to the file where the snapshot will be saved.
+        obj (object): The picklable object to save.
+
+    Returns:
+        None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    with open(tmp_path, "wb") as fp:
+        pickle.dump(obj, fp, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def from_snapshot(path):
+    """
+    Loads an object from the binary snapshot file at the given path.
+
+    Args:
+        path (str): The path to the file from which the snapshot will be loaded.
+
+    Returns:
+        object: The loaded object, or None if the snapshot is missing or unreadable.
+    """
+    try:
+        with open(path, "rb") as fp:
+            return pickle.load(fp)
+    except Exception:
+        return None
+
+
 def to_csv(path, catalog, columns):
     """
     Save a catalog to a CSV file.
@@ -77,6 +214,549 @@ def to_csv(path, catalog, columns):
     catalog.to_csv(path, sep=",", index=False)
 
 
+def to_csv_chunks(path, chunks):
+    """
+    Save a catalog to a CSV file, one chunk of rows at a time.
+
+    Only the chunk being written is kept in memory. The CSV is written to a temporary file first
+    and then moved in place, so a concurrent reader never sees a partially written file.
+
+    Args:
+        path (str): The path to the file where the CSV will be saved.
+        chunks (iterable): The chunks of the catalog to save, as DataFrames with the same columns.
+            The header is taken from the first chunk.
+
+    Returns:
+        int: The number of rows saved.
+    """
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    count = 0
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as fp:
+            for index, chunk in enumerate(chunks):
+                chunk.to_csv(fp, sep=",", index=False, header=index == 0)
+                count += len(chunk)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def get_csv_rows(chunk, header=False):
+    """
+    Render a chunk of a catalog into CSV rows, as written by `to_csv_chunks`.
+
+    A row ends with the first line break outside of a quoted value, so the values spanning
+    several lines stay in their row.
+
+    Args:
+        chunk (pandas.DataFrame): The chunk of the catalog to render.
+        header (bool, optional): Whether to render the header as the first row. Defaults to False.
+
+    Returns:
+        list: The CSV rows, each ending with its line break.
+    """
+    rows = []
+    lines = []
+    quotes = 0
+    for line in chunk.to_csv(None, sep=",", index=False, header=header).split("\n")[:-1]:
+        lines.append(line)
+        quotes += line.count('"')
+        # The quotes of a quoted value, escaped ones included, always come in pairs
+        if quotes % 2 == 0:
+            rows.append("\n".join(lines) + "\n")
+            lines = []
+            quotes = 0
+    return rows
+
+
+def to_csv_rows(path, rows, previous_path=None):
+    """
+    Save CSV rows to a file, copying the unchanged rows from the previous version of the file.
+
+    The consecutive rows copied from the previous file are read in one block. The CSV is written
+    to a temporary file first and then moved in place, so the previous file can be the same one.
+
+    Args:
+        path (str): The path to the file where the CSV will be saved.
+        rows (iterable): The rows to save, either as a string, or as the (offset, size) in bytes
+            of a row of the previous file.
+        previous_path (str, optional): The path to the previous file. Defaults to None.
+
+    Returns:
+        list: The (offset, size) in bytes of each row in the saved file.
+    """
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    previous_fp = open(previous_path, "rb") if previous_path is not None else None
+    spans = []
+    offset = 0
+    # The pending (offset, size) block of consecutive rows to copy from the previous file
+    block = None
+    try:
+        with open(tmp_path, "wb") as fp:
+            for row in rows:
+                if isinstance(row, str):
+                    if block is not None:
+                        previous_fp.seek(block[0])
+                        fp.write(previous_fp.read(block[1]))
+                        block = None
+                    data = row.encode("utf-8")
+                    fp.write(data)
+                    size = len(data)
+                else:
+                    size = row[1]
+                    if block is not None and block[0] + block[1] == row[0]:
+                        block = (block[0], block[1] + size)
+                    else:
+                        if block is not None:
+                            previous_fp.seek(block[0])
+                            fp.write(previous_fp.read(block[1]))
+                        block = (row[0], size)
+                spans.append((offset, size))
+                offset += size
+            if block is not None:
+                previous_fp.seek(block[0])
+                fp.write(previous_fp.read(block[1]))
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        if previous_fp is not None:
+            previous_fp.close()
+    os.replace(tmp_path, path)
+    return spans
+
+
+def get_file_digest(path):
+    """
+    Get the SHA-256 digest of a file, read in blocks.
+
+    Args:
+        path (str): The path to the file.
+
+    Returns:
+        str: The hexadecimal digest, or None if the file is missing or unreadable.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as fp:
+            for block in iter(functools.partial(fp.read, 1 << 16), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def get_json_digest(obj):
+    """
+    Get the SHA-256 digest of a JSON object, independent of the order of its keys.
+
+    Args:
+        obj (dict): The JSON compatible object.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    return hashlib.sha256(
+        json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def get_arrow_schema(columns):
+    """
+    Get the Arrow schema of the exported columns of a catalog of sources.
+
+    The lists are list columns, the redirects a list of (id, comment) structs, and the columns
+    with few distinct values, like the country codes or the status, are dictionary-encoded.
+
+    Args:
+        columns (list): The exported columns, in order.
+
+    Returns:
+        pyarrow.Schema: The schema of the exported columns.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required to export to Arrow or Parquet.")
+    category = pa.dictionary(pa.int32(), pa.string())
+    types = {
+        MDB_SOURCE_ID: pa.int64(),
+        DATA_TYPE: category,
+        ENTITY_TYPE: pa.list_(pa.string()),
+        LOCATION_COUNTRY_CODE: category,
+        LOCATION_SUBDIVISION_NAME: category,
+        LOCATION_MUNICIPALITY: category,
+        PROVIDER: pa.string(),
+        IS_OFFICIAL: pa.bool_(),
+        IS_PRODUCER_URL_UNSTABLE: pa.bool_(),
+        NAME: pa.string(),
+        NOTE: pa.string(),
+        FEED_CONTACT_EMAIL: pa.string(),
+        STATIC_REFERENCE: pa.list_(pa.string()),
+        URLS_DIRECT_DOWNLOAD: pa.string(),
+        URLS_AUTHENTICATION_TYPE: pa.int8(),
+        URLS_AUTHENTICATION_INFO: pa.string(),
+        URLS_API_KEY_PARAMETER_NAME: pa.string(),
+        URLS_LATEST: pa.string(),
+        URLS_LICENSE: pa.string(),
+        LOCATION_MINIMUM_LATITUDE: pa.float64(),
+        LOCATION_MAXIMUM_LATITUDE: pa.float64(),
+        LOCATION_MINIMUM_LONGITUDE: pa.float64(),
+        LOCATION_MAXIMUM_LONGITUDE: pa.float64(),
+        LOCATION_EXTRACTED_ON: pa.string(),
+        STATUS: category,
+        FEATURES: pa.list_(pa.string()),
+        REDIRECTS: pa.list_(
+            pa.struct([(REDIRECT_ID, pa.string()), (REDIRECT_COMMENT, pa.string())])
+        ),
+        REDIRECTS_ID: pa.string(),
+        REDIRECTS_COMMENT: pa.string(),
+    }
+    return pa.schema([(column, types[column]) for column in columns])
+
+
+def to_arrow_array(values, data_type, dictionary=None):
+    """
+    Converts a column of values to an Arrow array of the given type.
+
+    Args:
+        values (list): The values of the column.
+        data_type (pyarrow.DataType): The type of the array.
+        dictionary (dict, optional): For a dictionary-encoded column, the index of each value
+            of the dictionary, extended with the new values. It is shared by all the chunks
+            of a column, so each chunk only adds its new values to the dictionary.
+
+    Returns:
+        pyarrow.Array: The array of the values.
+    """
+    if pa.types.is_dictionary(data_type):
+        indices = [
+            dictionary.setdefault(value, len(dictionary)) if value is not None else None
+            for value in values
+        ]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=data_type.index_type),
+            pa.array(list(dictionary), type=data_type.value_type),
+        )
+    if data_type == pa.bool_():
+        # The flags are stored as "True" and "False" strings in the catalogs, which Arrow casts to booleans
+        return pa.array(
+            [str(value) if value is not None else None for value in values], type=pa.string()
+        ).cast(data_type)
+    return pa.array(values, type=data_type)
+
+
+def to_arrow_chunks(path, chunks, schema, file_format=ARROW):
+    """
+    Save a catalog to an Arrow or Parquet file, one record batch at a time.
+
+    The Arrow IPC file can be memory-mapped, and the Parquet file is written with one row group
+    per chunk. Both are written to a temporary file first and then moved in place.
+
+    Args:
+        path (str): The path to the file where the catalog will be saved.
+        chunks (iterable): The chunks of the catalog to save, as dictionaries of column values
+            keyed by the columns of the schema.
+        schema (pyarrow.Schema): The schema of the file, as returned by `get_arrow_schema`.
+        file_format (str, optional): ARROW or PARQUET. Defaults to ARROW.
+
+    Returns:
+        int: The number of rows saved.
+    """
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    count = 0
+    # The dictionaries only grow from a chunk to the next, so they are written as deltas
+    dictionaries = {field.name: {} for field in schema}
+    try:
+        if file_format == PARQUET:
+            writer = pq.ParquetWriter(tmp_path, schema)
+        else:
+            writer = pa.ipc.new_file(
+                tmp_path, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            )
+        with writer:
+            for chunk in chunks:
+                batch = pa.record_batch(
+                    [
+                        to_arrow_array(chunk[field.name], field.type, dictionaries[field.name])
+                        for field in schema
+                    ],
+                    schema=schema,
+                )
+                writer.write_batch(batch)
+                count += batch.num_rows
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return count
+
+
+def flatten_fields(obj, prefix=""):
+    """
+    Flatten the nested objects of a JSON object into dotted fields, in order.
+
+    Args:
+        obj (dict): The JSON object.
+        prefix (str, optional): The prefix of the fields. Defaults to "".
+
+    Returns:
+        list: The (dotted field, value) pairs, the lists and empty objects being values.
+    """
+    fields = []
+    for key, value in obj.items():
+        if isinstance(value, Mapping) and len(value) > 0:
+            fields.extend(flatten_fields(value, prefix=f"{prefix}{key}."))
+        else:
+            fields.append((f"{prefix}{key}", value))
+    return fields
+
+
+def unflatten_fields(fields):
+    """
+    Rebuild a JSON object from its dotted fields, as returned by `flatten_fields`.
+
+    Args:
+        fields (iterable): The (dotted field, value) pairs.
+
+    Returns:
+        dict: The JSON object.
+    """
+    obj = {}
+    for field, value in fields:
+        *keys, last_key = field.split(".")
+        parent = obj
+        for key in keys:
+            parent = parent.setdefault(key, {})
+        parent[last_key] = value
+    return obj
+
+
+def to_binary_catalog(path, entities):
+    """
+    Save a catalog to a single binary file, from which `BinaryCatalog` reads one entity at a time.
+
+    The file holds a header, the records of the entities, an index of their IDs and record offsets,
+    the bounding boxes in fixed-width columns, and the field names with a dictionary of the values
+    of each field in BINARY_DICTIONARY_FIELDS. A record is the compact JSON list of the field indices
+    of the entity, with their value, its index in the dictionary of the field, or nothing for the
+    columns. The records are written as they come, and the header last.
+
+    Args:
+        path (str): The path to the file where the catalog will be saved.
+        entities (iterable): The (ID, JSON object) pairs of the entities of the catalog.
+
+    Returns:
+        int: The number of entities saved.
+    """
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    fields = {}
+    dictionaries = {field: {} for field in BINARY_DICTIONARY_FIELDS}
+    columns = {field: [] for field in BINARY_COLUMN_FIELDS}
+    ids = []
+    offsets = [BINARY_CATALOG_HEADER_SIZE]
+    try:
+        with open(tmp_path, "wb") as fp:
+            fp.write(bytes(BINARY_CATALOG_HEADER_SIZE))
+            for entity_id, entity in entities:
+                record = []
+                column_values = dict.fromkeys(BINARY_COLUMN_FIELDS)
+                for field, value in flatten_fields(entity):
+                    field_index = fields.setdefault(field, len(fields))
+                    if field in columns:
+                        column_values[field] = value
+                        record.append([field_index])
+                    elif field in dictionaries:
+                        dictionary = dictionaries[field]
+                        if isinstance(value, list):
+                            value = [dictionary.setdefault(item, len(dictionary)) for item in value]
+                        else:
+                            value = dictionary.setdefault(value, len(dictionary))
+                        record.append([field_index, value])
+                    else:
+                        record.append([field_index, value])
+                data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                fp.write(data)
+                ids.append(entity_id)
+                offsets.append(offsets[-1] + len(data))
+                for field, value in column_values.items():
+                    columns[field].append(value if value is not None else np.nan)
+            # The index and the columns are sorted by ID, and aligned for memory-mapping
+            order = np.argsort(np.array(ids, dtype="<i8"), kind="stable")
+            offsets = np.array(offsets, dtype="<u8")
+            fp.write(bytes(-fp.tell() % 8))
+            index_offset = fp.tell()
+            fp.write(np.array(ids, dtype="<i8")[order].tobytes())
+            fp.write(offsets[:-1][order].tobytes())
+            fp.write(np.diff(offsets)[order].tobytes())
+            columns_offset = fp.tell()
+            for field in BINARY_COLUMN_FIELDS:
+                fp.write(np.array(columns[field], dtype="<f8")[order].tobytes())
+            fields_offset = fp.tell()
+            fields_data = json.dumps(
+                {
+                    FIELDS: list(fields),
+                    DICTIONARIES: {field: list(dictionary) for field, dictionary in dictionaries.items()},
+                },
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+            fp.write(fields_data)
+            fp.seek(0)
+            fp.write(
+                struct.pack(
+                    BINARY_CATALOG_HEADER_FORMAT,
+                    BINARY_CATALOG_MAGIC,
+                    BINARY_CATALOG_VERSION,
+                    len(ids),
+                    index_offset,
+                    columns_offset,
+                    fields_offset,
+                    len(fields_data),
+                )
+            )
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+class BinaryCatalog:
+
+    """
+    A read-only catalog saved by `to_binary_catalog`, memory-mapped from its file.
+
+    Opening the catalog only reads its header and field names: an entity is decoded from its record
+    when fetched, and the index and the bounding box columns are read from the file when accessed.
+
+    Attributes:
+        ids (numpy.ndarray): The IDs of the entities, in ascending order.
+        offsets (numpy.ndarray): The offset of the record of each entity in the file.
+        sizes (numpy.ndarray): The size of the record of each entity.
+        bounding_boxes (numpy.ndarray): The (N, 4) array of the bounding boxes of the entities, in the
+            order of `ids` and BINARY_COLUMN_FIELDS, NaN if missing. A view of the columns of the file.
+        fields (list): The dotted fields of the entities.
+        dictionaries (list): The dictionary of the values of each field, None if not dictionary-encoded.
+    """
+
+    def __init__(self, path):
+        """
+        Open a binary catalog.
+
+        Args:
+            path (str): The path to the file of the catalog.
+
+        Raises:
+            ValueError: If the file is not a binary catalog of the current version.
+        """
+        with open(path, "rb") as fp:
+            self.buffer = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (
+                magic,
+                version,
+                count,
+                index_offset,
+                columns_offset,
+                fields_offset,
+                fields_size,
+            ) = struct.unpack_from(BINARY_CATALOG_HEADER_FORMAT, self.buffer)
+        except struct.error:
+            magic, version = None, None
+        if magic != BINARY_CATALOG_MAGIC or version != BINARY_CATALOG_VERSION:
+            self.buffer.close()
+            raise ValueError(f"{path} is not a binary catalog of version {BINARY_CATALOG_VERSION}.")
+        self.ids = np.frombuffer(self.buffer, dtype="<i8", count=count, offset=index_offset)
+        self.offsets = np.frombuffer(self.buffer, dtype="<u8", count=count, offset=index_offset + 8 * count)
+        self.sizes = np.frombuffer(self.buffer, dtype="<u8", count=count, offset=index_offset + 16 * count)
+        self.bounding_boxes = np.frombuffer(
+            self.buffer, dtype="<f8", count=len(BINARY_COLUMN_FIELDS) * count, offset=columns_offset
+        ).reshape(len(BINARY_COLUMN_FIELDS), count).T
+        fields_json = json.loads(self.buffer[fields_offset:fields_offset + fields_size])
+        self.fields = fields_json[FIELDS]
+        self.dictionaries = [fields_json[DICTIONARIES].get(field) for field in self.fields]
+        self.columns = [
+            BINARY_COLUMN_FIELDS.index(field) if field in BINARY_COLUMN_FIELDS else None
+            for field in self.fields
+        ]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, entity_id):
+        return self.find(entity_id) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def find(self, entity_id):
+        """
+        Find the position of an entity in the index, by binary search.
+
+        Args:
+            entity_id (int): The ID of the entity.
+
+        Returns:
+            int: The position of the entity, or None if it is not in the catalog.
+        """
+        position = int(np.searchsorted(self.ids, entity_id))
+        if position < len(self.ids) and self.ids[position] == entity_id:
+            return position
+        return None
+
+    def get(self, entity_id):
+        """
+        Get an entity of the catalog, decoding its record only.
+
+        Args:
+            entity_id (int): The ID of the entity.
+
+        Returns:
+            dict: The JSON object of the entity, or None if it is not in the catalog.
+        """
+        position = self.find(entity_id)
+        if position is None:
+            return None
+        offset = int(self.offsets[position])
+        record = json.loads(self.buffer[offset:offset + int(self.sizes[position])])
+        fields = []
+        for entry in record:
+            field_index = entry[0]
+            if len(entry) == 1:
+                value = float(self.bounding_boxes[position, self.columns[field_index]])
+                value = None if np.isnan(value) else value
+            else:
+                value = entry[1]
+                dictionary = self.dictionaries[field_index]
+                if dictionary is not None:
+                    value = [dictionary[item] for item in value] if isinstance(value, list) else dictionary[value]
+            fields.append((self.fields[field_index], value))
+        return unflatten_fields(fields)
+
+    def close(self):
+        """
+        Close the file of the catalog.
+
+        Raises:
+            BufferError: If a view of the index or of the columns is still referenced.
+        """
+        self.ids = None
+        self.offsets = None
+        self.sizes = None
+        self.bounding_boxes = None
+        self.buffer.close()
+
+
 def get_fallback_headers(url, original_headers=None):
     """Generate browser-like fallback headers for a given URL"""
     return {
@@ -87,14 +767,610 @@ def get_fallback_headers(url, original_headers=None):
     }
 
 
-def download_dataset(url, authentication_type, api_key_parameter_name=None, api_key_parameter_value=None):
+# The HTTP session shared by the downloads, created on first use by `get_http_session`
+http_session = None
+
+
+def create_http_session(
+    pool_connections=HTTP_POOL_CONNECTIONS,
+    pool_maxsize=HTTP_POOL_MAXSIZE,
+    retries=HTTP_RETRIES,
+    backoff_factor=HTTP_BACKOFF_FACTOR,
+):
+    """
+    Create an HTTP session keeping its connections alive, in a pool per host.
+
+    The failed connections and reads are retried with an exponential backoff, while the error statuses
+    and the other errors are left to the caller, such as the fallback attempts of `download_dataset`.
+
+    Args:
+        pool_connections (int, optional): The number of hosts whose pool of connections is kept.
+            Defaults to HTTP_POOL_CONNECTIONS.
+        pool_maxsize (int, optional): The maximum number of connections kept per host.
+            Defaults to HTTP_POOL_MAXSIZE.
+        retries (int, optional): The number of retries of a failed connection or read. Defaults to HTTP_RETRIES.
+        backoff_factor (float, optional): The factor of the exponential backoff between retries, in seconds.
+            Defaults to HTTP_BACKOFF_FACTOR.
+
+    Returns:
+        requests.Session: The HTTP session.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            allowed_methods=["HEAD", "GET"],
+        ),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_http_session():
+    """
+    Get the HTTP session shared by the downloads, created on first use.
+
+    Returns:
+        requests.Session: The shared HTTP session.
+    """
+    global http_session
+    if http_session is None:
+        http_session = create_http_session()
+    return http_session
+
+
+def configure_http_session(**kwargs):
+    """
+    Replace the HTTP session shared by the downloads with a new one, closing the previous one.
+
+    Args:
+        **kwargs: The settings of the session, as accepted by `create_http_session`.
+
+    Returns:
+        requests.Session: The new shared HTTP session.
+    """
+    global http_session
+    if http_session is not None:
+        http_session.close()
+    http_session = create_http_session(**kwargs)
+    return http_session
+
+
+def load_download_validators(path):
+    """
+    Load the validators of the previous downloads, saved by `save_download_validators`.
+
+    Args:
+        path (str): The path to the file of the validators.
+
+    Returns:
+        dict: The ETag, Last-Modified, SHA-256 digest and size of the previous downloads, keyed by URL.
+            Empty if the file is missing or unreadable.
+    """
+    try:
+        validators = from_json(path)
+    except (OSError, ValueError):
+        return {}
+    return validators if isinstance(validators, dict) else {}
+
+
+def save_download_validators(path, validators):
+    """
+    Save the validators of the downloads, so that the next downloads of the same URLs are conditional.
+
+    The validators are written to a temporary file first and then moved in place.
+
+    Args:
+        path (str): The path to the file of the validators.
+        validators (dict): The validators of the downloads, keyed by URL.
+
+    Returns:
+        None
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4()}"
+    to_json(tmp_path, validators)
+    os.replace(tmp_path, path)
+
+
+class DatasetCache:
+
+    """
+    A cache of the downloaded datasets, shared on disk by the tools and keyed by URL and content.
+
+    Each dataset is stored once under its SHA-256 digest in the objects directory, and the index maps
+    the URL of each download to the digest of its content. A dataset is fresh for `max_age` seconds
+    after its download. The modification time of a stored dataset is its last use, and the least recently
+    used datasets are evicted once the cache is larger than `max_size`.
+
+    The cache can be used by several threads and processes at once. The index and the objects are only
+    changed under an exclusive lock of the cache directory, and each dataset handed out by the cache holds
+    a shared lock on its file until it is released, so it is never evicted while in use by any process.
+
+    Attributes:
+        path (str): The path to the directory of the cache.
+        max_size (int): The maximum size of the cached datasets, in bytes.
+        max_age (float): The time during which a downloaded dataset is fresh, in seconds.
+    """
+
+    def __init__(self, path, max_size=DATASET_CACHE_MAX_SIZE, max_age=DATASET_CACHE_MAX_AGE):
+        """
+        Create a cache of the downloaded datasets. The cache directory is created on first use.
+
+        Args:
+            path (str): The path to the directory of the cache.
+            max_size (int, optional): The maximum size of the cached datasets, in bytes.
+                Defaults to DATASET_CACHE_MAX_SIZE.
+            max_age (float, optional): The time during which a downloaded dataset is fresh, in seconds.
+                Defaults to DATASET_CACHE_MAX_AGE.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.index_path = os.path.join(path, DATASET_CACHE_INDEX)
+        self.lock_path = os.path.join(path, DATASET_CACHE_LOCK)
+        self.objects_path = os.path.join(path, DATASET_CACHE_OBJECTS)
+        self.tmp_path = os.path.join(path, DATASET_CACHE_TMP)
+        self.index = {}
+        self.index_stat = None
+        self.in_use = Counter()
+        self.pins = {}
+        self.lock = threading.RLock()
+        self.lock_file = None
+        self.lock_depth = 0
+
+    @contextlib.contextmanager
+    def locked(self):
+        """
+        Hold the lock of the cache, shared by the threads of this process and by the other processes.
+
+        The lock is reentrant. Without fcntl, the cache is only locked between the threads of this process.
+
+        Returns:
+            contextmanager: The context in which the lock is held.
+        """
+        with self.lock:
+            if self.lock_depth == 0 and fcntl is not None:
+                os.makedirs(self.path, exist_ok=True)
+                self.lock_file = open(self.lock_path, "a")
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+            self.lock_depth += 1
+            try:
+                yield
+            finally:
+                self.lock_depth -= 1
+                if self.lock_depth == 0 and self.lock_file is not None:
+                    # Closing the file releases the lock
+                    self.lock_file.close()
+                    self.lock_file = None
+
+    def get_object_path(self, digest):
+        """
+        Get the path to the dataset of a digest in the cache.
+
+        Args:
+            digest (str): The SHA-256 hexadecimal digest of the dataset.
+
+        Returns:
+            str: The path to the dataset.
+        """
+        return os.path.join(self.objects_path, digest)
+
+    def get_temporary_path(self):
+        """
+        Get a new path in the cache directory, where a dataset can be downloaded before it is stored.
+
+        Returns:
+            str: The temporary path.
+        """
+        os.makedirs(self.tmp_path, exist_ok=True)
+        return os.path.join(self.tmp_path, str(uuid.uuid4()))
+
+    def load_index(self):
+        """
+        Load the index of the cache, read again only if another process saved it since.
+
+        Returns:
+            dict: The SHA-256 digest, size, ETag, Last-Modified and download time of the cached datasets,
+                keyed by URL.
+        """
+        with self.locked():
+            try:
+                stat = os.stat(self.index_path)
+                index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                index_stat = None
+            if index_stat != self.index_stat:
+                try:
+                    index = from_json(self.index_path)
+                except (OSError, ValueError):
+                    index = {}
+                self.index = index if isinstance(index, dict) else {}
+                self.index_stat = index_stat
+            return self.index
+
+    def save_index(self, index):
+        """
+        Save the index of the cache, writing it to a temporary file first and then moving it in place.
+
+        Args:
+            index (dict): The index of the cache.
+
+        Returns:
+            None
+        """
+        with self.locked():
+            tmp_path = self.get_temporary_path()
+            to_json(tmp_path, index, indent=None)
+            os.replace(tmp_path, self.index_path)
+            stat = os.stat(self.index_path)
+            self.index = index
+            self.index_stat = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def pin(self, path):
+        """
+        Keep a dataset of the cache until it is released, holding a shared lock on its file.
+
+        Args:
+            path (str): The path to the dataset in the cache.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.in_use[path] == 0 and fcntl is not None:
+                fd = os.open(path, os.O_RDONLY)
+                fcntl.flock(fd, fcntl.LOCK_SH)
+                self.pins[path] = fd
+            self.in_use[path] += 1
+
+    def is_pinned(self, path):
+        """
+        Verify if a dataset of the cache is in use by this process or by another one.
+
+        Args:
+            path (str): The path to the dataset in the cache.
+
+        Returns:
+            bool: True if the dataset is in use, False otherwise.
+        """
+        if self.in_use[path] > 0:
+            return True
+        if fcntl is None:
+            return False
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def get(self, url):
+        """
+        Get the fresh dataset downloaded from a URL, which is kept until released.
+
+        Args:
+            url (str): The URL of the dataset.
+
+        Returns:
+            tuple: The path to the dataset and its entry in the index, or None if there is no fresh dataset.
+        """
+        with self.locked():
+            entry = self.load_index().get(url)
+            if entry is None or time.time() - entry[DOWNLOADED_AT] > self.max_age:
+                return None
+            path = self.get_object_path(entry[SHA256])
+            try:
+                # The modification time of the dataset is its last use
+                os.utime(path)
+                self.pin(path)
+            except OSError:
+                return None
+            return path, entry
+
+    def put(self, url, file_path, digest, size, etag=None, last_modified=None):
+        """
+        Store a dataset downloaded from a URL, which is kept until released, and evict the others if needed.
+
+        Args:
+            url (str): The URL of the dataset.
+            file_path (str): The path to the downloaded dataset, moved into the cache.
+            digest (str): The SHA-256 hexadecimal digest of the dataset.
+            size (int): The size of the dataset, in bytes.
+            etag (str, optional): The ETag of the dataset. Defaults to None.
+            last_modified (str, optional): The Last-Modified date of the dataset. Defaults to None.
+
+        Returns:
+            str: The path to the dataset in the cache.
+        """
+        path = self.get_object_path(digest)
+        with self.locked():
+            os.makedirs(self.objects_path, exist_ok=True)
+            if os.path.exists(path):
+                # The same content was already downloaded, possibly from another URL
+                os.remove(file_path)
+                os.utime(path)
+            else:
+                os.replace(file_path, path)
+            self.pin(path)
+            # The index is read again under the lock, with the entries saved by the other processes
+            index = dict(self.load_index())
+            index[url] = {
+                SHA256: digest,
+                SIZE: size,
+                ETAG: etag,
+                LAST_MODIFIED: last_modified,
+                DOWNLOADED_AT: time.time(),
+            }
+            self.evict(index)
+        return path
+
+    def release(self, path):
+        """
+        Release a dataset returned by `download_dataset`. A cached dataset is kept for the next downloads,
+        even if it was released more times than it was handed out, since it may be in use elsewhere. Any
+        other dataset is removed.
+
+        Args:
+            path (str): The path to the dataset.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            if self.in_use[path] > 0:
+                self.in_use[path] -= 1
+                if self.in_use[path] == 0:
+                    del self.in_use[path]
+                    fd = self.pins.pop(path, None)
+                    if fd is not None:
+                        # Closing the file releases its shared lock
+                        os.close(fd)
+                return
+        if self.is_cached(path):
+            return
+        if os.path.exists(path):
+            os.remove(path)
+
+    def is_cached(self, path):
+        """
+        Verify if a path is a dataset stored in the cache, which only the eviction removes.
+
+        Args:
+            path (str): The path to the dataset.
+
+        Returns:
+            bool: True if the dataset is stored in the cache, False otherwise.
+        """
+        # The datasets indexed by URL are all stored in the objects directory, under their digest
+        return os.path.dirname(os.path.abspath(path)) == os.path.abspath(self.objects_path)
+
+    def evict(self, index=None):
+        """
+        Evict the stale datasets, then the least recently used ones until the cache fits in `max_size`.
+        The datasets in use by any process are kept.
+
+        Args:
+            index (dict, optional): The index of the cache. Defaults to None, for the saved one.
+
+        Returns:
+            None
+        """
+        with self.locked():
+            now = time.time()
+            index = {
+                url: entry
+                for url, entry in (index if index is not None else self.load_index()).items()
+                if now - entry[DOWNLOADED_AT] <= self.max_age
+            }
+            digests = {entry[SHA256] for entry in index.values()}
+            objects = []
+            for digest in os.listdir(self.objects_path) if os.path.isdir(self.objects_path) else []:
+                path = self.get_object_path(digest)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if digest not in digests and not self.is_pinned(path):
+                    os.remove(path)
+                else:
+                    objects.append((stat.st_mtime, stat.st_size, digest, path))
+            total_size = sum(size for _, size, _, _ in objects)
+            evicted = set()
+            for _, size, digest, path in sorted(objects):
+                if total_size <= self.max_size:
+                    break
+                if self.is_pinned(path):
+                    continue
+                os.remove(path)
+                total_size -= size
+                evicted.add(digest)
+            self.save_index({url: entry for url, entry in index.items() if entry[SHA256] not in evicted})
+
+
+# The dataset cache shared by the tools, created on first use by `get_dataset_cache`
+dataset_cache = None
+
+
+def get_dataset_cache():
+    """
+    Get the dataset cache shared by the tools, created on first use in the project directory.
+
+    Returns:
+        DatasetCache: The shared dataset cache.
+    """
+    global dataset_cache
+    if dataset_cache is None:
+        dataset_cache = DatasetCache(
+            os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DATASET_CACHE_PATH_FROM_ROOT)
+        )
+    return dataset_cache
+
+
+def configure_dataset_cache(**kwargs):
+    """
+    Replace the dataset cache shared by the tools with a new one.
+
+    Args:
+        **kwargs: The settings of the cache, as accepted by `DatasetCache`. The path defaults to the one
+            of the current shared cache.
+
+    Returns:
+        DatasetCache: The new shared dataset cache.
+    """
+    global dataset_cache
+    kwargs.setdefault("path", get_dataset_cache().path)
+    dataset_cache = DatasetCache(**kwargs)
+    return dataset_cache
+
+
+def to_file_stream(response, path, chunk_size=DOWNLOAD_CHUNK_SIZE, max_size=None):
+    """
+    Stream the body of a response to a file, a chunk at a time.
+
+    The SHA-256 digest and the size of the body are computed while streaming, so the file
+    does not need to be read again. The file is removed if the streaming fails.
+
+    Args:
+        response (requests.Response): The response, requested with `stream=True`.
+        path (str): The path to the file where the body will be saved.
+        chunk_size (int, optional): The size of the chunks, in bytes. Defaults to DOWNLOAD_CHUNK_SIZE.
+        max_size (int, optional): The maximum size of the body, in bytes. Defaults to None, for no maximum.
+
+    Returns:
+        tuple: The SHA-256 hexadecimal digest and the size in bytes of the body.
+
+    Raises:
+        ValueError: If the body, or its announced Content-Length, is larger than `max_size`.
+    """
+    content_length = response.headers.get("Content-Length", "")
+    if max_size is not None and content_length.isdigit() and int(content_length) > max_size:
+        raise ValueError(f"The content of {response.url} exceeds the maximum size of {max_size} bytes.")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(path, "wb") as fp:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                size += len(chunk)
+                if max_size is not None and size > max_size:
+                    raise ValueError(
+                        f"The content of {response.url} exceeds the maximum size of {max_size} bytes."
+                    )
+                digest.update(chunk)
+                fp.write(chunk)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return digest.hexdigest(), size
+
+
+def download_dataset(
+    url,
+    authentication_type,
+    api_key_parameter_name=None,
+    api_key_parameter_value=None,
+    chunk_size=DOWNLOAD_CHUNK_SIZE,
+    max_size=None,
+    return_digest=False,
+    session=None,
+    timeout=HTTP_TIMEOUT,
+    validators=None,
+    cache=None,
+):
     """
     Downloads a dataset from the given URL using specified authentication mechanisms.
     The method performs a request to the URL with API key passed as either a query
     parameter or a header, based on the chosen authentication type. It implements
     adaptive fallback strategies for HTTP 403 errors and SSL certificate errors.
+
+    A download makes at most 3 attempts. A status in HTTP_RETRY_STATUSES is retried after a backoff,
+    a 403 or another error is retried once with the fallback headers, and only an SSL error is retried
+    without SSL verification. The session retries a failed connection or read HTTP_RETRIES times within
+    an attempt, after which the download fails, while an error status or an SSL error costs one request
+    per attempt. A dataset that cannot be downloaded therefore costs at most 2 + (1 + HTTP_RETRIES) requests.
+
+    The dataset is streamed to disk a chunk at a time, so it is never held in memory whole,
+    and its SHA-256 digest and size are computed while streaming. The request goes through
+    the shared HTTP session, which reuses the connections to the hosts already downloaded from.
+
+    With validators, the request is conditional on the ETag and Last-Modified of the previous download
+    of the URL. A dataset is unchanged if the server answers 304 Not Modified, or if its SHA-256 digest
+    is the one of the previous download, in which case no file is left.
+
+    With a cache, a fresh dataset already downloaded from the URL is returned without any request, and
+    a downloaded dataset is stored in the cache. The dataset must then be released with `cache.release`
+    instead of being removed.
+
+    Args:
+        url (str): The URL of the dataset.
+        authentication_type (int): 0 or None for no authentication, 1 for an API key passed as a query
+            parameter, 2 for an API key passed as a header.
+        api_key_parameter_name (str, optional): The name of the API key parameter. Defaults to None.
+        api_key_parameter_value (str, optional): The value of the API key. Defaults to None.
+        chunk_size (int, optional): The size of the streamed chunks, in bytes. Defaults to DOWNLOAD_CHUNK_SIZE.
+        max_size (int, optional): The maximum size of the dataset, in bytes. Defaults to None, for no maximum.
+        return_digest (bool, optional): Whether to return the SHA-256 digest and size of the dataset
+            with its path. Defaults to False.
+        session (requests.Session, optional): The HTTP session of the request. Defaults to None,
+            for the session returned by `get_http_session`.
+        timeout (tuple, optional): The connect and read timeouts, in seconds. Defaults to HTTP_TIMEOUT.
+        validators (dict, optional): The validators of the previous downloads keyed by URL, as loaded by
+            `load_download_validators`, and updated with the ones of this download. Defaults to None,
+            for an unconditional download.
+        cache (DatasetCache, optional): The cache of the downloaded datasets, such as the one returned by
+            `get_dataset_cache`. Defaults to None, for a dataset downloaded to the working directory.
+
+    Returns:
+        str: The path to the downloaded dataset, or None if it is unchanged. The (path, SHA-256 hexadecimal
+            digest, size in bytes) tuple if `return_digest` is True.
+
+    Raises:
+        RequestException: If all the download attempts failed.
+        ValueError: If the dataset is larger than `max_size`.
     """
-    file_path = os.path.join(os.getcwd(), str(uuid.uuid4()))
+    validator = validators.get(url) if validators is not None else None
+
+    def get_result(file_path, digest, size, etag, last_modified):
+        if validators is not None:
+            unchanged = validator is not None and validator.get(SHA256) == digest
+            # The other values stored with the validators by the caller are kept until the dataset changes
+            validators[url] = {
+                **(validator if unchanged else {}),
+                ETAG: etag,
+                LAST_MODIFIED: last_modified,
+                SHA256: digest,
+                SIZE: size,
+            }
+            if unchanged:
+                if cache is not None:
+                    cache.release(file_path)
+                else:
+                    os.remove(file_path)
+                file_path = None
+        return (file_path, digest, size) if return_digest else file_path
+
+    cached = cache.get(url) if cache is not None else None
+    if cached is not None:
+        file_path, entry = cached
+        return get_result(file_path, entry[SHA256], entry[SIZE], entry[ETAG], entry[LAST_MODIFIED])
+
+    file_path = (
+        cache.get_temporary_path() if cache is not None else os.path.join(os.getcwd(), str(uuid.uuid4()))
+    )
 
     params = {api_key_parameter_name: api_key_parameter_value} if authentication_type == 1 else None
     headers = {api_key_parameter_name: api_key_parameter_value} if authentication_type == 2 else None
@@ -102,33 +1378,58 @@ def download_dataset(url, authentication_type, api_key_parameter_name=None, api_
     tried_options = set()
     current_headers = headers
     verify_ssl = True
+    session = session if session is not None else get_http_session()
+
+    conditional_headers = {}
+    if validator is not None and validator.get(ETAG) is not None:
+        conditional_headers["If-None-Match"] = validator[ETAG]
+    if validator is not None and validator.get(LAST_MODIFIED) is not None:
+        conditional_headers["If-Modified-Since"] = validator[LAST_MODIFIED]
 
     for attempt in range(3):
         try:
-            response = requests.get(
+            response = session.get(
                 url,
                 params=params,
-                headers=current_headers,
+                headers=(
+                    {**(current_headers or {}), **conditional_headers}
+                    if len(conditional_headers) > 0
+                    else current_headers
+                ),
                 allow_redirects=True,
-                verify=verify_ssl
+                verify=verify_ssl,
+                stream=True,
+                timeout=timeout,
             )
-            response.raise_for_status()
-
-            if not verify_ssl:
-                import warnings
-                warnings.warn(
-                    f"SSL verification was disabled when downloading {url}."
-                )
-
-            with open(file_path, "wb") as f:
-                f.write(response.content)
-            return file_path
+            try:
+                if validator is not None and response.status_code == 304:
+                    return (None, validator.get(SHA256), validator.get(SIZE)) if return_digest else None
+                response.raise_for_status()
+
+                if not verify_ssl:
+                    warnings.warn(
+                        f"SSL verification was disabled when downloading {url}."
+                    )
+
+                digest, size = to_file_stream(response, file_path, chunk_size=chunk_size, max_size=max_size)
+            finally:
+                response.close()
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+            if cache is not None:
+                file_path = cache.put(url, file_path, digest, size, etag=etag, last_modified=last_modified)
+            return get_result(file_path, digest, size, etag, last_modified)
 
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 403 and "fallback_headers" not in tried_options:
                 current_headers = get_fallback_headers(url, headers)
                 tried_options.add("fallback_headers")
                 continue
+            if e.response.status_code in HTTP_RETRY_STATUSES:
+                # The session does not retry the error statuses, so the next attempt backs off instead
+                if attempt < 2:
+                    time.sleep(HTTP_BACKOFF_FACTOR * 2 ** attempt)
+                    continue
+                break
 
         except requests.exceptions.SSLError:
             if "disable_ssl" not in tried_options:
@@ -136,21 +1437,135 @@ def download_dataset(url, authentication_type, api_key_parameter_name=None, api_
                 tried_options.add("disable_ssl")
                 continue
 
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            # The session already retried the connection and the read, which no fallback can fix
+            break
+
         except requests.exceptions.RequestException:
             pass
 
+        # The SSL verification is only ever disabled after an SSL error
         if "fallback_headers" not in tried_options:
             current_headers = get_fallback_headers(url, headers)
             tried_options.add("fallback_headers")
-        elif "disable_ssl" not in tried_options:
-            verify_ssl = False
-            tried_options.add("disable_ssl")
         else:
             break
 
     raise requests.exceptions.RequestException(f"FAILURE! All download attempts failed for {url}.")
 
 
+def download_datasets(
+    datasets,
+    max_workers=DOWNLOAD_WORKERS,
+    max_workers_per_host=DOWNLOAD_WORKERS_PER_HOST,
+    max_pending=None,
+    workers_by_host=None,
+    **kwargs,
+):
+    """
+    Download datasets concurrently, yielding each one as soon as it is downloaded.
+
+    The downloads run in a pool of worker threads, taking turns between the hosts so that at most
+    `max_workers_per_host` downloads are made to the same host at once, unless the host has its own
+    limit in `workers_by_host`. The downloaded datasets wait
+    in a queue of at most `max_pending` datasets, so the downloads go on while the caller processes
+    the datasets already yielded, without getting further ahead of it.
+
+    Args:
+        datasets (dict): The datasets to download keyed by ID, as their URL or as the keyword arguments
+            of `download_dataset`.
+        max_workers (int, optional): The number of concurrent downloads. Defaults to DOWNLOAD_WORKERS.
+        max_workers_per_host (int, optional): The number of concurrent downloads to the same host.
+            Defaults to DOWNLOAD_WORKERS_PER_HOST.
+        max_pending (int, optional): The number of downloaded datasets waiting to be yielded.
+            Defaults to None, for `max_workers`.
+        workers_by_host (dict, optional): The number of concurrent downloads to each host with its own limit,
+            keyed by host. Defaults to None, for DOWNLOAD_WORKERS_BY_HOST.
+        **kwargs: The keyword arguments of `download_dataset` shared by all the downloads.
+
+    Returns:
+        iterator: The (ID, path) of the datasets in the order they are downloaded, the path being None
+            if the download failed or, with validators, if the dataset is unchanged. The datasets not yielded
+            when the iteration is closed are removed, or released with a cache.
+    """
+    cache = kwargs.get("cache")
+
+    def discard(path):
+        if cache is not None:
+            cache.release(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    workers_by_host = workers_by_host if workers_by_host is not None else DOWNLOAD_WORKERS_BY_HOST
+    hosts = OrderedDict()
+    for dataset_id, dataset in datasets.items():
+        dataset_kwargs = {"authentication_type": None, **kwargs}
+        dataset_kwargs.update(dataset if isinstance(dataset, Mapping) else {"url": dataset})
+        hosts.setdefault(urlparse(dataset_kwargs["url"]).netloc, deque()).append((dataset_id, dataset_kwargs))
+    count = sum(len(host_datasets) for host_datasets in hosts.values())
+    running = Counter()
+    condition = threading.Condition()
+    stopped = threading.Event()
+    results = queue.Queue(maxsize=max_pending if max_pending is not None else max_workers)
+
+    def get_next_dataset():
+        # Take the next dataset of the first host with a free slot, and move the host last
+        with condition:
+            while not stopped.is_set() and len(hosts) > 0:
+                for host, host_datasets in hosts.items():
+                    if running[host] < workers_by_host.get(host, max_workers_per_host):
+                        running[host] += 1
+                        next_dataset = host_datasets.popleft()
+                        if len(host_datasets) == 0:
+                            del hosts[host]
+                        else:
+                            hosts.move_to_end(host)
+                        return host, next_dataset
+                condition.wait()
+            return None, None
+
+    def work():
+        host, next_dataset = get_next_dataset()
+        while next_dataset is not None:
+            dataset_id, dataset_kwargs = next_dataset
+            try:
+                path = download_dataset(**dataset_kwargs)
+            except Exception as e:
+                # Any failure is reported as a failed download, so the worker always yields a result
+                warnings.warn(f"The download of dataset {dataset_id} failed: {e!r}")
+                path = None
+            with condition:
+                running[host] -= 1
+                condition.notify_all()
+            while not stopped.is_set():
+                try:
+                    results.put((dataset_id, path), timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                if path is not None:
+                    discard(path)
+            host, next_dataset = get_next_dataset()
+
+    workers = [threading.Thread(target=work, daemon=True) for _ in range(min(max_workers, count))]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in range(count):
+            yield results.get()
+    finally:
+        stopped.set()
+        with condition:
+            condition.notify_all()
+        for worker in workers:
+            worker.join()
+        while not results.empty():
+            _, path = results.get()
+            if path is not None:
+                discard(path)
+
+
 #########################
 # VERIFICATION FUNCTIONS
 #########################
@@ -320,6 +1735,45 @@ def create_filename(
     )
 
 
+def intern_strings(value):
+    """
+    Interns a string, or the strings of a list, so that equal values share a single object.
+
+    This is meant for the values repeated across many sources, such as country codes or statuses.
+
+    Args:
+        value (object): The string or list of strings to intern. Other values are returned as is.
+
+    Returns:
+        object: The interned string or a list of interned strings.
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [intern_strings(element) for element in value]
+    return value
+
+
+def flatten_value(value):
+    """
+    Flattens a value into a single CSV cell.
+
+    The non-empty lists are joined with pipes, and the strings are stripped of their
+    extraneous leading and trailing spaces.
+
+    Args:
+        value (object): The value to flatten.
+
+    Returns:
+        object: The flattened value, or the value itself if it is neither a non-empty list nor a string.
+    """
+    if isinstance(value, list) and len(value) > 0:
+        value = "|".join(str(item) for item in value)
+    if isinstance(value, str):
+        value = value.strip()
+    return value
+
+
 def normalize(string):
     """
     Normalizes a string to create a standardized format suitable for filenames.
@@ -363,6 +1817,203 @@ def get_iso_time():
     )
 
 
+#########################
+# IMMUTABLE STRUCTURES
+#########################
+
+
+def raise_immutable(self, *args, **kwargs):
+    """
+    Raises a TypeError for any attempt to modify an immutable structure.
+
+    Raises:
+        TypeError: Always.
+    """
+    raise TypeError(f"'{type(self).__name__}' object is immutable")
+
+
+class ImmutableDict(dict):
+    """
+    A read-only dictionary, which can be shared safely between callers.
+
+    It is still a dict, so it serializes to JSON and compares like one.
+    A deep copy returns plain mutable dictionaries and lists.
+    """
+
+    __setitem__ = __delitem__ = __ior__ = raise_immutable
+    clear = pop = popitem = setdefault = update = raise_immutable
+
+    def __reduce__(self):
+        return ImmutableDict, (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+class ImmutableList(list):
+    """
+    A read-only list, which can be shared safely between callers.
+
+    It is still a list, so it serializes to JSON and compares like one.
+    A deep copy returns plain mutable dictionaries and lists.
+    """
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = raise_immutable
+    append = clear = extend = insert = pop = remove = reverse = sort = raise_immutable
+
+    def __reduce__(self):
+        return ImmutableList, (list(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+
+def freeze(obj):
+    """
+    Recursively converts the dictionaries and lists of a JSON compatible object to immutable ones.
+
+    Args:
+        obj (object): The JSON compatible object to freeze.
+
+    Returns:
+        object: The frozen copy of the object.
+    """
+    if isinstance(obj, dict):
+        return ImmutableDict((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return ImmutableList(freeze(value) for value in obj)
+    return obj
+
+
+def thaw(obj):
+    """
+    Recursively converts the dictionaries and lists of a JSON compatible object to mutable ones.
+
+    Args:
+        obj (object): The JSON compatible object to thaw.
+
+    Returns:
+        object: The mutable copy of the object.
+    """
+    if isinstance(obj, dict):
+        return {key: thaw(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [thaw(value) for value in obj]
+    return obj
+
+
+#########################
+# CACHING
+#########################
+
+
+class ResultsCache:
+    """
+    A bounded cache of function results, evicted in least recently used order.
+
+    Each result is stored with the generation of the data it was computed from, and is
+    recomputed once the generation changes, so the cache never serves results of stale data.
+
+    Attributes:
+        max_size (int): The maximum number of results kept in the cache.
+        get_generation (callable): The function returning the current generation of the data,
+            given the arguments of a call.
+        results (OrderedDict): The (generation, result) of each call, from the least to the most recently used.
+        hits (int): The number of calls answered from the cache.
+        misses (int): The number of calls computed.
+        lock (threading.Lock): The lock guarding the results and the statistics, shared by the threads.
+    """
+
+    def __init__(self, max_size, get_generation):
+        self.max_size = max_size
+        self.get_generation = get_generation
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def memoize(self, func):
+        """
+        Decorates a function so that its results are cached.
+
+        The calls are keyed by the function name and its arguments, defaults included, and
+        the calls with unhashable arguments are not cached. A cached dictionary or list is returned
+        as a shallow copy, so the caller can modify it without altering the cache. The function is
+        called outside the lock of the cache, so concurrent misses of the same call may all compute it.
+
+        Args:
+            func (callable): The function to decorate.
+
+        Returns:
+            callable: The decorated function.
+        """
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            key = (func.__name__, tuple(arguments.arguments.items()))
+            try:
+                hash(key)
+            except TypeError:
+                return func(*args, **kwargs)
+            with self.lock:
+                entry = self.results.get(key)
+                hit = entry is not None and entry[0] == self.get_generation(**arguments.arguments)
+                if hit:
+                    self.hits += 1
+                    self.results.move_to_end(key)
+                    result = entry[1]
+                else:
+                    self.misses += 1
+            if not hit:
+                result = func(*args, **kwargs)
+                with self.lock:
+                    # The generation is read after the call, which may have loaded the data
+                    self.results[key] = (self.get_generation(**arguments.arguments), result)
+                    self.results.move_to_end(key)
+                    if len(self.results) > self.max_size:
+                        self.results.popitem(last=False)
+            if isinstance(result, dict):
+                return dict(result)
+            if isinstance(result, list):
+                return list(result)
+            return result
+
+        return wrapper
+
+    def clear(self):
+        """
+        Removes all the results from the cache and resets its statistics.
+        """
+        with self.lock:
+            self.results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_stats(self):
+        """
+        Gets the statistics of the cache.
+
+        Returns:
+            dict: The numbers of hits and misses, and the current and maximum sizes of the cache.
+        """
+        with self.lock:
+            return {
+                HITS: self.hits,
+                MISSES: self.misses,
+                SIZE: len(self.results),
+                MAX_SIZE: self.max_size,
+            }
+
+
 #########################
 # GTFS SPECIFIC FUNCTIONS
 #########################
@@ -1,4 +1,8 @@
+import heapq
+import json
 import os
+import warnings
+from operator import itemgetter
 from tools.constants import (
     NAME,
     PROVIDER,
@@ -23,8 +27,27 @@ from tools.constants import (
     REDIRECTS,
     IS_OFFICIAL,
     IS_PRODUCER_URL_UNSTABLE,
+    RESULTS_CACHE_SIZE,
+    ARROW,
+    DATA_TYPE,
+    GTFS,
+    GTFS_RT,
+    LOCATION,
+    BOUNDING_BOX,
+    URLS,
+    LATEST,
+    ADDED,
+    UPDATED,
+    UNCHANGED,
+)
+from tools.helpers import ResultsCache
+from tools.representations import (
+    GtfsScheduleSourcesCatalog,
+    GtfsRealtimeSourcesCatalog,
+    SourcesView,
+    SourcesQuery,
+    SourcesExport,
 )
-from tools.representations import GtfsScheduleSourcesCatalog, GtfsRealtimeSourcesCatalog
 
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
 
@@ -35,6 +58,32 @@ GTFS_RT_MAP = {CATALOGS: ["GtfsRealtimeSourcesCatalog"]}
 ALL_MAP = {CATALOGS: ["GtfsScheduleSourcesCatalog", "GtfsRealtimeSourcesCatalog"]}
 
 
+def get_generation(**kwargs):
+    """
+    Get the generation of the catalogs.
+
+    The generation of a catalog changes with every source added, updated or refreshed,
+    so it tells whether a cached result is still up to date. The generations of all the
+    catalogs are used whatever the data type, since the realtime sources depend on the
+    schedule sources they reference. The catalogs not loaded yet have no generation.
+
+    Args:
+        **kwargs: The arguments of the cached call, ignored.
+
+    Returns:
+        tuple: The generation of each catalog.
+    """
+    catalogs = [
+        globals()[f"{catalog_cls}"]._instance for catalog_cls in ALL_MAP[CATALOGS]
+    ]
+    return tuple(
+        catalog.generation if catalog is not None else None for catalog in catalogs
+    )
+
+
+results_cache = ResultsCache(max_size=RESULTS_CACHE_SIZE, get_generation=get_generation)
+
+
 def add_gtfs_realtime_source(
     entity_type,
     provider,
@@ -299,7 +348,279 @@ def update_gtfs_schedule_source(
     return catalog
 
 
-def get_sources(data_type=ALL):
+def get_results_cache_stats():
+    """
+    Get the statistics of the cache of the results of the `get_*` functions.
+
+    Returns:
+        dict: The numbers of hits and misses, and the current and maximum sizes of the cache.
+    """
+    return results_cache.get_stats()
+
+
+def merge_sources(catalogs_sources):
+    """
+    Merge the sources of several catalogs into a single dictionary sorted by ID.
+
+    The sources of each catalog are already sorted by ID, so they are merged in linear time
+    instead of being sorted again.
+
+    Args:
+        catalogs_sources (iterable): The dictionaries of sources of each catalog, sorted by ID.
+
+    Returns:
+        dict: A dictionary of sorted sources.
+    """
+    return dict(
+        heapq.merge(
+            *(catalog_sources.items() for catalog_sources in catalogs_sources),
+            key=itemgetter(0),
+        )
+    )
+
+
+def get_sources_view(find_source_ids, data_type=ALL):
+    """
+    Get a read-only view of the sources of the Mobility Catalogs, in ascending ID order.
+
+    The view looks the sources up in the catalogs when accessed, so no copy of the sources is made.
+
+    Args:
+        find_source_ids (callable): The function returning the IDs of the sources to view,
+            given a catalog.
+        data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+
+    Returns:
+        SourcesView: The view of the sources from the specified catalog.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    catalogs = [
+        globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]
+    ]
+    return SourcesView(
+        [catalog.catalog for catalog in catalogs],
+        list(
+            heapq.merge(
+                *(
+                    catalog.sort_source_ids(find_source_ids(catalog))
+                    for catalog in catalogs
+                )
+            )
+        ),
+    )
+
+
+def query(data_type=ALL):
+    """
+    Start a query combining several filters over the Mobility Catalogs.
+
+    The filters are chained on the returned query, which answers them from the indexes of
+    the catalogs, starting with the most selective one, for example:
+    `query(data_type=GTFS).where(country_code="CA", feature="fares-v2").within_bbox(...).get_sources()`.
+
+    Args:
+        data_type (str, optional): The type of data to query sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+
+    Returns:
+        SourcesQuery: The query over the specified catalog.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return SourcesQuery(
+        [globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]]
+    )
+
+
+def export_to_csv(path, data_type=ALL, columns=None, incremental=False):
+    """
+    Export the sources of the Mobility Catalogs to a CSV file, in ascending ID order.
+
+    The sources are flattened into typed columns and written to the file a chunk at a time.
+    The incremental export only flattens the sources changed since the previous incremental export,
+    as recorded in a manifest next to the file, and rebuilds the whole file if the manifest is stale.
+
+    Args:
+        path (str): The path to the CSV file.
+        data_type (str, optional): The type of data to export sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        columns (list, optional): The columns to export, in order. Defaults to the columns of sources.csv.
+        incremental (bool, optional): Whether to reuse the unchanged rows of the previous export.
+            Defaults to False.
+
+    Returns:
+        int: The number of exported sources.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return SourcesExport(
+        [globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]],
+        columns=columns,
+    ).to_csv(path, incremental=incremental)
+
+
+def export_to_arrow(path, data_type=ALL, columns=None, file_format=ARROW):
+    """
+    Export the sources of the Mobility Catalogs to an Arrow or Parquet file, in ascending ID order.
+
+    Unlike the CSV export, the values keep their types: the features, entity types, static references
+    and redirects are list columns, and the columns with few distinct values are dictionary-encoded.
+    The Arrow file can be memory-mapped, and both formats read only the selected columns.
+
+    Args:
+        path (str): The path to the file.
+        data_type (str, optional): The type of data to export sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        columns (list, optional): The columns to export, in order. Defaults to all the columns.
+        file_format (str, optional): 'arrow' or 'parquet'. Defaults to 'arrow'.
+
+    Returns:
+        int: The number of exported sources.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return SourcesExport(
+        [globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]],
+        columns=columns,
+    ).to_arrow(path, file_format=file_format)
+
+
+def export_to_binary(path, data_type=ALL):
+    """
+    Export the sources of the Mobility Catalogs to a single binary catalog file, in ascending ID order.
+
+    The file is read with `tools.helpers.BinaryCatalog`, which memory-maps it and decodes a source
+    only when it is fetched, while the bounding boxes are read as fixed-width columns.
+
+    Args:
+        path (str): The path to the binary catalog file.
+        data_type (str, optional): The type of data to export sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+
+    Returns:
+        int: The number of exported sources.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return SourcesExport(
+        [globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]]
+    ).to_binary(path)
+
+
+def iter_sources_ndjson(data_type=ALL):
+    """
+    Iterate over the sources of the Mobility Catalogs as newline-delimited JSON, in ascending ID order.
+
+    The sources are serialized one at a time, so the memory used does not grow with the size
+    of the catalogs. The lines can be written to a file with `fp.writelines(iter_sources_ndjson())`,
+    and read back by `import_from_ndjson`.
+
+    Args:
+        data_type (str, optional): The type of data to export sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+
+    Returns:
+        iterator: The JSON line of each source, in the format of the catalog files.
+    """
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return SourcesExport(
+        [globals()[f"{catalog_cls}"]() for catalog_cls in source_type_map[CATALOGS]]
+    ).iter_ndjson()
+
+
+def get_source_kwargs(source_json):
+    """
+    Flatten a source in the format of the catalog files into the arguments of the catalogs.
+
+    The bounding box and the latest URL are left out, since the catalogs derive them from the dataset.
+
+    Args:
+        source_json (dict): The source, in the format of the catalog files.
+
+    Returns:
+        dict: The arguments of the catalogs `add` and `update` methods.
+    """
+    kwargs = {
+        key: value for key, value in source_json.items() if key not in [LOCATION, URLS]
+    }
+    for key, value in source_json.get(LOCATION, {}).items():
+        if key != BOUNDING_BOX:
+            kwargs[key] = value
+    for key, value in source_json.get(URLS, {}).items():
+        if key != LATEST:
+            kwargs[key] = value
+    return kwargs
+
+
+def import_from_ndjson(lines):
+    """
+    Add or update sources of the Mobility Catalogs from newline-delimited JSON.
+
+    Each line is a source in the format of the catalog files, as emitted by `iter_sources_ndjson`.
+    A source whose mdb_source_id is in its catalog is updated with the values that changed, or skipped
+    if none did, while the other sources are added under a new ID. A warning is issued for the fields
+    that an update cannot apply or remove, and a source is only counted as updated if it did change. The lines are read one at a time,
+    so the memory used does not grow with their number.
+
+    Args:
+        lines (iterable): The JSON lines of the sources, for instance an open file. The blank lines are skipped.
+
+    Returns:
+        dict: The number of sources added, updated and unchanged.
+
+    Raises:
+        ValueError: If the data type of a source is neither GTFS nor GTFS-RT.
+    """
+    catalog_map = {GTFS: GtfsScheduleSourcesCatalog, GTFS_RT: GtfsRealtimeSourcesCatalog}
+    counts = {ADDED: 0, UPDATED: 0, UNCHANGED: 0}
+    for line in lines:
+        if len(line.strip()) == 0:
+            continue
+        source_json = json.loads(line)
+        data_type = source_json.get(DATA_TYPE)
+        if data_type not in catalog_map:
+            raise ValueError(f"Cannot import a source of data type {data_type}.")
+        catalog = catalog_map[data_type]()
+        kwargs = get_source_kwargs(source_json)
+        del kwargs[DATA_TYPE]
+        mdb_source_id = kwargs.pop(MDB_SOURCE_ID, None)
+        source = (
+            catalog.get_source(source_id=mdb_source_id) if mdb_source_id is not None else None
+        )
+        if source is None:
+            catalog.add(**kwargs)
+            counts[ADDED] += 1
+            continue
+        current_kwargs = get_source_kwargs(source.schematize(**source.get_attributes()))
+        removed_keys = sorted(set(current_kwargs) - set(kwargs) - {DATA_TYPE, MDB_SOURCE_ID})
+        if len(removed_keys) > 0:
+            warnings.warn(
+                f"The fields {removed_keys} of source {source.mdb_source_id} are missing from its line "
+                f"and were kept, since they cannot be removed by an update."
+            )
+        changed_kwargs = {
+            key: value for key, value in kwargs.items() if current_kwargs.get(key) != value
+        }
+        if len(changed_kwargs) == 0:
+            counts[UNCHANGED] += 1
+            continue
+        catalog.update(mdb_source_id=source.mdb_source_id, **changed_kwargs)
+        # The source is compared again, since an update only applies the fields its source type supports
+        source = catalog.get_source(source_id=source.mdb_source_id)
+        updated_kwargs = get_source_kwargs(source.schematize(**source.get_attributes()))
+        ignored_keys = sorted(
+            key for key, value in changed_kwargs.items() if updated_kwargs.get(key) != value
+        )
+        if len(ignored_keys) > 0:
+            warnings.warn(
+                f"The fields {ignored_keys} of source {source.mdb_source_id} could not be updated."
+            )
+        counts[UPDATED if updated_kwargs != current_kwargs else UNCHANGED] += 1
+    return counts
+
+
+@results_cache.memoize
+def get_sources(data_type=ALL, view=False):
     """
     Get the sources of the Mobility Catalogs.
 
@@ -308,23 +629,33 @@ def get_sources(data_type=ALL):
     Args:
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL. 
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.catalog.keys(),
+            data_type=data_type,
+        )
     source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(globals()[f"{catalog_cls}"]().get_sources())
-    return dict(sorted(sources.items()))
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources()
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
 
+@results_cache.memoize
 def get_sources_by_bounding_box(
     minimum_latitude,
     maximum_latitude,
     minimum_longitude,
     maximum_longitude,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources included in the geographical bounding box.
@@ -339,27 +670,70 @@ def get_sources_by_bounding_box(
         maximum_longitude (float): The maximum longitude of the bounding box.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources within the specified bounding box from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids_by_bounding_box(
+                minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
+            ),
+            data_type=data_type,
+        )
     source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_bounding_box(
-                minimum_latitude=minimum_latitude,
-                maximum_latitude=maximum_latitude,
-                minimum_longitude=minimum_longitude,
-                maximum_longitude=maximum_longitude,
-            )
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_bounding_box(
+            minimum_latitude=minimum_latitude,
+            maximum_latitude=maximum_latitude,
+            minimum_longitude=minimum_longitude,
+            maximum_longitude=maximum_longitude,
+        )
+        for catalog_cls in source_type_map[CATALOGS]
+    )
+
+
+@results_cache.memoize
+def get_sources_by_bounding_boxes(
+    bounding_boxes,
+    data_type=ALL,
+):
+    """
+    Get the sources included in each of the geographical bounding boxes.
+
+    This function retrieves sources from the specified data type in the Mobility Catalogs
+    that are within each of the given geographical bounding boxes, in a single batch.
+
+    Args:
+        bounding_boxes (list): The bounding boxes, each one a tuple of
+            (minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude).
+        data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
+            Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+
+    Returns:
+        list: For each bounding box, a dictionary of sorted sources within it from the specified catalog.
+    """
+    bounding_boxes = list(bounding_boxes)
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    catalogs_results = [
+        globals()[f"{catalog_cls}"]().get_sources_by_bounding_boxes(
+            bounding_boxes=bounding_boxes
         )
-    return dict(sorted(sources.items()))
+        for catalog_cls in source_type_map[CATALOGS]
+    ]
+    return [
+        merge_sources(catalogs_sources) for catalogs_sources in zip(*catalogs_results)
+    ]
 
 
+@results_cache.memoize
 def get_sources_by_subdivision_name(
     subdivision_name,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources located at the given subdivision name.
@@ -371,24 +745,32 @@ def get_sources_by_subdivision_name(
         subdivision_name (str): The name of the subdivision to retrieve sources for.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources within the specified subdivision from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids(SUBDIVISION_NAME, subdivision_name),
+            data_type=data_type,
+        )
     source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_subdivision_name(
-                subdivision_name=subdivision_name
-            )
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_subdivision_name(
+            subdivision_name=subdivision_name
         )
-    return dict(sorted(sources.items()))
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
 
+@results_cache.memoize
 def get_sources_by_country_code(
     country_code,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources located at the given country code.
@@ -400,21 +782,67 @@ def get_sources_by_country_code(
         country_code (str): The country code to retrieve sources for.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources within the specified country from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids(COUNTRY_CODE, country_code),
+            data_type=data_type,
+        )
     source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_country_code(
-                country_code=country_code
-            )
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_country_code(
+            country_code=country_code
         )
-    return dict(sorted(sources.items()))
+        for catalog_cls in source_type_map[CATALOGS]
+    )
+
 
+@results_cache.memoize
+def get_dependent_realtime_sources(mdb_source_id):
+    """
+    Get the GTFS Realtime sources referencing the given GTFS Schedule source.
 
+    This function answers from the index of the static references of the GTFS Realtime Sources Catalog,
+    for instance to assess the impact of deprecating or redirecting a GTFS Schedule source.
+
+    Args:
+        mdb_source_id (int): The ID of the GTFS Schedule source.
+
+    Returns:
+        dict: A dictionary of sorted GTFS Realtime sources referencing the GTFS Schedule source.
+    """
+    return GtfsRealtimeSourcesCatalog().get_dependent_sources(static_source_id=mdb_source_id)
+
+
+@results_cache.memoize
+def get_referenced_schedule_sources(mdb_source_id):
+    """
+    Get the GTFS Schedule sources referenced by the given GTFS Realtime source.
+
+    Args:
+        mdb_source_id (int): The ID of the GTFS Realtime source.
+
+    Returns:
+        dict: A dictionary of sorted GTFS Schedule sources referenced by the GTFS Realtime source.
+    """
+    static_source_ids = GtfsRealtimeSourcesCatalog().find_referenced_source_ids(
+        source_id=mdb_source_id
+    )
+    catalog = GtfsScheduleSourcesCatalog()
+    return dict(
+        catalog.view_sources(
+            [source_id for source_id in static_source_ids if source_id in catalog.catalog]
+        )
+    )
+
+
+@results_cache.memoize
 def get_latest_datasets(data_type=ALL):
     """
     Get latest datasets of the Mobility Catalogs.
@@ -429,15 +857,17 @@ def get_latest_datasets(data_type=ALL):
         dict: A dictionary of sorted latest datasets from the specified catalog.
     """
     source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(globals()[f"{catalog_cls}"]().get_latest_datasets())
-    return dict(sorted(sources.items()))
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_latest_datasets()
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
 
+@results_cache.memoize
 def get_sources_by_status(
     status,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources with the given status.
@@ -449,22 +879,30 @@ def get_sources_by_status(
         status (str): The status to filter sources by.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources with the specified status from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
-    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_status(status=status)
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids(STATUS, status),
+            data_type=data_type,
         )
-    return dict(sorted(sources.items()))
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_status(status=status)
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
 
+@results_cache.memoize
 def get_sources_by_feature(
     feature,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources with the given feature.
@@ -476,21 +914,30 @@ def get_sources_by_feature(
         feature (str): The feature to filter sources by.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources with the specified feature from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
-    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_feature(feature=feature)
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids(FEATURES, feature),
+            data_type=data_type,
         )
-    return dict(sorted(sources.items()))
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_feature(feature=feature)
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
+
+@results_cache.memoize
 def get_sources_by_is_official(
     is_official,
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources with the given is_offical flag.
@@ -502,21 +949,29 @@ def get_sources_by_is_official(
         is_official (str): The feature to filter sources by.
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources with the specified is_official flag from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
-    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_is_official(is_official=is_official)
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_source_ids(IS_OFFICIAL, is_official),
+            data_type=data_type,
         )
-    return dict(sorted(sources.items()))
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_is_official(is_official=is_official)
+        for catalog_cls in source_type_map[CATALOGS]
+    )
 
 
+@results_cache.memoize
 def get_sources_by_is_stable(
     data_type=ALL,
+    view=False,
 ):
     """
     Get the sources with a stable producer URL.
@@ -527,14 +982,20 @@ def get_sources_by_is_stable(
     Args:
         data_type (str, optional): The type of data to retrieve sources for. Defaults to ALL.
             Possible values are 'ALL', 'GTFS', 'GTFS-RT', etc.
+        view (bool, optional): Whether to return a read-only view of the sources instead of a copy.
+            Defaults to False.
 
     Returns:
         dict: A dictionary of sorted sources with a stable producer URL from the specified catalog.
+            A read-only SourcesView of them if `view` is True.
     """
-    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
-    sources = {}
-    for catalog_cls in source_type_map[CATALOGS]:
-        sources.update(
-            globals()[f"{catalog_cls}"]().get_sources_by_is_stable()
+    if view:
+        return get_sources_view(
+            lambda catalog: catalog.find_stable_source_ids(),
+            data_type=data_type,
         )
-    return dict(sorted(sources.items()))
\ No newline at end of file
+    source_type_map = globals()[f"{data_type.upper().replace('-', '_')}_MAP"]
+    return merge_sources(
+        globals()[f"{catalog_cls}"]().get_sources_by_is_stable()
+        for catalog_cls in source_type_map[CATALOGS]
+    )
\ No newline at end of file
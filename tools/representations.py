@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import heapq
+from itertools import islice
+from operator import itemgetter
 import os
+import re
 import json
+import numpy as np
+import pandas as pd
 from tools.helpers import (
     are_overlapping_boxes,
     is_readable,
@@ -9,13 +19,30 @@ from tools.helpers import (
     get_iso_time,
     create_latest_url,
     to_json,
+    to_snapshot,
+    to_csv_chunks,
+    to_csv_rows,
+    get_csv_rows,
+    get_file_digest,
+    get_json_digest,
+    to_arrow_chunks,
+    get_arrow_schema,
+    to_binary_catalog,
+    from_snapshot,
     create_filename,
     download_dataset,
+    get_dataset_cache,
+    from_json,
+    freeze,
+    intern_strings,
+    flatten_value,
 )
 from tools.constants import (
     GTFS_SCHEDULE_CATALOG_PATH,
     SOURCE_CATALOG_PATH_FROM_ROOT,
     GTFS_REALTIME_CATALOG_PATH,
+    GTFS_SCHEDULE_CATALOG_SNAPSHOT_PATH_FROM_ROOT,
+    GTFS_REALTIME_CATALOG_SNAPSHOT_PATH_FROM_ROOT,
     MDB_SOURCE_ID,
     DATA_TYPE,
     PROVIDER,
@@ -24,7 +51,9 @@ from tools.constants import (
     COUNTRY_CODE,
     SUBDIVISION_NAME,
     MUNICIPALITY,
+    FEATURE,
     BOUNDING_BOX,
+    BOUNDING_BOXES,
     MINIMUM_LATITUDE,
     MAXIMUM_LATITUDE,
     MINIMUM_LONGITUDE,
@@ -50,6 +79,18 @@ from tools.constants import (
     ID_KEY,
     UNKNOWN,
     FILENAME,
+    SNAPSHOT,
+    SNAPSHOT_VERSION,
+    VERSION,
+    FILES,
+    ENTITIES,
+    MAX_WORKERS,
+    EXECUTOR,
+    THREAD,
+    PROCESS,
+    LAZY,
+    CACHE_SIZE,
+    MDB_SOURCE_FILENAME_ID_PATTERN,
     FEATURES,
     STATUS,
     ACTIVE,
@@ -59,8 +100,44 @@ from tools.constants import (
     REDIRECTS,
     IS_OFFICIAL,
     IS_PRODUCER_URL_UNSTABLE,
+    EXPORT_CHUNK_SIZE,
+    LOCATION_COUNTRY_CODE,
+    LOCATION_SUBDIVISION_NAME,
+    LOCATION_MUNICIPALITY,
+    LOCATION_MINIMUM_LATITUDE,
+    LOCATION_MAXIMUM_LATITUDE,
+    LOCATION_MINIMUM_LONGITUDE,
+    LOCATION_MAXIMUM_LONGITUDE,
+    LOCATION_EXTRACTED_ON,
+    URLS_DIRECT_DOWNLOAD,
+    URLS_AUTHENTICATION_TYPE,
+    URLS_AUTHENTICATION_INFO,
+    URLS_API_KEY_PARAMETER_NAME,
+    URLS_LATEST,
+    URLS_LICENSE,
+    REDIRECTS_ID,
+    REDIRECTS_COMMENT,
+    CSV_COLUMNS,
+    CSV_COLUMN_TYPES,
+    ARROW_COLUMNS,
+    EXPORT_LIST_COLUMNS,
+    ARROW,
+    PARQUET,
+    CSV_MANIFEST_SUFFIX,
+    CSV_MANIFEST_VERSION,
+    CSV_EXPORT_CODE_PATHS_FROM_ROOT,
+    CODE_DIGEST,
+    COLUMNS,
+    DIGEST,
+    ROWS,
 )
 
+try:
+    from rtree.index import Index as RtreeIndex
+except ImportError:
+    # The spatial index is optional, bounding box queries fall back to a full scan without it
+    RtreeIndex = None
+
 PROJECT_ROOT = os.path.dirname(os.path.dirname(__file__))
 
 
@@ -77,11 +154,13 @@ class Catalog(ABC):
         root (str): The root directory of the catalog.
         path (str): The relative path to the catalog directory from the root.
         catalog (dict): A dictionary containing the aggregated entities.
+        files (dict): The state of the catalog files when they were last loaded, as returned by `scan`.
     """
 
     root = None
     path = None
     catalog = None
+    files = None
 
     def __init__(self, **kwargs):
         """
@@ -90,17 +169,35 @@ class Catalog(ABC):
         Args:
             **kwargs: Keyword arguments containing initialization parameters.
                 Must include 'ROOT', 'PATH', 'ID_KEY', and 'ENTITY_CLS'.
+                May include 'SNAPSHOT', the path to the compiled snapshot of the catalog,
+                and 'MAX_WORKERS' and 'EXECUTOR' to load the catalog files in parallel,
+                or 'LAZY' and 'CACHE_SIZE' to only parse the catalog files on first access.
         """
         if self.root is None:
             self.root = kwargs.pop(ROOT)
         if self.path is None:
             self.path = kwargs.pop(PATH)
         if self.catalog is None:
-            self.catalog = self.aggregate(
-                catalog_path=os.path.join(self.root, self.path),
-                id_key=kwargs.pop(ID_KEY),
-                entity_cls=kwargs.pop(ENTITY_CLS),
-            )
+            catalog_path = os.path.join(self.root, self.path)
+            self.files = self.scan(catalog_path)
+            if kwargs.pop(LAZY, False):
+                self.catalog = self.index(
+                    catalog_path=catalog_path,
+                    id_key=kwargs.pop(ID_KEY),
+                    entity_cls=kwargs.pop(ENTITY_CLS),
+                    files=self.files,
+                    cache_size=kwargs.pop(CACHE_SIZE, None),
+                )
+            else:
+                self.catalog = self.aggregate(
+                    catalog_path=catalog_path,
+                    id_key=kwargs.pop(ID_KEY),
+                    entity_cls=kwargs.pop(ENTITY_CLS),
+                    snapshot_path=kwargs.pop(SNAPSHOT, None),
+                    files=self.files,
+                    max_workers=kwargs.pop(MAX_WORKERS, None),
+                    executor=kwargs.pop(EXECUTOR, THREAD),
+                )
 
     @staticmethod
     def identify(catalog_root):
@@ -119,30 +216,158 @@ class Catalog(ABC):
         return sum(len(files) for path, sub_dirs, files in os.walk(catalog_root)) + 1
 
     @staticmethod
-    def aggregate(catalog_path, id_key, entity_cls):
+    def scan(catalog_path):
+        """
+        Scan the state of the files in the catalog directory.
+
+        This method only stats the files, it never opens them, so it is cheap
+        enough to be used for detecting changes in the catalog.
+
+        Args:
+            catalog_path (str): The path to the catalog directory.
+
+        Returns:
+            dict: The (modification time in nanoseconds, size) of each file, keyed by its filename.
+        """
+        files = {}
+        for path, sub_dirs, filenames in os.walk(catalog_path):
+            for file in filenames:
+                stat = os.stat(os.path.join(path, file))
+                files[file] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    @staticmethod
+    def read(file_path):
+        """
+        Read the JSON contents of a catalog file.
+
+        Args:
+            file_path (str): The path to the catalog file.
+
+        Returns:
+            dict: The JSON contents of the file.
+        """
+        with open(file_path, encoding='utf-8') as fp:
+            return json.load(fp)
+
+    @staticmethod
+    def aggregate(
+        catalog_path,
+        id_key,
+        entity_cls,
+        snapshot_path=None,
+        files=None,
+        max_workers=None,
+        executor=THREAD,
+    ):
         """
         Aggregate entities from files in the catalog directory.
 
         This method walks through the catalog directory, reads JSON files,
         and creates entity instances based on the file contents.
 
+        When a snapshot path is given, the JSON contents are loaded from the compiled
+        snapshot in a single read instead, as long as the files of the catalog directory
+        did not change since the snapshot was written. A stale or missing snapshot is
+        rebuilt from a full walk of the catalog directory.
+
+        When max_workers is given, the files are read and parsed by a pool of workers:
+        a thread pool for I/O bound loading, or a process pool to also spread the JSON
+        parsing over several cores. The entities are always created in the walk order
+        of the files, so the result is the same as a serial aggregation.
+
         Args:
             catalog_path (str): The path to the catalog directory.
             id_key (str): The key in the JSON data that represents the entity's ID.
             entity_cls (type): The class to use for creating entity instances.
+            snapshot_path (str, optional): The path to the compiled snapshot of the catalog. Defaults to None.
+            files (dict, optional): The state of the catalog files if already scanned. Defaults to None.
+            max_workers (int, optional): The number of workers loading the files in parallel.
+                Defaults to None, which loads the files serially.
+            executor (str, optional): The kind of workers, either THREAD or PROCESS. Defaults to THREAD.
 
         Returns:
             dict: A dictionary of entity instances, keyed by their IDs.
         """
+        entities = None
+        if snapshot_path is not None:
+            files = files if files is not None else Catalog.scan(catalog_path)
+            snapshot = from_snapshot(snapshot_path)
+            if (
+                isinstance(snapshot, dict)
+                and snapshot.get(VERSION) == SNAPSHOT_VERSION
+                and snapshot.get(FILES) == files
+            ):
+                entities = snapshot.get(ENTITIES)
+        if entities is None:
+            filenames = []
+            file_paths = []
+            for path, sub_dirs, files_in_path in os.walk(catalog_path):
+                for file in files_in_path:
+                    filenames.append(file)
+                    file_paths.append(os.path.join(path, file))
+            if max_workers is None:
+                entities_json = [Catalog.read(file_path) for file_path in file_paths]
+            else:
+                executor_cls = ProcessPoolExecutor if executor == PROCESS else ThreadPoolExecutor
+                with executor_cls(max_workers=max_workers) as pool:
+                    entities_json = list(
+                        pool.map(
+                            Catalog.read,
+                            file_paths,
+                            chunksize=max(1, len(file_paths) // (max_workers * 4)),
+                        )
+                    )
+            entities = list(zip(filenames, entities_json))
+            if snapshot_path is not None:
+                try:
+                    to_snapshot(
+                        path=snapshot_path,
+                        obj={VERSION: SNAPSHOT_VERSION, FILES: files, ENTITIES: entities},
+                    )
+                except OSError:
+                    # The snapshot is only an accelerator, the catalog is still usable without it
+                    pass
         catalog = {}
-        for path, sub_dirs, files in os.walk(catalog_path):
-            for file in files:
-                with open(os.path.join(path, file), encoding='utf-8') as fp:
-                    entity_json = json.load(fp)
-                    entity_id = entity_json[id_key]
-                    catalog[entity_id] = entity_cls(filename=file, **entity_json)
+        for file, entity_json in entities:
+            entity_id = entity_json[id_key]
+            catalog[entity_id] = entity_cls(filename=file, **entity_json)
         return catalog
 
+    @staticmethod
+    def index(catalog_path, id_key, entity_cls, files=None, cache_size=None):
+        """
+        Index the entities of the catalog directory without parsing them.
+
+        The ID of each entity is extracted from its filename, which ends with the MDB Source ID.
+        Only the files whose name does not follow this convention are parsed to find their ID.
+
+        Args:
+            catalog_path (str): The path to the catalog directory.
+            id_key (str): The key in the JSON data that represents the entity's ID.
+            entity_cls (type): The class to use for creating entity instances.
+            files (dict, optional): The state of the catalog files if already scanned. Defaults to None.
+            cache_size (int, optional): The maximum number of entities kept in memory. Defaults to None.
+
+        Returns:
+            LazyEntities: A mapping of the entities, keyed by their IDs, parsed on first access.
+        """
+        files = files if files is not None else Catalog.scan(catalog_path)
+        filenames = {}
+        for file in files:
+            match = re.search(MDB_SOURCE_FILENAME_ID_PATTERN, file)
+            if match is not None:
+                entity_id = int(match.group(1))
+            else:
+                entity_id = Catalog.read(os.path.join(catalog_path, file))[id_key]
+            filenames[entity_id] = file
+        return LazyEntities(
+            catalog_path=catalog_path,
+            filenames=filenames,
+            entity_cls=entity_cls,
+            cache_size=cache_size,
+        )
+
     @abstractmethod
     def add(self, **kwargs):
         """
@@ -174,6 +399,572 @@ class Catalog(ABC):
         pass
 
 
+class LazyEntities(MutableMapping):
+
+    """
+    A mapping of catalog entities which are only parsed from their file on first access.
+
+    The mapping holds an index of the entity filenames, keyed by the entity IDs. An entity
+    is created from its file the first time it is accessed and then kept in memory,
+    up to `cache_size` entities evicted in least recently used order.
+
+    Attributes:
+        catalog_path (str): The path to the catalog directory.
+        filenames (dict): The filename of each entity, keyed by the entity IDs.
+        entity_cls (type): The class to use for creating entity instances.
+        cache_size (int, optional): The maximum number of entities kept in memory, unbounded if None.
+        entities (OrderedDict): The entities in memory, from the least to the most recently used.
+
+    Note:
+        An evicted entity is parsed again from its file on its next access, so entities
+        must be saved before they are evicted for their changes to be kept.
+    """
+
+    def __init__(self, catalog_path, filenames, entity_cls, cache_size=None):
+        self.catalog_path = catalog_path
+        self.filenames = filenames
+        self.entity_cls = entity_cls
+        self.cache_size = cache_size
+        self.entities = OrderedDict()
+
+    def __getitem__(self, entity_id):
+        entity = self.peek(entity_id)
+        self.cache(entity_id, entity)
+        return entity
+
+    def peek(self, entity_id):
+        """
+        Get an entity without keeping it in memory, nor changing the order of the entities in memory.
+
+        Args:
+            entity_id: The ID of the entity.
+
+        Returns:
+            object: The entity in memory, or else parsed from its file.
+        """
+        entity = self.entities.get(entity_id)
+        if entity is None:
+            filename = self.filenames[entity_id]
+            entity = self.entity_cls(
+                filename=filename,
+                **Catalog.read(os.path.join(self.catalog_path, filename)),
+            )
+        return entity
+
+    def peek_items(self):
+        """
+        Iterate over the (ID, entity) pairs without keeping the entities in memory,
+        so a full scan neither grows the memory nor evicts the recently used entities.
+
+        Returns:
+            generator: The (ID, entity) pairs, in the order of the filenames.
+        """
+        return ((entity_id, self.peek(entity_id)) for entity_id in list(self.filenames))
+
+    def __setitem__(self, entity_id, entity):
+        self.filenames[entity_id] = entity.filename
+        self.cache(entity_id, entity)
+
+    def __delitem__(self, entity_id):
+        del self.filenames[entity_id]
+        self.entities.pop(entity_id, None)
+
+    def __iter__(self):
+        return iter(self.filenames)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def __contains__(self, entity_id):
+        return entity_id in self.filenames
+
+    def cache(self, entity_id, entity):
+        self.entities[entity_id] = entity
+        self.entities.move_to_end(entity_id)
+        if self.cache_size is not None and len(self.entities) > self.cache_size:
+            self.entities.popitem(last=False)
+
+
+class SourcesView(Mapping):
+
+    """
+    A read-only mapping of source IDs to the JSON representations of the sources, in ascending ID order.
+
+    The view holds no copy of the sources: it only holds their sorted IDs and looks them up
+    in the catalogs when accessed, returning the immutable JSON representations cached by the sources.
+    Iterating or counting a view is therefore free of any allocation proportional to the catalogs.
+
+    Attributes:
+        catalogs (list): The catalogs of sources the view looks up, each one a mapping of IDs to sources.
+        source_ids (list): The IDs of the sources in the view, in ascending order.
+    """
+
+    def __init__(self, catalogs, source_ids):
+        self.catalogs = catalogs
+        self.source_ids = source_ids
+
+    def __getitem__(self, source_id):
+        if source_id in self:
+            for catalog in self.catalogs:
+                if source_id in catalog:
+                    return catalog[source_id].as_json()
+        raise KeyError(source_id)
+
+    def __contains__(self, source_id):
+        index = bisect_left(self.source_ids, source_id)
+        return index < len(self.source_ids) and self.source_ids[index] == source_id
+
+    def __iter__(self):
+        return iter(self.source_ids)
+
+    def __len__(self):
+        return len(self.source_ids)
+
+    def __repr__(self):
+        return f"SourcesView({self.source_ids})"
+
+
+class SourcesQuery:
+
+    """
+    A query combining several filters over one or more catalogs of sources.
+
+    The attribute filters are answered from the secondary indexes of the catalogs, starting
+    with the most selective one, so each intersection costs at most the size of the smallest
+    candidate set. The bounding box filter is then only evaluated on the surviving sources,
+    unless there is no attribute filter, in which case the spatial index is used.
+
+    Attributes:
+        catalogs (list): The catalogs of sources to query.
+        conditions (list): The (attribute, value) pairs the sources must all match.
+        bounding_box (tuple, optional): The (minimum latitude, maximum latitude, minimum longitude,
+            maximum longitude) of the bounding box the sources must overlap.
+
+    Example:
+        >>> SourcesQuery(catalogs).where(country_code="CA", status="active").within_bbox(
+        ...     43.0, 44.0, -80.0, -79.0
+        ... ).get_sources()
+    """
+
+    attributes = {
+        COUNTRY_CODE: COUNTRY_CODE,
+        SUBDIVISION_NAME: SUBDIVISION_NAME,
+        FEATURE: FEATURES,
+        STATUS: STATUS,
+        IS_OFFICIAL: IS_OFFICIAL,
+        IS_PRODUCER_URL_UNSTABLE: IS_PRODUCER_URL_UNSTABLE,
+    }
+
+    def __init__(self, catalogs):
+        self.catalogs = catalogs
+        self.conditions = []
+        self.bounding_box = None
+
+    def where(self, **conditions):
+        """
+        Filter the sources on the given attribute values.
+
+        Args:
+            **conditions: The values to match, keyed by attribute. The attributes are
+                country_code, subdivision_name, feature, status, is_official and is_producer_url_unstable.
+
+        Returns:
+            SourcesQuery: The query, to chain other filters.
+
+        Raises:
+            ValueError: If an attribute cannot be filtered on.
+        """
+        for attribute, value in conditions.items():
+            if attribute not in self.attributes:
+                raise ValueError(f"Cannot filter the sources on {attribute}.")
+            self.conditions.append((self.attributes[attribute], value))
+        return self
+
+    def within_bbox(
+        self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
+    ):
+        """
+        Filter the sources overlapping the given bounding box.
+
+        Returns:
+            SourcesQuery: The query, to chain other filters.
+        """
+        self.bounding_box = (
+            minimum_latitude,
+            maximum_latitude,
+            minimum_longitude,
+            maximum_longitude,
+        )
+        return self
+
+    def find_source_ids(self, catalog):
+        """
+        Find the IDs of the sources of a catalog matching all the filters of the query.
+
+        Args:
+            catalog (SourcesCatalog): The catalog to query.
+
+        Returns:
+            set: The IDs of the matching sources.
+        """
+        if len(self.conditions) == 0:
+            if self.bounding_box is None:
+                return set(catalog.catalog.keys())
+            return catalog.find_source_ids_by_bounding_box(*self.bounding_box)
+        indexes = catalog.get_indexes()
+        candidate_sets = sorted(
+            (
+                indexes.get(attribute, {}).get(value, set())
+                for attribute, value in self.conditions
+            ),
+            key=len,
+        )
+        source_ids = set(candidate_sets[0])
+        for candidate_set in candidate_sets[1:]:
+            if len(source_ids) == 0:
+                break
+            source_ids &= candidate_set
+        if self.bounding_box is not None:
+            source_ids = {
+                source_id
+                for source_id in source_ids
+                if catalog.catalog[source_id].is_overlapping_bounding_box(*self.bounding_box)
+            }
+        return source_ids
+
+    def view(self):
+        """
+        Get a read-only view of the matching sources, in ascending ID order.
+
+        Returns:
+            SourcesView: The view of the matching sources of all the catalogs.
+        """
+        return SourcesView(
+            [catalog.catalog for catalog in self.catalogs],
+            list(
+                heapq.merge(
+                    *(
+                        catalog.sort_source_ids(self.find_source_ids(catalog))
+                        for catalog in self.catalogs
+                    )
+                )
+            ),
+        )
+
+    def get_sources(self):
+        """
+        Get the matching sources.
+
+        Returns:
+            dict: A dictionary of sorted sources matching all the filters of the query.
+        """
+        return dict(self.view())
+
+
+class SourcesExport:
+
+    """
+    An export of the sources of one or more catalogs into typed columns, in ascending ID order.
+
+    The sources are flattened straight into one list of values per column, a chunk of sources
+    at a time, and each chunk is typed once per column. Only the chunk being exported is kept
+    in memory besides the catalogs.
+
+    Attributes:
+        code_digest (str): The digest of the code of the export, shared across all instances
+            and computed on first use by `get_code_digest`.
+        catalogs (list): The catalogs of sources to export.
+        columns (list, optional): The exported columns, in order. Defaults to the columns of the format.
+        chunk_size (int): The number of sources per chunk.
+    """
+
+    code_digest = None
+
+    def __init__(self, catalogs, columns=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.catalogs = catalogs
+        self.columns = columns
+        self.chunk_size = chunk_size
+
+    def iter_sources(self):
+        """
+        Iterate over the sources of all the catalogs in ascending ID order.
+
+        Returns:
+            iterator: The (source ID, source) pairs, merged across the catalogs.
+        """
+        return heapq.merge(
+            *(
+                zip(catalog.get_sorted_ids(), map(catalog.catalog.__getitem__, catalog.get_sorted_ids()))
+                for catalog in self.catalogs
+            ),
+            key=itemgetter(0),
+        )
+
+    def iter_source_chunks(self):
+        """
+        Iterate over the sources of all the catalogs in ascending ID order, a chunk at a time.
+
+        Returns:
+            iterator: The lists of sources, the first one being yielded even if empty.
+        """
+        sources = (source for _, source in self.iter_sources())
+        chunk = list(islice(sources, self.chunk_size))
+        yield chunk
+        while len(chunk) == self.chunk_size:
+            chunk = list(islice(sources, self.chunk_size))
+            if len(chunk) > 0:
+                yield chunk
+
+    @staticmethod
+    def get_values(sources, columns):
+        """
+        Flatten sources into one list of values per column.
+
+        Args:
+            sources (list): The sources to flatten.
+            columns (list): The exported columns.
+
+        Returns:
+            dict: The values of the sources, keyed by column.
+        """
+        values = {column: [] for column in columns}
+        for source in sources:
+            source_values = source.get_export_values()
+            for column, column_values in values.items():
+                column_values.append(source_values.get(column))
+        return values
+
+    def get_columns(self, sources):
+        """
+        Flatten sources into typed CSV columns.
+
+        Args:
+            sources (list): The sources to flatten.
+
+        Returns:
+            pandas.DataFrame: The exported columns, with one row per source.
+        """
+        columns = self.columns if self.columns is not None else CSV_COLUMNS
+        values = self.get_values(sources, columns)
+        for column in EXPORT_LIST_COLUMNS:
+            if column in values:
+                values[column] = [flatten_value(value) for value in values[column]]
+        return pd.DataFrame(
+            {
+                column: pd.Series(column_values, dtype=CSV_COLUMN_TYPES.get(column, object))
+                for column, column_values in values.items()
+            },
+            columns=columns,
+        )
+
+    def iter_chunks(self):
+        """
+        Iterate over the exported CSV columns, a chunk of sources at a time.
+
+        Returns:
+            iterator: The DataFrames of the chunks, the first one being yielded even if empty.
+        """
+        return (self.get_columns(chunk) for chunk in self.iter_source_chunks())
+
+    def iter_csv_rows(self, sources):
+        """
+        Render sources into CSV rows, a chunk of sources at a time.
+
+        Args:
+            sources (iterable): The sources to render.
+
+        Returns:
+            iterator: The CSV row of each source, ending with its line break.
+        """
+        sources = iter(sources)
+        chunk = list(islice(sources, self.chunk_size))
+        while len(chunk) > 0:
+            yield from get_csv_rows(self.get_columns(chunk))
+            chunk = list(islice(sources, self.chunk_size))
+
+    @classmethod
+    def get_code_digest(cls):
+        """
+        Get the digest of the code of the export, so that a change of the code invalidates the previous exports.
+
+        Returns:
+            str: The hexadecimal digest of the files in CSV_EXPORT_CODE_PATHS_FROM_ROOT.
+        """
+        if cls.code_digest is None:
+            cls.code_digest = get_json_digest(
+                [get_file_digest(os.path.join(PROJECT_ROOT, path)) for path in CSV_EXPORT_CODE_PATHS_FROM_ROOT]
+            )
+        return cls.code_digest
+
+    @classmethod
+    def get_csv_manifest(cls, path, columns):
+        """
+        Get the rows of a previous CSV export from its manifest, if it still describes the file.
+
+        Args:
+            path (str): The path to the CSV file.
+            columns (list): The exported columns.
+
+        Returns:
+            dict: The (hash, offset, size) of the row of each source, keyed by source ID.
+                Empty if the manifest is missing, or if the file, the columns or the code of the export changed since.
+        """
+        try:
+            manifest = from_json(f"{path}{CSV_MANIFEST_SUFFIX}")
+            if (
+                manifest.get(VERSION) != CSV_MANIFEST_VERSION
+                or manifest.get(CODE_DIGEST) != cls.get_code_digest()
+                or manifest.get(COLUMNS) != columns
+                or manifest.get(DIGEST) != get_file_digest(path)
+            ):
+                return {}
+            return {
+                source_id: (source_hash, offset, size)
+                for source_id, source_hash, offset, size in manifest[ROWS]
+            }
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return {}
+
+    def to_csv(self, path, incremental=False):
+        """
+        Export the sources to a CSV file, streaming the chunks to the file.
+
+        The incremental export keeps a manifest of the content hash and byte span of each row
+        next to the file. On the next incremental export, only the sources whose JSON changed
+        are flattened again, and the rows of the other sources are copied from the previous file.
+        The whole file is rebuilt if the manifest is missing or no longer matches the file.
+
+        Args:
+            path (str): The path to the CSV file.
+            incremental (bool, optional): Whether to reuse the unchanged rows of the previous export.
+                Defaults to False.
+
+        Returns:
+            int: The number of exported sources.
+        """
+        if not incremental:
+            return to_csv_chunks(path, self.iter_chunks())
+        columns = self.columns if self.columns is not None else CSV_COLUMNS
+        previous_rows = self.get_csv_manifest(path, columns)
+        hashes = []
+        changed_sources = []
+        for source_id, source in self.iter_sources():
+            source_hash = get_json_digest(self.get_source_json(source))
+            hashes.append((source_id, source_hash))
+            if previous_rows.get(source_id, (None,))[0] != source_hash:
+                changed_sources.append(source)
+        changed_rows = self.iter_csv_rows(changed_sources)
+
+        def iter_rows():
+            yield get_csv_rows(self.get_columns([]), header=True)[0]
+            for source_id, source_hash in hashes:
+                previous_row = previous_rows.get(source_id)
+                if previous_row is not None and previous_row[0] == source_hash:
+                    yield previous_row[1:]
+                else:
+                    yield next(changed_rows)
+
+        spans = to_csv_rows(path, iter_rows(), previous_path=path if len(previous_rows) > 0 else None)
+        to_json(
+            f"{path}{CSV_MANIFEST_SUFFIX}",
+            {
+                VERSION: CSV_MANIFEST_VERSION,
+                CODE_DIGEST: self.get_code_digest(),
+                COLUMNS: columns,
+                DIGEST: get_file_digest(path),
+                ROWS: [
+                    [source_id, source_hash, offset, size]
+                    for (source_id, source_hash), (offset, size) in zip(hashes, spans[1:])
+                ],
+            },
+            indent=None,
+        )
+        return len(hashes)
+
+    def to_binary(self, path):
+        """
+        Export the sources to a binary catalog file, which `tools.helpers.BinaryCatalog` reads
+        one source at a time without decoding the others.
+
+        Args:
+            path (str): The path to the binary catalog file.
+
+        Returns:
+            int: The number of exported sources.
+        """
+        return to_binary_catalog(
+            path,
+            ((source_id, self.get_source_json(source)) for source_id, source in self.iter_sources()),
+        )
+
+    @staticmethod
+    def get_source_json(source):
+        """
+        Get the JSON representation of a source, in the format of the catalog files.
+
+        The JSON view of the source is reused if it is already cached, but not cached otherwise,
+        so the memory used by an export does not grow with the size of the catalogs.
+
+        Args:
+            source (Source): The source.
+
+        Returns:
+            dict: The JSON representation of the source.
+        """
+        if source.json_view is not None:
+            return source.json_view
+        return source.schematize(**source.get_attributes())
+
+    def iter_ndjson(self):
+        """
+        Iterate over the sources as newline-delimited JSON, in the format of the catalog files.
+
+        Returns:
+            iterator: The JSON line of each source, ending with a newline.
+        """
+        for _, source in self.iter_sources():
+            yield json.dumps(self.get_source_json(source), ensure_ascii=False) + "\n"
+
+    def to_arrow(self, path, file_format=ARROW):
+        """
+        Export the sources to an Arrow or Parquet file, streaming the chunks to the file.
+
+        Unlike the CSV export, the lists are kept as list columns and the values keep their types.
+
+        Args:
+            path (str): The path to the file.
+            file_format (str, optional): ARROW or PARQUET. Defaults to ARROW.
+
+        Returns:
+            int: The number of exported sources.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        columns = self.columns if self.columns is not None else ARROW_COLUMNS
+        return to_arrow_chunks(
+            path,
+            (self.get_values(chunk, columns) for chunk in self.iter_source_chunks()),
+            schema=get_arrow_schema(columns),
+            file_format=file_format,
+        )
+
+    def to_parquet(self, path):
+        """
+        Export the sources to a Parquet file, with one row group per chunk.
+
+        Args:
+            path (str): The path to the Parquet file.
+
+        Returns:
+            int: The number of exported sources.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        return self.to_arrow(path, file_format=PARQUET)
+
+
 class SourcesCatalog(Catalog):
 
     """
@@ -186,12 +977,31 @@ class SourcesCatalog(Catalog):
     Attributes:
         entity_cls (type): The class of the entities (sources) stored in this catalog.
             This is typically a subclass of the Source class.
+        indexes (dict): The secondary indexes of the sources, built on first use by `get_indexes`.
+        indexed_values (dict): The values under which each source is indexed, keyed by source ID.
+        spatial_index (rtree.index.Index): The spatial index of the sources, built on first use
+            by `get_spatial_index`.
+        spatial_boxes (dict): The boxes under which each source is spatially indexed, keyed by source ID.
+        bounding_box_ids (numpy.ndarray): The source ID of each row of `bounding_box_array`, in ascending order.
+        bounding_box_array (numpy.ndarray): The (N, 4) columnar array of the source bounding boxes,
+            built on first use by `get_bounding_box_array`.
+        sorted_ids (list): The IDs of the sources in ascending order, built on first use by `get_sorted_ids`.
+        generation (int): The number of changes made to the sources since the catalog was loaded.
 
     Note:
         This class inherits attributes and methods from the Catalog base class,
         including methods for aggregating, identifying, and managing catalog entries.
     """
 
+    indexes = None
+    indexed_values = None
+    spatial_index = None
+    spatial_boxes = None
+    bounding_box_ids = None
+    bounding_box_array = None
+    sorted_ids = None
+    generation = 0
+
     def __init__(self, **kwargs):
         """
         Initialize a SourcesCatalog instance.
@@ -214,71 +1024,360 @@ class SourcesCatalog(Catalog):
         super().__init__(id_key=MDB_SOURCE_ID, entity_cls=self.entity_cls, **kwargs)
 
     def get_source(self, source_id):
-        return self.catalog.get(source_id)
+        source = self.catalog.get(source_id)
+        if source is None and isinstance(source_id, str) and source_id.isdigit():
+            # References to sources, like the static references, are stored as strings
+            source = self.catalog.get(int(source_id))
+        return source
+
+    def get_sorted_ids(self):
+        """
+        Get the IDs of the sources in ascending order, building them on first use.
+
+        The sorted IDs are then kept up to date by `reindex`, with a binary search per change.
+
+        Returns:
+            list: The IDs of the sources in ascending order.
+        """
+        if self.sorted_ids is None:
+            self.sorted_ids = sorted(self.catalog.keys())
+        return self.sorted_ids
+
+    def sort_source_ids(self, source_ids):
+        """
+        Sort IDs of sources of the catalog in ascending order.
+
+        A few IDs are sorted directly, while many are picked in order from the sorted IDs
+        of the catalog, in linear time instead of a full sort.
+
+        Args:
+            source_ids (collection): The IDs to sort, all in the catalog.
+
+        Returns:
+            list: The IDs in ascending order.
+        """
+        sorted_ids = self.get_sorted_ids()
+        # Sorting k IDs costs k log k, picking them costs the size of the catalog
+        if len(source_ids) * 8 < len(sorted_ids):
+            return sorted(source_ids)
+        return [source_id for source_id in sorted_ids if source_id in source_ids]
 
     def get_sources(self):
         return {
-            source_id: source.as_json() for source_id, source in self.catalog.items()
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.get_sorted_ids()
+        }
+
+    def view_sources(self, source_ids=None):
+        """
+        Get a read-only view of the sources, in ascending ID order.
+
+        Args:
+            source_ids (collection, optional): The IDs of the sources to view. Defaults to all the sources.
+
+        Returns:
+            SourcesView: The view of the sources.
+        """
+        if source_ids is None:
+            return SourcesView([self.catalog], list(self.get_sorted_ids()))
+        return SourcesView([self.catalog], self.sort_source_ids(source_ids))
+
+    def iter_sources(self):
+        """
+        Iterate over the (ID, source) pairs of the catalog, for building its indexes.
+
+        A lazy catalog parses every source once, without keeping them in memory.
+
+        Returns:
+            iterable: The (ID, source) pairs.
+        """
+        if isinstance(self.catalog, LazyEntities):
+            return self.catalog.peek_items()
+        return self.catalog.items()
+
+    def get_indexes(self):
+        """
+        Get the secondary indexes of the catalog, building them on first use.
+
+        The indexes map each value of the indexed attributes to the IDs of the sources
+        having this value, so filtering on an attribute only costs the number of matches.
+
+        Returns:
+            dict: The sets of source IDs, keyed by attribute and then by value.
+        """
+        if self.indexes is None:
+            self.indexes = {}
+            self.indexed_values = {}
+            for source_id, source in self.iter_sources():
+                self.index_source(source_id, source)
+        return self.indexes
+
+    def index_source(self, source_id, source):
+        self.unindex_source(source_id)
+        index_values = source.get_index_values()
+        for attribute, values in index_values.items():
+            attribute_index = self.indexes.setdefault(attribute, {})
+            for value in values:
+                attribute_index.setdefault(value, set()).add(source_id)
+        self.indexed_values[source_id] = index_values
+
+    def unindex_source(self, source_id):
+        index_values = self.indexed_values.pop(source_id, {})
+        for attribute, values in index_values.items():
+            attribute_index = self.indexes[attribute]
+            for value in values:
+                source_ids = attribute_index.get(value, set())
+                source_ids.discard(source_id)
+                if len(source_ids) == 0:
+                    attribute_index.pop(value, None)
+
+    def find_source_ids(self, attribute, value):
+        return self.get_indexes().get(attribute, {}).get(value, set())
+
+    def get_spatial_index(self):
+        """
+        Get the R-tree spatial index of the source bounding boxes, building it on first use.
+
+        Realtime sources are indexed with the bounding boxes of their static references.
+
+        Returns:
+            rtree.index.Index: The spatial index, or None if the Rtree library is not installed.
+        """
+        if self.spatial_index is None and RtreeIndex is not None:
+            self.spatial_index = RtreeIndex()
+            self.spatial_boxes = {}
+            for source_id, source in self.iter_sources():
+                self.spatial_index_source(source_id, source)
+        return self.spatial_index
+
+    def spatial_index_source(self, source_id, source):
+        self.spatial_unindex_source(source_id)
+        # The R-tree coordinates are ordered as (minimum x, minimum y, maximum x, maximum y).
+        # Inverted boxes are indexed by their envelope, the candidates are checked exactly anyway.
+        boxes = [
+            (
+                min(minimum_longitude, maximum_longitude),
+                min(minimum_latitude, maximum_latitude),
+                max(minimum_longitude, maximum_longitude),
+                max(minimum_latitude, maximum_latitude),
+            )
+            for (
+                minimum_latitude,
+                maximum_latitude,
+                minimum_longitude,
+                maximum_longitude,
+            ) in source.get_bounding_boxes()
+        ]
+        for box in boxes:
+            self.spatial_index.insert(source_id, box)
+        self.spatial_boxes[source_id] = boxes
+
+    def spatial_unindex_source(self, source_id):
+        for box in self.spatial_boxes.pop(source_id, []):
+            self.spatial_index.delete(source_id, box)
+
+    def get_bounding_box_array(self):
+        """
+        Get the columnar array of the source bounding boxes, building it on first use.
+
+        Each row holds the (minimum latitude, maximum latitude, minimum longitude, maximum longitude)
+        of a bounding box, with NaN for the sources without bounding box. Realtime sources have
+        a row for each bounding box of their static references, so a source ID can span several
+        consecutive rows of the array.
+
+        Returns:
+            tuple: The source ID of each row as a numpy.ndarray, in ascending order,
+                and the (N, 4) float64 numpy.ndarray of the bounding boxes.
+        """
+        if self.bounding_box_array is None:
+            source_ids = []
+            bounding_boxes = []
+            boxes_by_id = {
+                source_id: source.get_bounding_boxes() for source_id, source in self.iter_sources()
+            }
+            for source_id in sorted(boxes_by_id):
+                source_boxes = boxes_by_id[source_id]
+                if len(source_boxes) == 0:
+                    source_boxes = [(np.nan, np.nan, np.nan, np.nan)]
+                source_ids.extend([source_id] * len(source_boxes))
+                bounding_boxes.extend(source_boxes)
+            self.bounding_box_ids = np.array(source_ids, dtype=np.int64)
+            self.bounding_box_array = np.array(bounding_boxes, dtype=np.float64).reshape(-1, 4)
+        return self.bounding_box_ids, self.bounding_box_array
+
+    def get_bounding_boxes_mask(self, bounding_boxes):
+        """
+        Test which sources overlap each of the given bounding boxes, in a single vectorized pass.
+
+        The overlapping test is the one of `are_overlapping_boxes`: touching boxes are not
+        overlapping, and a missing coordinate, in a source or in a filter box, never overlaps.
+
+        Args:
+            bounding_boxes (list): The M bounding boxes, each one a tuple of
+                (minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude).
+
+        Returns:
+            tuple: The N source IDs as a numpy.ndarray, in ascending order, and the (M, N)
+                boolean numpy.ndarray which is True where a bounding box overlaps a source.
+        """
+        filter_boxes = np.array(bounding_boxes, dtype=np.float64).reshape(-1, 4)
+        row_ids, source_boxes = self.get_bounding_box_array()
+        if len(row_ids) == 0:
+            return row_ids, np.zeros((len(filter_boxes), 0), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            row_mask = (
+                (source_boxes[np.newaxis, :, 1] > filter_boxes[:, np.newaxis, 0])
+                & (filter_boxes[:, np.newaxis, 1] > source_boxes[np.newaxis, :, 0])
+                & (source_boxes[np.newaxis, :, 3] > filter_boxes[:, np.newaxis, 2])
+                & (filter_boxes[:, np.newaxis, 3] > source_boxes[np.newaxis, :, 2])
+            )
+        # Merge the rows of the sources having several bounding boxes
+        source_ids, first_rows = np.unique(row_ids, return_index=True)
+        return source_ids, np.logical_or.reduceat(row_mask, first_rows, axis=1)
+
+    def reindex(self, source_id):
+        """
+        Update the indexes already built for the given source, and the generation of the catalog.
+
+        The source is removed from the indexes if it is not in the catalog anymore.
+
+        Args:
+            source_id (int): The ID of the source to reindex.
+        """
+        self.generation += 1
+        source = self.catalog.get(source_id)
+        if self.indexes is not None:
+            if source is not None:
+                self.index_source(source_id, source)
+            else:
+                self.unindex_source(source_id)
+        if self.spatial_index is not None:
+            if source is not None:
+                self.spatial_index_source(source_id, source)
+            else:
+                self.spatial_unindex_source(source_id)
+        # The columnar array is rebuilt on its next use
+        self.bounding_box_ids = None
+        self.bounding_box_array = None
+        if self.sorted_ids is not None:
+            index = bisect_left(self.sorted_ids, source_id)
+            is_sorted = index < len(self.sorted_ids) and self.sorted_ids[index] == source_id
+            if source is not None and not is_sorted:
+                self.sorted_ids.insert(index, source_id)
+            elif source is None and is_sorted:
+                del self.sorted_ids[index]
+
+    def find_source_ids_by_bounding_box(
+        self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
+    ):
+        """
+        Find the IDs of the sources overlapping the given bounding box.
+
+        The spatial index narrows the search down to the candidate sources, which are then
+        checked with `is_overlapping_bounding_box`, since touching boxes are not overlapping.
+        Without the spatial index, or for an inverted bounding box, every source is checked
+        at once with the columnar array of bounding boxes.
+
+        Returns:
+            set: The IDs of the overlapping sources.
+        """
+        filter_box = [minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude]
+        if None in filter_box:
+            return set()
+        spatial_index = self.get_spatial_index()
+        if (
+            spatial_index is not None
+            and minimum_latitude <= maximum_latitude
+            and minimum_longitude <= maximum_longitude
+        ):
+            candidate_ids = set(
+                spatial_index.intersection(
+                    (minimum_longitude, minimum_latitude, maximum_longitude, maximum_latitude)
+                )
+            )
+        else:
+            source_ids, mask = self.get_bounding_boxes_mask([filter_box])
+            return set(source_ids[mask[0]].tolist())
+        return {
+            source_id
+            for source_id in candidate_ids
+            if self.catalog[source_id].is_overlapping_bounding_box(*filter_box)
         }
 
     def get_sources_by_bounding_box(
         self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
     ):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.is_overlapping_bounding_box(
-                minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids_by_bounding_box(
+                    minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
+                )
             )
         }
 
+    def get_sources_by_bounding_boxes(self, bounding_boxes):
+        return [
+            self.get_sources_by_bounding_box(*bounding_box)
+            for bounding_box in bounding_boxes
+        ]
+
     def get_sources_by_subdivision_name(self, subdivision_name):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_subdivision_name(subdivision_name)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids(SUBDIVISION_NAME, subdivision_name)
+            )
         }
 
     def get_sources_by_country_code(self, country_code):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_country_code(country_code)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids(COUNTRY_CODE, country_code)
+            )
         }
 
     def get_latest_datasets(self):
         return {
-            source_id: source.latest_url
-            for source_id, source in self.catalog.items()
-            if source.has_latest_dataset()
+            source_id: self.catalog[source_id].latest_url
+            for source_id in self.get_sorted_ids()
+            if self.catalog[source_id].has_latest_dataset()
         }
 
     def get_sources_by_feature(self, feature):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_feature(feature)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids(FEATURES, feature)
+            )
         }
 
     def get_sources_by_status(self, status):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_status(status)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids(STATUS, status)
+            )
         }
     
     def get_sources_by_is_official(self, is_official):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_is_official(is_official)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_source_ids(IS_OFFICIAL, is_official)
+            )
         }
 
+    def find_stable_source_ids(self):
+        return self.find_source_ids(IS_PRODUCER_URL_UNSTABLE, "False") | self.find_source_ids(
+            IS_PRODUCER_URL_UNSTABLE, None
+        )
+
     def get_sources_by_is_stable(self):
         return {
-            source_id: source.as_json()
-            for source_id, source in self.catalog.items()
-            if source.has_is_producer_url_unstable("False") or source.has_is_producer_url_unstable(None)
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(self.find_stable_source_ids())
         }
 
     def add(self, **kwargs):
@@ -296,6 +1395,7 @@ class SourcesCatalog(Catalog):
         entity = self.entity_cls.build(mdb_source_id=mdb_source_id, **kwargs)
         if isinstance(entity, self.entity_cls):
             self.catalog[mdb_source_id] = entity
+            self.reindex(mdb_source_id)
             self.save(entity)
         return self.catalog
 
@@ -305,9 +1405,66 @@ class SourcesCatalog(Catalog):
         if source is not None:
             entity = source.update(mdb_source_id=mdb_source_id, **kwargs)
             self.catalog[mdb_source_id] = entity
+            self.reindex(mdb_source_id)
             self.save(entity)
         return self.catalog
 
+    def refresh(self):
+        """
+        Reload the sources whose files changed since the catalog was last loaded.
+
+        This method stats the catalog directory and only parses the files that were
+        added or modified since the last load, and drops the sources whose files were
+        deleted. The catalog is patched in place, so the cost of a refresh is proportional
+        to the number of changes rather than to the size of the catalog.
+
+        Returns:
+            dict: The refreshed catalog.
+        """
+        catalog_path = os.path.join(self.root, self.path)
+        files = self.scan(catalog_path)
+        deleted_files = [file for file in self.files if file not in files]
+        modified_files = [file for file, state in files.items() if self.files.get(file) != state]
+        if len(deleted_files) == 0 and len(modified_files) == 0:
+            return self.catalog
+        if isinstance(self.catalog, LazyEntities):
+            source_ids = {
+                filename: source_id
+                for source_id, filename in self.catalog.filenames.items()
+            }
+        else:
+            source_ids = {
+                source.filename: source_id
+                for source_id, source in self.catalog.items()
+            }
+
+        def drop(file, source_id):
+            # The ID may have been taken since by the source of another file
+            if isinstance(self.catalog, LazyEntities):
+                filename = self.catalog.filenames.get(source_id)
+            else:
+                source = self.catalog.get(source_id)
+                filename = source.filename if source is not None else None
+            if filename == file:
+                del self.catalog[source_id]
+                self.reindex(source_id)
+
+        for file in deleted_files:
+            source_id = source_ids.get(file)
+            if source_id is not None:
+                drop(file, source_id)
+        for file in modified_files:
+            entity_json = self.read(os.path.join(catalog_path, file))
+            source_id = entity_json[MDB_SOURCE_ID]
+            previous_source_id = source_ids.get(file)
+            if previous_source_id is not None and previous_source_id != source_id:
+                # The ID of the source was changed in its file
+                drop(file, previous_source_id)
+            self.catalog[source_id] = self.entity_cls(filename=file, **entity_json)
+            self.reindex(source_id)
+        self.files = files
+        return self.catalog
+
     def save(self, entity):
         return to_json(
             path=os.path.join(
@@ -348,6 +1505,7 @@ class GtfsScheduleSourcesCatalog(SourcesCatalog):
             entity_cls=GtfsScheduleSource,
             root=os.path.join(PROJECT_ROOT, SOURCE_CATALOG_PATH_FROM_ROOT),
             path=GTFS_SCHEDULE_CATALOG_PATH,
+            snapshot=os.path.join(PROJECT_ROOT, GTFS_SCHEDULE_CATALOG_SNAPSHOT_PATH_FROM_ROOT),
             **kwargs,
         )
 
@@ -366,11 +1524,23 @@ class GtfsRealtimeSourcesCatalog(SourcesCatalog):
     GTFS realtime sources. It implements the Singleton pattern to ensure only one instance
     of the catalog exists throughout the application.
 
+    The realtime sources inherit their location, features and bounding boxes from their
+    static references, which are resolved once when the catalog is loaded. The indexes built
+    from them are dropped whenever the static catalog changes, to be rebuilt on their next use.
+
     Attributes:
         _instance (GtfsRealtimeSourcesCatalog): The single instance of this class.
+        static_generation (int): The generation of the static catalog the indexes were built from.
+        dependent_ids (dict): The IDs of the realtime sources referencing each static source,
+            keyed by static source ID, built on first use by `get_reference_index`.
+        referenced_ids (dict): The IDs of the static sources referenced by each realtime source,
+            keyed by realtime source ID.
     """
 
     _instance = None
+    static_generation = None
+    dependent_ids = None
+    referenced_ids = None
 
     def __init__(self, **kwargs):
         """
@@ -386,8 +1556,125 @@ class GtfsRealtimeSourcesCatalog(SourcesCatalog):
             entity_cls=GtfsRealtimeSource,
             root=os.path.join(PROJECT_ROOT, SOURCE_CATALOG_PATH_FROM_ROOT),
             path=GTFS_REALTIME_CATALOG_PATH,
+            snapshot=os.path.join(PROJECT_ROOT, GTFS_REALTIME_CATALOG_SNAPSHOT_PATH_FROM_ROOT),
             **kwargs,
         )
+        if self.static_generation is None:
+            self.static_generation = self.entity_cls.get_static_catalog().generation
+            # A lazy catalog only resolves the static references of the sources it parses
+            if not isinstance(self.catalog, LazyEntities):
+                for source in self.catalog.values():
+                    source.get_static_join()
+
+    def sync_static_sources(self):
+        """
+        Drop the indexes built from the static sources if the static catalog changed since.
+        """
+        static_generation = self.entity_cls.get_static_catalog().generation
+        if static_generation != self.static_generation:
+            self.static_generation = static_generation
+            self.indexes = None
+            self.indexed_values = None
+            self.spatial_index = None
+            self.spatial_boxes = None
+            self.bounding_box_ids = None
+            self.bounding_box_array = None
+            self.generation += 1
+
+    def get_indexes(self):
+        self.sync_static_sources()
+        return super().get_indexes()
+
+    def get_spatial_index(self):
+        self.sync_static_sources()
+        return super().get_spatial_index()
+
+    def get_bounding_box_array(self):
+        self.sync_static_sources()
+        return super().get_bounding_box_array()
+
+    @staticmethod
+    def to_static_source_id(static_source_id):
+        # The static references are stored as strings, while the catalogs are keyed by integers
+        if isinstance(static_source_id, str) and static_source_id.isdigit():
+            return int(static_source_id)
+        return static_source_id
+
+    def get_reference_index(self):
+        """
+        Get the index of the references between the realtime and the static sources,
+        building it on first use.
+
+        Returns:
+            dict: The sets of realtime source IDs referencing each static source, keyed by static source ID.
+        """
+        if self.dependent_ids is None:
+            self.dependent_ids = {}
+            self.referenced_ids = {}
+            for source_id, source in self.iter_sources():
+                self.reference_source(source_id, source)
+        return self.dependent_ids
+
+    def reference_source(self, source_id, source):
+        self.unreference_source(source_id)
+        static_reference = source.static_reference if source.static_reference is not None else []
+        referenced_ids = {
+            self.to_static_source_id(static_source_id) for static_source_id in static_reference
+        }
+        for static_source_id in referenced_ids:
+            self.dependent_ids.setdefault(static_source_id, set()).add(source_id)
+        self.referenced_ids[source_id] = referenced_ids
+
+    def unreference_source(self, source_id):
+        for static_source_id in self.referenced_ids.pop(source_id, set()):
+            dependent_ids = self.dependent_ids[static_source_id]
+            dependent_ids.discard(source_id)
+            if len(dependent_ids) == 0:
+                del self.dependent_ids[static_source_id]
+
+    def reindex(self, source_id):
+        super().reindex(source_id)
+        if self.dependent_ids is not None:
+            source = self.catalog.get(source_id)
+            if source is not None:
+                self.reference_source(source_id, source)
+            else:
+                self.unreference_source(source_id)
+
+    def find_dependent_source_ids(self, static_source_id):
+        """
+        Find the IDs of the realtime sources referencing the given static source.
+
+        Args:
+            static_source_id (int): The ID of the static source.
+
+        Returns:
+            set: The IDs of the realtime sources referencing the static source.
+        """
+        return set(
+            self.get_reference_index().get(self.to_static_source_id(static_source_id), set())
+        )
+
+    def find_referenced_source_ids(self, source_id):
+        """
+        Find the IDs of the static sources referenced by the given realtime source.
+
+        Args:
+            source_id (int): The ID of the realtime source.
+
+        Returns:
+            set: The IDs of the static sources referenced by the realtime source.
+        """
+        self.get_reference_index()
+        return set(self.referenced_ids.get(source_id, set()))
+
+    def get_dependent_sources(self, static_source_id):
+        return {
+            source_id: self.catalog[source_id].as_json()
+            for source_id in self.sort_source_ids(
+                self.find_dependent_source_ids(static_source_id)
+            )
+        }
 
     def __new__(cls, *args, **kwargs):
         if not isinstance(cls._instance, cls):
@@ -419,37 +1706,64 @@ class Source(ABC):
         api_key_parameter_name (str, optional): The name of the API key parameter, if applicable.
         license_url (str, optional): URL for the license information of the data.
         is_official (str, optional): Flag indicating if the source comes from the agency itself or not.
+        json_view (ImmutableDict, optional): The cached JSON representation of the source, reset by `update`.
 
     Note:
         This class is designed to be subclassed. Subclasses must implement
-        all abstract methods defined here.
+        all abstract methods defined here, and declare their own attributes in `__slots__`
+        since the catalogs keep thousands of sources alive. The values repeated across sources
+        are interned.
     """
-    
+
+    __slots__ = (
+        "mdb_source_id",
+        "data_type",
+        "provider",
+        "name",
+        "filename",
+        "features",
+        "status",
+        "is_official",
+        "is_producer_url_unstable",
+        "direct_download_url",
+        "authentication_type",
+        "authentication_info_url",
+        "api_key_parameter_name",
+        "license_url",
+        "json_view",
+    )
+
     def __init__(self, **kwargs):
         self.mdb_source_id = kwargs.pop(MDB_SOURCE_ID)
-        self.data_type = kwargs.pop(DATA_TYPE)
-        self.provider = kwargs.pop(PROVIDER)
+        self.data_type = intern_strings(kwargs.pop(DATA_TYPE))
+        self.provider = intern_strings(kwargs.pop(PROVIDER))
         self.name = kwargs.pop(NAME, None)
         self.filename = kwargs.pop(FILENAME)
-        self.features = kwargs.pop(FEATURES, None)
-        self.status = kwargs.pop(STATUS, None)
-        self.is_official = kwargs.pop(IS_OFFICIAL, None)
-        self.is_producer_url_unstable = kwargs.pop(IS_PRODUCER_URL_UNSTABLE, None)
+        self.features = intern_strings(kwargs.pop(FEATURES, None))
+        self.status = intern_strings(kwargs.pop(STATUS, None))
+        self.is_official = intern_strings(kwargs.pop(IS_OFFICIAL, None))
+        self.is_producer_url_unstable = intern_strings(
+            kwargs.pop(IS_PRODUCER_URL_UNSTABLE, None)
+        )
         urls = kwargs.get(URLS, {})
         self.direct_download_url = urls.pop(DIRECT_DOWNLOAD)
         self.authentication_type = urls.pop(AUTHENTICATION_TYPE, None)
         self.authentication_info_url = urls.pop(AUTHENTICATION_INFO, None)
         self.api_key_parameter_name = urls.pop(API_KEY_PARAMETER_NAME, None)
         self.license_url = urls.pop(LICENSE, None)
+        self.json_view = None
 
-    @abstractmethod
     def __str__(self):
-        pass
+        return json.dumps(self.as_json(), ensure_ascii=False)
 
     @abstractmethod
     def __repr__(self):
         pass
 
+    @abstractmethod
+    def get_attributes(self):
+        pass
+
     @abstractmethod
     def has_subdivision_name(self, subdivision_name):
         pass
@@ -473,6 +1787,14 @@ class Source(ABC):
     def has_is_producer_url_unstable(self, is_producer_url_unstable):
         return self.is_producer_url_unstable == is_producer_url_unstable
 
+    @abstractmethod
+    def get_index_values(self):
+        pass
+
+    @abstractmethod
+    def get_bounding_boxes(self):
+        pass
+
     @abstractmethod
     def is_overlapping_bounding_box(
         self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
@@ -497,8 +1819,64 @@ class Source(ABC):
     def schematize(cls, **kwargs):
         pass
 
+    def get_export_values(self):
+        """
+        Get the values of the source flattened into the export columns.
+
+        The strings are stripped, while the lists are kept as lists for the exports supporting them.
+        The redirects are exported both as a list and as the pipe-delimited IDs and comments.
+
+        Returns:
+            dict: The flattened values, keyed by export column.
+        """
+        return {
+            MDB_SOURCE_ID: self.mdb_source_id,
+            DATA_TYPE: flatten_value(self.data_type),
+            PROVIDER: flatten_value(self.provider),
+            NAME: flatten_value(self.name),
+            IS_OFFICIAL: flatten_value(self.is_official),
+            IS_PRODUCER_URL_UNSTABLE: flatten_value(self.is_producer_url_unstable),
+            URLS_DIRECT_DOWNLOAD: self.direct_download_url,
+            URLS_AUTHENTICATION_TYPE: self.authentication_type,
+            URLS_AUTHENTICATION_INFO: self.authentication_info_url,
+            URLS_API_KEY_PARAMETER_NAME: self.api_key_parameter_name,
+            URLS_LICENSE: self.license_url,
+            STATUS: flatten_value(self.status),
+            FEATURES: self.features,
+        }
+
+    @staticmethod
+    def get_redirect_values(redirects):
+        redirects = redirects if redirects is not None else []
+        return {
+            REDIRECTS: [
+                {
+                    REDIRECT_ID: str(redirect[REDIRECT_ID]),
+                    REDIRECT_COMMENT: redirect.get(REDIRECT_COMMENT),
+                }
+                for redirect in redirects
+            ],
+            REDIRECTS_ID: flatten_value(
+                "|".join(str(redirect[REDIRECT_ID]) for redirect in redirects)
+            ),
+            REDIRECTS_COMMENT: flatten_value(
+                "|".join(redirect.get(REDIRECT_COMMENT, "") for redirect in redirects)
+            ),
+        }
+
     def as_json(self):
-        return json.loads(self.__str__())
+        """
+        Get the schematized JSON representation of the source.
+
+        The representation is built once and cached as an immutable view until the next `update`,
+        so it can be shared between callers. Use `copy.deepcopy` to get a mutable copy.
+
+        Returns:
+            ImmutableDict: The JSON representation of the source.
+        """
+        if self.json_view is None:
+            self.json_view = freeze(self.schematize(**self.get_attributes()))
+        return self.json_view
 
 
 class GtfsScheduleSource(Source):
@@ -521,6 +1899,7 @@ class GtfsScheduleSource(Source):
         bbox_extracted_on (str): Date when the bounding box was extracted.
         latest_url (str): URL for the latest version of the GTFS data.
         feed_contact_email (str, optional): Contact email for the GTFS feed.
+        note (str, optional): Additional notes or comments about this schedule source.
         redirects (list): List of redirect URLs, if any.
 
     Note:
@@ -528,6 +1907,21 @@ class GtfsScheduleSource(Source):
         mdb_source_id, data_type, provider, name, etc.
     """
 
+    __slots__ = (
+        "country_code",
+        "subdivision_name",
+        "municipality",
+        "bbox_min_lat",
+        "bbox_max_lat",
+        "bbox_min_lon",
+        "bbox_max_lon",
+        "bbox_extracted_on",
+        "latest_url",
+        "feed_contact_email",
+        "note",
+        "redirects",
+    )
+
     def __init__(self, **kwargs):
         """
         Initialize a GtfsScheduleSource instance.
@@ -546,9 +1940,9 @@ class GtfsScheduleSource(Source):
         """
         super().__init__(**kwargs)
         location = kwargs.pop(LOCATION, {})
-        self.country_code = location.pop(COUNTRY_CODE)
-        self.subdivision_name = location.pop(SUBDIVISION_NAME, None)
-        self.municipality = location.pop(MUNICIPALITY, None)
+        self.country_code = intern_strings(location.pop(COUNTRY_CODE))
+        self.subdivision_name = intern_strings(location.pop(SUBDIVISION_NAME, None))
+        self.municipality = intern_strings(location.pop(MUNICIPALITY, None))
         bounding_box = location.pop(BOUNDING_BOX, {})
         self.bbox_min_lat = bounding_box.pop(MINIMUM_LATITUDE)
         self.bbox_max_lat = bounding_box.pop(MAXIMUM_LATITUDE)
@@ -558,9 +1952,10 @@ class GtfsScheduleSource(Source):
         urls = kwargs.pop(URLS, {})
         self.latest_url = urls.pop(LATEST)
         self.feed_contact_email = kwargs.pop(FEED_CONTACT_EMAIL, None)
+        self.note = kwargs.pop(NOTE, None)
         self.redirects = kwargs.pop(REDIRECTS, [])
 
-    def __str__(self):
+    def get_attributes(self):
         attributes = {
             MDB_SOURCE_ID: self.mdb_source_id,
             DATA_TYPE: self.data_type,
@@ -583,11 +1978,32 @@ class GtfsScheduleSource(Source):
             FEATURES: self.features,
             STATUS: self.status,
             FEED_CONTACT_EMAIL: self.feed_contact_email,
+            NOTE: self.note,
             REDIRECTS: self.redirects,
             IS_OFFICIAL: self.is_official,
             IS_PRODUCER_URL_UNSTABLE: self.is_producer_url_unstable,
         }
-        return json.dumps(self.schematize(**attributes), ensure_ascii=False)
+        return attributes
+
+    def get_export_values(self):
+        values = super().get_export_values()
+        values.update(
+            {
+                LOCATION_COUNTRY_CODE: self.country_code,
+                LOCATION_SUBDIVISION_NAME: self.subdivision_name,
+                LOCATION_MUNICIPALITY: self.municipality,
+                LOCATION_MINIMUM_LATITUDE: self.bbox_min_lat,
+                LOCATION_MAXIMUM_LATITUDE: self.bbox_max_lat,
+                LOCATION_MINIMUM_LONGITUDE: self.bbox_min_lon,
+                LOCATION_MAXIMUM_LONGITUDE: self.bbox_max_lon,
+                LOCATION_EXTRACTED_ON: self.bbox_extracted_on,
+                URLS_LATEST: self.latest_url,
+                FEED_CONTACT_EMAIL: flatten_value(self.feed_contact_email),
+                NOTE: flatten_value(self.note),
+            }
+        )
+        values.update(self.get_redirect_values(self.redirects))
+        return values
 
     def __repr__(self):
         return f"GtfsScheduleSource({self.__str__()})"
@@ -607,6 +2023,25 @@ class GtfsScheduleSource(Source):
     def has_is_official(self, is_official):
         return self.is_official == is_official
 
+    def get_index_values(self):
+        return {
+            COUNTRY_CODE: {self.country_code},
+            SUBDIVISION_NAME: {self.subdivision_name},
+            FEATURES: set(self.features) if self.features is not None else set(),
+            STATUS: {self.status} if self.status is not None else {None, ACTIVE},
+            IS_OFFICIAL: {self.is_official},
+            IS_PRODUCER_URL_UNSTABLE: {self.is_producer_url_unstable},
+        }
+
+    def get_bounding_boxes(self):
+        bounding_box = (
+            self.bbox_min_lat,
+            self.bbox_max_lat,
+            self.bbox_min_lon,
+            self.bbox_max_lon,
+        )
+        return [bounding_box] if None not in bounding_box else []
+
     def is_overlapping_bounding_box(
         self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
     ):
@@ -625,6 +2060,9 @@ class GtfsScheduleSource(Source):
         return self.latest_url is not None
 
     def update(self, **kwargs):
+        # Invalidate the cached JSON representation
+        self.json_view = None
+
         # Update the authentication-related fields first
         authentication_type = kwargs.get(AUTHENTICATION_TYPE)
         if authentication_type is not None:
@@ -640,58 +2078,65 @@ class GtfsScheduleSource(Source):
         direct_download_url = kwargs.get(DIRECT_DOWNLOAD)
         api_key_parameter_value = kwargs.get(API_KEY_PARAMETER_VALUE)
         if direct_download_url is not None:
+            dataset_cache = get_dataset_cache()
             dataset_path = download_dataset(
                 url=direct_download_url,
                 authentication_type=authentication_type,
                 api_key_parameter_name=api_key_parameter_name,
                 api_key_parameter_value=api_key_parameter_value,
+                cache=dataset_cache,
             )
-            if is_readable(file_path=dataset_path, load_func=load_gtfs):
-                self.direct_download_url = direct_download_url
-                (
-                    self.bbox_min_lat,
-                    self.bbox_max_lat,
-                    self.bbox_min_lon,
-                    self.bbox_max_lon,
-                ) = extract_gtfs_bounding_box(file_path=dataset_path)
-                self.bbox_extracted_on = get_iso_time()
-            # Delete the downloaded dataset because we don't need it anymore
-            os.remove(dataset_path)
+            try:
+                if is_readable(file_path=dataset_path, load_func=load_gtfs):
+                    self.direct_download_url = direct_download_url
+                    (
+                        self.bbox_min_lat,
+                        self.bbox_max_lat,
+                        self.bbox_min_lon,
+                        self.bbox_max_lon,
+                    ) = extract_gtfs_bounding_box(file_path=dataset_path)
+                    self.bbox_extracted_on = get_iso_time()
+            finally:
+                # Release the downloaded dataset because we don't need it anymore
+                dataset_cache.release(dataset_path)
 
         # Update the other fields
         provider = kwargs.get(PROVIDER)
         if provider is not None:
-            self.provider = provider
+            self.provider = intern_strings(provider)
         name = kwargs.get(NAME)
         if name is not None:
             self.name = name
         country_code = kwargs.get(COUNTRY_CODE)
         if country_code is not None:
-            self.country_code = country_code
+            self.country_code = intern_strings(country_code)
         subdivision_name = kwargs.get(SUBDIVISION_NAME)
         if subdivision_name is not None:
-            self.subdivision_name = subdivision_name
+            self.subdivision_name = intern_strings(subdivision_name)
         municipality = kwargs.get(MUNICIPALITY)
         if municipality is not None:
-            self.municipality = municipality
+            self.municipality = intern_strings(municipality)
         license_url = kwargs.get(LICENSE)
         if license_url is not None:
             self.license_url = license_url
         features = kwargs.get(FEATURES)
         if features is not None:
-            self.features = features
+            self.features = intern_strings(features)
         status = kwargs.get(STATUS)
         if status is not None:
-            self.status = status
+            self.status = intern_strings(status)
         feed_contact_email = kwargs.get(FEED_CONTACT_EMAIL)
         if feed_contact_email is not None:
             self.feed_contact_email = feed_contact_email
         is_official = kwargs.get(IS_OFFICIAL)
         if is_official is not None:
-            self.is_official = is_official
+            self.is_official = intern_strings(is_official)
         is_producer_url_unstable = kwargs.get(IS_PRODUCER_URL_UNSTABLE)
         if is_producer_url_unstable is not None:
-            self.is_producer_url_unstable = is_producer_url_unstable
+            self.is_producer_url_unstable = intern_strings(is_producer_url_unstable)
+        note = kwargs.get(NOTE)
+        if note is not None:
+            self.note = note
 
         # Update the redirects
         redirects = kwargs.get(REDIRECTS)
@@ -711,25 +2156,30 @@ class GtfsScheduleSource(Source):
         authentication_type = kwargs.get(AUTHENTICATION_TYPE)
         api_key_parameter_name = kwargs.get(API_KEY_PARAMETER_NAME)
         api_key_parameter_value = kwargs.get(API_KEY_PARAMETER_VALUE)
+        dataset_cache = get_dataset_cache()
         dataset_path = download_dataset(
             direct_download_url,
             authentication_type,
             api_key_parameter_name,
             api_key_parameter_value,
+            cache=dataset_cache,
         )
-        if is_readable(file_path=dataset_path, load_func=load_gtfs):
-            data_type = GTFS
-            (
-                minimum_latitude,
-                maximum_latitude,
-                minimum_longitude,
-                maximum_longitude,
-            ) = extract_gtfs_bounding_box(file_path=dataset_path)
-            extracted_on = get_iso_time()
-
-            # Delete the downloaded dataset because we don't need it anymore
-            os.remove(dataset_path)
+        try:
+            is_readable_dataset = is_readable(file_path=dataset_path, load_func=load_gtfs)
+            if is_readable_dataset:
+                (
+                    minimum_latitude,
+                    maximum_latitude,
+                    minimum_longitude,
+                    maximum_longitude,
+                ) = extract_gtfs_bounding_box(file_path=dataset_path)
+                extracted_on = get_iso_time()
+        finally:
+            # Release the downloaded dataset because we don't need it anymore
+            dataset_cache.release(dataset_path)
 
+        if is_readable_dataset:
+            data_type = GTFS
             subdivision_name = kwargs.get(SUBDIVISION_NAME)
             subdivision_name = (
                 subdivision_name if subdivision_name is not None else UNKNOWN
@@ -784,6 +2234,7 @@ class GtfsScheduleSource(Source):
                     EXTRACTED_ON: kwargs.pop(EXTRACTED_ON),
                 },
             },
+            NOTE: kwargs.pop(NOTE, None),
             URLS: {
                 DIRECT_DOWNLOAD: kwargs.pop(DIRECT_DOWNLOAD),
                 AUTHENTICATION_TYPE: kwargs.pop(AUTHENTICATION_TYPE, None),
@@ -816,6 +2267,8 @@ class GtfsScheduleSource(Source):
             del schema[STATUS]
         if schema[FEED_CONTACT_EMAIL] is None:
             del schema[FEED_CONTACT_EMAIL]
+        if schema[NOTE] is None:
+            del schema[NOTE]
         if schema[REDIRECTS] is None:
             del schema[REDIRECTS]
         if schema[IS_OFFICIAL] is None:
@@ -836,18 +2289,31 @@ class GtfsRealtimeSource(Source):
 
     Attributes:
         static_catalog (GtfsScheduleSourcesCatalog): A catalog of GTFS schedule sources,
-            shared across all instances of this class.
+            shared across all instances of this class and loaded on first use.
         entity_type (str): The type of entity this realtime source represents 
             (e.g., 'vehicle positions', 'trip updates', 'service alerts').
         static_reference (str, optional): A reference to the related static GTFS data source.
         note (str, optional): Additional notes or comments about this realtime source.
+        feed_contact_email (str, optional): Contact email for the GTFS Realtime feed.
+        redirects (list, optional): List of redirects to other sources, if any.
+        static_join (tuple, optional): The generation of the static catalog and the attributes
+            inherited from the static sources, resolved by `get_static_join`.
 
     Note:
         This class inherits attributes from the Source base class, including
         mdb_source_id, data_type, provider, name, etc.
     """
 
-    static_catalog = GtfsScheduleSourcesCatalog()
+    __slots__ = (
+        "entity_type",
+        "static_reference",
+        "note",
+        "feed_contact_email",
+        "redirects",
+        "static_join",
+    )
+
+    static_catalog = None
 
     def __init__(self, **kwargs):
         """
@@ -858,24 +2324,28 @@ class GtfsRealtimeSource(Source):
 
         Args:
             **kwargs: Keyword arguments containing the source's attributes.
-                Expected keys include ENTITY_TYPE, STATIC_REFERENCE, and NOTE,
-                in addition to those required by the parent Source class.
+                Expected keys include ENTITY_TYPE, STATIC_REFERENCE, NOTE, FEED_CONTACT_EMAIL
+                and REDIRECTS, in addition to those required by the parent Source class.
 
         Raises:
             KeyError: If the required ENTITY_TYPE key is not provided in kwargs.
         """
         super().__init__(**kwargs)
-        self.entity_type = kwargs.pop(ENTITY_TYPE)
-        self.static_reference = kwargs.pop(STATIC_REFERENCE, None)
+        self.entity_type = intern_strings(kwargs.pop(ENTITY_TYPE))
+        self.static_reference = intern_strings(kwargs.pop(STATIC_REFERENCE, None))
         self.note = kwargs.pop(NOTE, None)
+        self.feed_contact_email = kwargs.pop(FEED_CONTACT_EMAIL, None)
+        self.redirects = kwargs.pop(REDIRECTS, None)
+        self.static_join = None
 
-    def __str__(self):
+    def get_attributes(self):
         attributes = {
             MDB_SOURCE_ID: self.mdb_source_id,
             DATA_TYPE: self.data_type,
             ENTITY_TYPE: self.entity_type,
             PROVIDER: self.provider,
             NAME: self.name,
+            FEED_CONTACT_EMAIL: self.feed_contact_email,
             STATIC_REFERENCE: self.static_reference,
             NOTE: self.note,
             DIRECT_DOWNLOAD: self.direct_download_url,
@@ -885,47 +2355,111 @@ class GtfsRealtimeSource(Source):
             LICENSE: self.license_url,
             FEATURES: self.features,
             STATUS: self.status,
+            REDIRECTS: self.redirects,
             IS_OFFICIAL: self.is_official,
         }
-        return json.dumps(self.schematize(**attributes), ensure_ascii=False)
+        return attributes
+
+    def get_export_values(self):
+        values = super().get_export_values()
+        values.update(
+            {
+                ENTITY_TYPE: self.entity_type,
+                STATIC_REFERENCE: self.static_reference,
+                NOTE: flatten_value(self.note),
+                FEED_CONTACT_EMAIL: flatten_value(self.feed_contact_email),
+            }
+        )
+        values.update(self.get_redirect_values(self.redirects))
+        # The location is only exported as unknown, for the sources without static reference
+        if not self.static_reference:
+            values.update(
+                {
+                    LOCATION_COUNTRY_CODE: UNKNOWN,
+                    LOCATION_SUBDIVISION_NAME: UNKNOWN,
+                    LOCATION_MUNICIPALITY: UNKNOWN,
+                }
+            )
+        return values
 
     def __repr__(self):
         return f"GtfsRealtimeSource({self.__str__()})"
 
+    @classmethod
+    def get_static_catalog(cls):
+        if cls.static_catalog is None:
+            cls.static_catalog = GtfsScheduleSourcesCatalog()
+        return cls.static_catalog
+
     @classmethod
     def get_static_sources(cls, static_reference):
+        static_catalog = cls.get_static_catalog()
         static_sources = []
         if static_reference is not None:
             static_sources = [
-                cls.static_catalog.get_source(str(source_id))
+                static_catalog.get_source(str(source_id))
                 for source_id in static_reference
             ]
+            # Ignore the references to sources which are not in the catalog
+            static_sources = [
+                static_source
+                for static_source in static_sources
+                if static_source is not None
+            ]
         return static_sources
 
+    def get_static_join(self):
+        """
+        Get the attributes inherited from the static sources, resolving them on first use.
+
+        The static references are resolved once and the result is kept until the static
+        catalog changes, or the static references of the source are updated.
+
+        Returns:
+            dict: The sets of country codes, subdivision names and features of the static sources,
+                the list of their bounding boxes, and the union bounding box of them all,
+                None if there is no bounding box.
+        """
+        static_generation = self.get_static_catalog().generation
+        if self.static_join is None or self.static_join[0] != static_generation:
+            static_sources = self.get_static_sources(self.static_reference)
+            bounding_boxes = [
+                bounding_box
+                for static_source in static_sources
+                for bounding_box in static_source.get_bounding_boxes()
+            ]
+            union_bounding_box = None
+            if len(bounding_boxes) > 0:
+                union_bounding_box = (
+                    min(bounding_box[0] for bounding_box in bounding_boxes),
+                    max(bounding_box[1] for bounding_box in bounding_boxes),
+                    min(bounding_box[2] for bounding_box in bounding_boxes),
+                    max(bounding_box[3] for bounding_box in bounding_boxes),
+                )
+            features = set()
+            for static_source in static_sources:
+                if static_source.features is not None:
+                    features.update(static_source.features)
+            static_join = {
+                COUNTRY_CODE: {static_source.country_code for static_source in static_sources},
+                SUBDIVISION_NAME: {
+                    static_source.subdivision_name for static_source in static_sources
+                },
+                FEATURES: features,
+                BOUNDING_BOXES: bounding_boxes,
+                BOUNDING_BOX: union_bounding_box,
+            }
+            self.static_join = (static_generation, static_join)
+        return self.static_join[1]
+
     def has_subdivision_name(self, subdivision_name):
-        static_sources = self.get_static_sources(self.static_reference)
-        return any(
-            static_source.subdivision_name == subdivision_name
-            for static_source in static_sources
-        )
+        return subdivision_name in self.get_static_join()[SUBDIVISION_NAME]
 
     def has_country_code(self, country_code):
-        static_sources = self.get_static_sources(self.static_reference)
-        return any(
-            static_source.country_code == country_code
-            for static_source in static_sources
-        )
+        return country_code in self.get_static_join()[COUNTRY_CODE]
 
     def has_feature(self, feature):
-        static_sources = self.get_static_sources(self.static_reference)
-        in_static_source = any(
-            [
-                feature in static_source.features
-                if static_source.features is not None
-                else False
-                for static_source in static_sources
-            ]
-        )
+        in_static_source = feature in self.get_static_join()[FEATURES]
         in_realtime_source = (
             feature in self.features if self.features is not None else False
         )
@@ -937,43 +2471,64 @@ class GtfsRealtimeSource(Source):
     def has_is_official(self, is_official):
         return self.is_official == is_official
 
+    def get_index_values(self):
+        static_join = self.get_static_join()
+        features = set(self.features) if self.features is not None else set()
+        return {
+            COUNTRY_CODE: set(static_join[COUNTRY_CODE]),
+            SUBDIVISION_NAME: set(static_join[SUBDIVISION_NAME]),
+            FEATURES: features | static_join[FEATURES],
+            STATUS: {self.status} if self.status is not None else {None, ACTIVE},
+            IS_OFFICIAL: {self.is_official},
+            IS_PRODUCER_URL_UNSTABLE: {self.is_producer_url_unstable},
+        }
+
+    def get_bounding_boxes(self):
+        return list(self.get_static_join()[BOUNDING_BOXES])
+
     def is_overlapping_bounding_box(
         self, minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude
     ):
-        static_sources = self.get_static_sources(self.static_reference)
+        static_join = self.get_static_join()
+        filter_box = (minimum_latitude, maximum_latitude, minimum_longitude, maximum_longitude)
+        # The union bounding box rejects most of the filter boxes in a single test
+        if static_join[BOUNDING_BOX] is None or not are_overlapping_boxes(
+            *static_join[BOUNDING_BOX], *filter_box
+        ):
+            return False
         return any(
-            are_overlapping_boxes(
-                source_minimum_latitude=static_source.bbox_min_lat,
-                source_maximum_latitude=static_source.bbox_max_lat,
-                source_minimum_longitude=static_source.bbox_min_lon,
-                source_maximum_longitude=static_source.bbox_max_lon,
-                filter_minimum_latitude=minimum_latitude,
-                filter_maximum_latitude=maximum_latitude,
-                filter_minimum_longitude=minimum_longitude,
-                filter_maximum_longitude=maximum_longitude,
-            )
-            for static_source in static_sources
+            are_overlapping_boxes(*bounding_box, *filter_box)
+            for bounding_box in static_join[BOUNDING_BOXES]
         )
 
     def has_latest_dataset(self):
         return False
 
     def update(self, **kwargs):
+        # Invalidate the cached JSON representation and static join
+        self.json_view = None
+        self.static_join = None
         entity_type = kwargs.get(ENTITY_TYPE)
         if entity_type is not None:
-            self.entity_type = entity_type
+            self.entity_type = intern_strings(entity_type)
         provider = kwargs.get(PROVIDER)
         if provider is not None:
-            self.provider = provider
+            self.provider = intern_strings(provider)
         name = kwargs.get(NAME)
         if name is not None:
             self.name = name
         static_reference = kwargs.get(STATIC_REFERENCE)
         if static_reference is not None:
-            self.static_reference = static_reference
+            self.static_reference = intern_strings(static_reference)
         note = kwargs.get(NOTE)
         if note is not None:
             self.note = note
+        feed_contact_email = kwargs.get(FEED_CONTACT_EMAIL)
+        if feed_contact_email is not None:
+            self.feed_contact_email = feed_contact_email
+        redirects = kwargs.get(REDIRECTS)
+        if redirects is not None:
+            self.redirects = redirects
         direct_download_url = kwargs.get(DIRECT_DOWNLOAD)
         if direct_download_url is not None:
             self.direct_download_url = direct_download_url
@@ -991,13 +2546,13 @@ class GtfsRealtimeSource(Source):
             self.license_url = license_url
         features = kwargs.get(FEATURES)
         if features is not None:
-            self.features = features
+            self.features = intern_strings(features)
         status = kwargs.get(STATUS)
         if status is not None:
-            self.status = status
+            self.status = intern_strings(status)
         is_official = kwargs.get(IS_OFFICIAL)
         if is_official is not None:
-            self.is_official = is_official
+            self.is_official = intern_strings(is_official)
         return self
 
     @classmethod
@@ -1045,6 +2600,7 @@ class GtfsRealtimeSource(Source):
             ENTITY_TYPE: kwargs.pop(ENTITY_TYPE),
             PROVIDER: kwargs.pop(PROVIDER),
             NAME: kwargs.pop(NAME, None),
+            FEED_CONTACT_EMAIL: kwargs.pop(FEED_CONTACT_EMAIL, None),
             STATIC_REFERENCE: kwargs.pop(STATIC_REFERENCE, None),
             NOTE: kwargs.pop(NOTE, None),
             FEATURES: kwargs.pop(FEATURES, None),
@@ -1056,10 +2612,13 @@ class GtfsRealtimeSource(Source):
                 API_KEY_PARAMETER_NAME: kwargs.pop(API_KEY_PARAMETER_NAME, None),
                 LICENSE: kwargs.pop(LICENSE, None),
             },
+            REDIRECTS: kwargs.pop(REDIRECTS, None),
             IS_OFFICIAL: kwargs.pop(IS_OFFICIAL, None),
         }
         if schema[NAME] is None:
             del schema[NAME]
+        if schema[FEED_CONTACT_EMAIL] is None:
+            del schema[FEED_CONTACT_EMAIL]
         if schema[NOTE] is None:
             del schema[NOTE]
         if schema[STATIC_REFERENCE] is None:
@@ -1076,6 +2635,8 @@ class GtfsRealtimeSource(Source):
             del schema[FEATURES]
         if schema[STATUS] is None:
             del schema[STATUS]
+        if schema[REDIRECTS] is None:
+            del schema[REDIRECTS]
         if schema[IS_OFFICIAL] is None:
             del schema[IS_OFFICIAL]
         return schema
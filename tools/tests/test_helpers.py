@@ -1,6 +1,19 @@
-from unittest import TestCase, skip
+import copy
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase, skip, skipIf
 from unittest.mock import patch, Mock
 
+import numpy as np
 import pandas as pd
 import requests
 from freezegun import freeze_time
@@ -21,8 +34,41 @@ from tools.helpers import (
     STOP_LON,
     to_json,
     from_json,
+    to_snapshot,
+    from_snapshot,
+    to_csv_chunks,
+    get_csv_rows,
+    to_csv_rows,
+    get_file_digest,
+    get_json_digest,
+    flatten_fields,
+    unflatten_fields,
+    to_binary_catalog,
+    BinaryCatalog,
+    to_arrow_chunks,
+    get_arrow_schema,
+    pa,
+    pq,
     normalize,
+    intern_strings,
+    flatten_value,
     download_dataset,
+    to_file_stream,
+    create_http_session,
+    get_http_session,
+    configure_http_session,
+    download_datasets,
+    load_download_validators,
+    save_download_validators,
+    DatasetCache,
+    fcntl,
+    get_dataset_cache,
+    configure_dataset_cache,
+    freeze,
+    thaw,
+    ImmutableDict,
+    ImmutableList,
+    ResultsCache,
 )
 
 
@@ -278,6 +324,23 @@ class TestCreationFunctions(TestCase):
         under_test = normalize(test_string)
         self.assertEqual(under_test, "source-provider")
 
+    def test_intern_strings(self):
+        test_string = "".join(["some_", "string"])
+        under_test = intern_strings(test_string)
+        self.assertIs(under_test, intern_strings("".join(["some_", "string"])))
+        under_test = intern_strings([test_string, "".join(["some_", "string"])])
+        self.assertIs(under_test[0], under_test[1])
+        self.assertIsNone(intern_strings(None))
+        self.assertEqual(intern_strings(1), 1)
+
+    def test_flatten_value(self):
+        self.assertEqual(flatten_value(["some_value", 1]), "some_value|1")
+        self.assertEqual(flatten_value(" some_value "), "some_value")
+        self.assertEqual(flatten_value([" some_value "]), "some_value")
+        self.assertEqual(flatten_value([]), [])
+        self.assertIsNone(flatten_value(None))
+        self.assertTrue(flatten_value(True))
+
     @freeze_time("2022-01-01")
     def test_get_iso_time(self):
         test_time = "2022-01-01T00:00:00+00:00"
@@ -285,6 +348,99 @@ class TestCreationFunctions(TestCase):
         self.assertEqual(under_test, test_time)
 
 
+class TestImmutableStructures(TestCase):
+    def setUp(self):
+        self.test_obj = {
+            "some_key": "some_value",
+            "some_list": ["some_element", {"some_nested_key": 1.5}],
+        }
+
+    def test_freeze(self):
+        under_test = freeze(self.test_obj)
+        self.assertIsInstance(under_test, ImmutableDict)
+        self.assertIsInstance(under_test["some_list"], ImmutableList)
+        self.assertIsInstance(under_test["some_list"][1], ImmutableDict)
+        self.assertEqual(under_test, self.test_obj)
+        self.assertEqual(json.dumps(under_test), json.dumps(self.test_obj))
+        self.assertRaises(TypeError, under_test.__setitem__, "some_key", None)
+        self.assertRaises(TypeError, under_test.update, {})
+        self.assertRaises(TypeError, under_test.pop, "some_key")
+        self.assertRaises(TypeError, under_test["some_list"].append, None)
+        self.assertRaises(TypeError, under_test["some_list"][1].clear)
+        self.test_obj["some_list"].append("some_other_element")
+        self.assertEqual(len(under_test["some_list"]), 2)
+
+    def test_thaw(self):
+        frozen = freeze(self.test_obj)
+        for under_test in [thaw(frozen), copy.deepcopy(frozen)]:
+            self.assertIs(type(under_test), dict)
+            self.assertIs(type(under_test["some_list"]), list)
+            self.assertIs(type(under_test["some_list"][1]), dict)
+            self.assertEqual(under_test, self.test_obj)
+
+    def test_pickle(self):
+        frozen = freeze(self.test_obj)
+        under_test = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(under_test, ImmutableDict)
+        self.assertIsInstance(under_test["some_list"], ImmutableList)
+        self.assertEqual(under_test, self.test_obj)
+
+
+class TestResultsCache(TestCase):
+    def setUp(self):
+        self.test_generation = Mock(return_value=0)
+        self.test_func = Mock(side_effect=lambda key, data_type: {"some_result": data_type})
+
+    def test_memoize(self):
+        instance = ResultsCache(max_size=2, get_generation=self.test_generation)
+        memoized = instance.memoize(lambda key, data_type="some_data_type": self.test_func(key, data_type))
+        under_test = memoized("some_key")
+        self.assertEqual(under_test, {"some_result": "some_data_type"})
+        under_test["some_other_key"] = "some_value"
+        self.assertEqual(memoized("some_key", data_type="some_data_type"), {"some_result": "some_data_type"})
+        self.assertEqual(self.test_func.call_count, 1)
+        self.assertEqual(instance.get_stats(), {"hits": 1, "misses": 1, "size": 1, "max_size": 2})
+        self.test_generation.assert_called_with(key="some_key", data_type="some_data_type")
+
+        self.test_generation.return_value = 1
+        memoized("some_key")
+        self.assertEqual(self.test_func.call_count, 2)
+
+        memoized("some_other_key")
+        memoized("yet_another_key")
+        self.assertEqual(len(instance.results), 2)
+        memoized("some_key")
+        self.assertEqual(self.test_func.call_count, 5)
+
+        memoized(["some_unhashable_key"])
+        memoized(["some_unhashable_key"])
+        self.assertEqual(self.test_func.call_count, 7)
+
+        instance.clear()
+        self.assertEqual(instance.get_stats(), {"hits": 0, "misses": 0, "size": 0, "max_size": 2})
+
+    def test_memoize_list(self):
+        instance = ResultsCache(max_size=2, get_generation=self.test_generation)
+        memoized = instance.memoize(lambda key: [self.test_func(key, "some_data_type")])
+        under_test = memoized("some_key")
+        under_test.append("some_value")
+        under_test.pop(0)
+        self.assertEqual(memoized("some_key"), [{"some_result": "some_data_type"}])
+        self.assertEqual(self.test_func.call_count, 1)
+
+    def test_memoize_threads(self):
+        instance = ResultsCache(max_size=4, get_generation=self.test_generation)
+        memoized = instance.memoize(lambda key: self.test_func(key, "some_data_type"))
+        keys = [f"key_{i % 8}" for i in range(400)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            under_test = list(executor.map(memoized, keys))
+        self.assertEqual(under_test, [{"some_result": "some_data_type"}] * len(keys))
+        stats = instance.get_stats()
+        self.assertEqual(stats["hits"] + stats["misses"], len(keys))
+        self.assertGreaterEqual(stats["misses"], 8)
+        self.assertEqual(stats["size"], 4)
+
+
 class TestGtfsSpecificFunctions(TestCase):
     def setUp(self):
         self.test_path = "some_path"
@@ -367,6 +523,396 @@ class TestGtfsSpecificFunctions(TestCase):
         self.assertEqual(under_test, test_bounding_box)
 
 
+class LocalHttpRequestHandler(BaseHTTPRequestHandler):
+    # Keep the connections alive between the requests
+    protocol_version = "HTTP/1.1"
+    content = b"some_content"
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        if self.path == "/missing":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/slow"):
+            # Record the largest number of concurrent requests to each host
+            host = self.headers["Host"].split(":")[0]
+            with self.server.lock:
+                self.server.active[host] += 1
+                self.server.max_active[host] = max(self.server.max_active[host], self.server.active[host])
+            time.sleep(0.05)
+            with self.server.lock:
+                self.server.active[host] -= 1
+        if self.path == "/etag":
+            self.server.conditional_headers.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(self.content)))
+            self.end_headers()
+            self.wfile.write(self.content)
+            return
+        if self.path == "/drop":
+            # Close the connection without any response
+            self.close_connection = True
+            return
+        if self.path == "/flaky" and self.server.failures > 0:
+            self.server.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(self.content)))
+        self.end_headers()
+        self.wfile.write(self.content)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpSession(TestCase):
+    def setUp(self):
+        self.test_server = ThreadingHTTPServer(("127.0.0.1", 0), LocalHttpRequestHandler)
+        self.test_server.client_ports = []
+        self.test_server.failures = 0
+        self.test_server.lock = threading.Lock()
+        self.test_server.active = Counter()
+        self.test_server.max_active = Counter()
+        self.test_server.conditional_headers = []
+        self.test_url = f"http://127.0.0.1:{self.test_server.server_address[1]}"
+        threading.Thread(target=self.test_server.serve_forever, daemon=True).start()
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_server.shutdown()
+        self.test_server.server_close()
+        self.test_dir.cleanup()
+
+    def test_connection_reuse(self):
+        test_session = create_http_session()
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            for _ in range(3):
+                under_test = download_dataset(f"{self.test_url}/dataset", 0, session=test_session)
+                with open(under_test, "rb") as fp:
+                    self.assertEqual(fp.read(), b"some_content")
+        test_session.close()
+        # The three downloads went through the same connection
+        self.assertEqual(len(self.test_server.client_ports), 3)
+        self.assertEqual(len(set(self.test_server.client_ports)), 1)
+
+    @patch("tools.helpers.time.sleep")
+    def test_retries(self, mock_sleep):
+        # The error statuses are retried with a backoff, and never without SSL verification
+        self.test_server.failures = 2
+        test_session = create_http_session(backoff_factor=0)
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name), warnings.catch_warnings(
+            record=True
+        ) as test_warnings:
+            warnings.simplefilter("always")
+            under_test = download_dataset(f"{self.test_url}/flaky", 0, session=test_session, return_digest=True)
+        self.assertEqual(
+            [str(warning.message) for warning in test_warnings if "SSL verification" in str(warning.message)], []
+        )
+        self.assertEqual(under_test[2], len(b"some_content"))
+        self.assertEqual(len(self.test_server.client_ports), 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+        # A dataset failing with an error status costs one request per attempt
+        self.test_server.client_ports.clear()
+        self.test_server.failures = 10
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            self.assertRaises(RequestException, download_dataset, f"{self.test_url}/flaky", 0, session=test_session)
+        self.assertEqual(len(self.test_server.client_ports), 3)
+
+        # A dataset failing to be read is retried by the session only, and not by the fallback attempts
+        self.test_server.client_ports.clear()
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            self.assertRaises(RequestException, download_dataset, f"{self.test_url}/drop", 0, session=test_session)
+        self.assertEqual(len(self.test_server.client_ports), 4)
+        test_session.close()
+
+    def test_download_datasets(self):
+        test_port = self.test_server.server_address[1]
+        test_datasets = {
+            source_id: f"http://{host}:{test_port}/slow/{source_id}"
+            for source_id, host in enumerate(["127.0.0.1"] * 6 + ["localhost"] * 6)
+        }
+        test_datasets[12] = {"url": f"{self.test_url}/missing", "authentication_type": 0}
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name), self.assertWarns(UserWarning):
+            under_test = dict(download_datasets(test_datasets, max_workers=6, max_workers_per_host=2))
+        self.assertEqual(set(under_test), set(test_datasets))
+        self.assertIsNone(under_test.pop(12))
+        for path in under_test.values():
+            with open(path, "rb") as fp:
+                self.assertEqual(fp.read(), b"some_content")
+        # Both hosts were downloaded from concurrently, within their limit
+        self.assertEqual(self.test_server.max_active, Counter({"127.0.0.1": 2, "localhost": 2}))
+
+    def test_download_datasets_same_host(self):
+        test_port = self.test_server.server_address[1]
+        test_datasets = {
+            source_id: f"http://{host}:{test_port}/slow/{source_id}"
+            for source_id, host in enumerate(["127.0.0.1"] * 12 + ["localhost"] * 4)
+        }
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            under_test = dict(
+                download_datasets(
+                    test_datasets,
+                    max_workers=8,
+                    max_workers_per_host=2,
+                    workers_by_host={f"127.0.0.1:{test_port}": 6},
+                )
+            )
+        self.assertEqual(set(under_test), set(test_datasets))
+        # The host with its own limit is downloaded from by more workers than the others
+        self.assertEqual(self.test_server.max_active, Counter({"127.0.0.1": 6, "localhost": 2}))
+
+    def test_download_datasets_archives_host(self):
+        # The latest datasets all share the archives host, which is downloaded from by all the workers
+        test_datasets = {
+            source_id: create_latest_url("US", "some_subdivision_name", "some_provider", "gtfs", source_id)
+            for source_id in range(32)
+        }
+        test_lock = threading.Lock()
+        test_active = Counter()
+
+        def download(url, **kwargs):
+            with test_lock:
+                test_active["active"] += 1
+                test_active["max_active"] = max(test_active["max_active"], test_active["active"])
+            time.sleep(0.05)
+            with test_lock:
+                test_active["active"] -= 1
+            return url
+
+        with patch("tools.helpers.download_dataset", side_effect=download):
+            under_test = dict(download_datasets(test_datasets))
+        self.assertEqual(under_test, test_datasets)
+        self.assertEqual(test_active["max_active"], 16)
+
+    def test_download_datasets_unexpected_error(self):
+        test_datasets = {source_id: f"{self.test_url}/dataset/{source_id}" for source_id in range(3)}
+
+        def download(url, **kwargs):
+            if url.endswith("/1"):
+                raise KeyError("some_key")
+            return url
+
+        with patch("tools.helpers.download_dataset", side_effect=download), self.assertWarns(UserWarning):
+            under_test = dict(download_datasets(test_datasets, max_workers=2, max_workers_per_host=1))
+        self.assertEqual(under_test, {0: test_datasets[0], 1: None, 2: test_datasets[2]})
+
+    def test_download_datasets_closed(self):
+        test_datasets = {source_id: f"{self.test_url}/slow/{source_id}" for source_id in range(6)}
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            under_test = download_datasets(test_datasets, max_workers=2, max_workers_per_host=2, max_pending=1)
+            source_id, path = next(under_test)
+            under_test.close()
+        # Only the yielded dataset is left, the others were not downloaded or were removed
+        self.assertEqual(os.listdir(self.test_dir.name), [os.path.basename(path)])
+        self.assertLess(len(self.test_server.client_ports), 6)
+
+    def test_download_dataset_validators(self):
+        test_session = create_http_session()
+        test_validators = {}
+        test_url = f"{self.test_url}/etag"
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            under_test = download_dataset(test_url, 0, session=test_session, validators=test_validators)
+            with open(under_test, "rb") as fp:
+                self.assertEqual(fp.read(), b"some_content")
+            self.assertEqual(
+                test_validators[test_url],
+                {
+                    "etag": '"v1"',
+                    "last_modified": None,
+                    "sha256": hashlib.sha256(b"some_content").hexdigest(),
+                    "size": 12,
+                },
+            )
+            test_validators[test_url]["end_date"] = "20240101"
+            under_test = download_dataset(test_url, 0, session=test_session, validators=test_validators)
+            self.assertIsNone(under_test)
+            under_test = download_dataset(
+                test_url, 0, session=test_session, validators=test_validators, return_digest=True
+            )
+            self.assertEqual(under_test, (None, hashlib.sha256(b"some_content").hexdigest(), 12))
+            self.assertEqual(self.test_server.conditional_headers, [None, '"v1"', '"v1"'])
+            self.assertEqual(test_validators[test_url]["end_date"], "20240101")
+        test_session.close()
+
+    def test_download_dataset_validators_same_digest(self):
+        test_session = create_http_session()
+        test_url = f"{self.test_url}/dataset"
+        test_validators = {
+            test_url: {
+                "etag": None,
+                "last_modified": None,
+                "sha256": hashlib.sha256(b"some_content").hexdigest(),
+                "size": 12,
+                "end_date": "20240101",
+            }
+        }
+        with patch("tools.helpers.os.getcwd", return_value=self.test_dir.name):
+            under_test = download_dataset(test_url, 0, session=test_session, validators=test_validators)
+            self.assertIsNone(under_test)
+            self.assertEqual(os.listdir(self.test_dir.name), [])
+            self.assertEqual(test_validators[test_url]["end_date"], "20240101")
+            test_validators[test_url]["sha256"] = "some_digest"
+            under_test = download_dataset(test_url, 0, session=test_session, validators=test_validators)
+            self.assertEqual(os.listdir(self.test_dir.name), [os.path.basename(under_test)])
+            self.assertNotIn("end_date", test_validators[test_url])
+        test_session.close()
+
+    def test_download_dataset_cache(self):
+        test_session = create_http_session()
+        test_cache = DatasetCache(os.path.join(self.test_dir.name, "cache"))
+        test_url = f"{self.test_url}/dataset"
+        under_test = download_dataset(test_url, 0, session=test_session, cache=test_cache)
+        self.assertEqual(
+            under_test, os.path.join(test_cache.objects_path, hashlib.sha256(b"some_content").hexdigest())
+        )
+        with open(under_test, "rb") as fp:
+            self.assertEqual(fp.read(), b"some_content")
+        test_cache.release(under_test)
+        self.assertTrue(os.path.exists(under_test))
+        another_under_test = download_dataset(
+            test_url, 0, session=test_session, cache=test_cache, return_digest=True
+        )
+        self.assertEqual(another_under_test, (under_test, hashlib.sha256(b"some_content").hexdigest(), 12))
+        self.assertEqual(len(self.test_server.client_ports), 1)
+        self.assertEqual(os.listdir(test_cache.tmp_path), [])
+        test_session.close()
+
+    def test_get_http_session(self):
+        with patch("tools.helpers.http_session", None):
+            under_test = get_http_session()
+            self.assertIs(get_http_session(), under_test)
+            test_session = configure_http_session(pool_maxsize=1)
+            self.assertIsNot(test_session, under_test)
+            self.assertIs(get_http_session(), test_session)
+            self.assertEqual(test_session.get_adapter("https://some_host")._pool_maxsize, 1)
+            test_session.close()
+
+
+class TestDownloadValidators(TestCase):
+    def test_download_validators(self):
+        test_validators = {"some_url": {"etag": '"v1"', "sha256": "some_digest", "size": 12}}
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "cache", "validators.json")
+            self.assertEqual(load_download_validators(test_path), {})
+            save_download_validators(test_path, test_validators)
+            self.assertEqual(load_download_validators(test_path), test_validators)
+            self.assertEqual(os.listdir(os.path.dirname(test_path)), ["validators.json"])
+            with open(test_path, "w") as fp:
+                fp.write("not json")
+            self.assertEqual(load_download_validators(test_path), {})
+
+
+class TestDatasetCache(TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+        self.test_cache = DatasetCache(os.path.join(self.test_dir.name, "cache"), max_size=30, max_age=60)
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def put(self, url, content):
+        file_path = self.test_cache.get_temporary_path()
+        with open(file_path, "wb") as fp:
+            fp.write(content)
+        return self.test_cache.put(url, file_path, hashlib.sha256(content).hexdigest(), len(content))
+
+    def test_put_and_get(self):
+        self.assertIsNone(self.test_cache.get("some_url"))
+        under_test = self.put("some_url", b"some_content")
+        self.assertEqual(os.path.basename(under_test), hashlib.sha256(b"some_content").hexdigest())
+        self.assertEqual(self.put("another_url", b"some_content"), under_test)
+        self.assertEqual(os.listdir(self.test_cache.objects_path), [os.path.basename(under_test)])
+        test_path, test_entry = self.test_cache.get("some_url")
+        self.assertEqual(test_path, under_test)
+        self.assertEqual(test_entry["size"], 12)
+        # The index is shared with the other caches of the same directory
+        test_path, _ = DatasetCache(self.test_cache.path).get("another_url")
+        self.assertEqual(test_path, under_test)
+
+    def test_get_stale(self):
+        self.put("some_url", b"some_content")
+        with patch("tools.helpers.time.time", return_value=time.time() + 120):
+            self.assertIsNone(self.test_cache.get("some_url"))
+
+    def test_release(self):
+        under_test = self.put("some_url", b"some_content")
+        self.test_cache.release(under_test)
+        self.assertTrue(os.path.exists(under_test))
+        test_path = os.path.join(self.test_dir.name, "some_dataset")
+        with open(test_path, "wb") as fp:
+            fp.write(b"some_content")
+        self.test_cache.release(test_path)
+        self.assertFalse(os.path.exists(test_path))
+        # A cached dataset released once too often is still kept, for its other users
+        self.test_cache.release(under_test)
+        self.assertTrue(os.path.exists(under_test))
+        self.assertEqual(self.test_cache.get("some_url")[0], under_test)
+
+    def test_evict(self):
+        test_paths = []
+        for i, content in enumerate([b"some_content", b"other_content"]):
+            test_paths.append(self.put(f"url_{i}", content))
+            self.test_cache.release(test_paths[-1])
+            os.utime(test_paths[-1], (i, i))
+        # The least recently used dataset is evicted, while the one in use is kept
+        under_test = self.put("url_2", b"another_content")
+        self.assertFalse(os.path.exists(test_paths[0]))
+        self.assertTrue(os.path.exists(test_paths[1]))
+        self.assertTrue(os.path.exists(under_test))
+        self.assertIsNone(self.test_cache.get("url_0"))
+        self.test_cache.release(under_test)
+        # The stale datasets are evicted
+        with patch("tools.helpers.time.time", return_value=time.time() + 120):
+            self.test_cache.evict()
+        self.assertEqual(os.listdir(self.test_cache.objects_path), [])
+        self.assertEqual(self.test_cache.load_index(), {})
+
+    @skipIf(fcntl is None, "File locks are not available")
+    def test_shared_directory(self):
+        # Another cache of the same directory stands for another process using the cache
+        another_cache = DatasetCache(self.test_cache.path, max_size=0, max_age=60)
+        another_cache.load_index()
+        under_test = self.put("some_url", b"some_content")
+        file_path = another_cache.get_temporary_path()
+        with open(file_path, "wb") as fp:
+            fp.write(b"other_content")
+        another_path = another_cache.put(
+            "another_url", file_path, hashlib.sha256(b"other_content").hexdigest(), 13
+        )
+        self.assertEqual(set(self.test_cache.load_index()), {"some_url", "another_url"})
+        another_cache.release(another_path)
+        # The dataset in use by the first cache is not evicted by the other one
+        another_cache.evict()
+        self.assertTrue(os.path.exists(under_test))
+        self.assertFalse(os.path.exists(another_path))
+        self.test_cache.release(under_test)
+        another_cache.evict()
+        self.assertFalse(os.path.exists(under_test))
+        self.assertEqual(self.test_cache.load_index(), {})
+
+    def test_get_dataset_cache(self):
+        with patch("tools.helpers.dataset_cache", None):
+            under_test = get_dataset_cache()
+            self.assertIs(get_dataset_cache(), under_test)
+            self.assertTrue(under_test.path.endswith(os.path.join(".cache", "datasets")))
+            test_cache = configure_dataset_cache(max_size=1)
+            self.assertIs(get_dataset_cache(), test_cache)
+            self.assertEqual(test_cache.path, under_test.path)
+            self.assertEqual(test_cache.max_size, 1)
+
+
 class TestInOutFunctions(TestCase):
     def setUp(self):
         self.test_url = "some_url"
@@ -374,7 +920,7 @@ class TestInOutFunctions(TestCase):
         self.test_obj = {"some_key": "some_value"}
 
     @patch("tools.helpers.open")
-    @patch("tools.helpers.json.dump")
+    @patch("tools.helpers.json.dumps")
     def test_to_json(self, mock_json, mock_open):
         under_test = to_json(path=self.test_path, obj=self.test_obj)
         self.assertIsNone(under_test)
@@ -390,14 +936,276 @@ class TestInOutFunctions(TestCase):
         mock_open.assert_called_once()
         mock_json.assert_called_once()
 
+    @patch("tools.helpers.open")
+    @patch("tools.helpers.pickle.dump")
+    @patch("tools.helpers.os")
+    def test_to_snapshot(self, mock_os, mock_pickle, mock_open):
+        under_test = to_snapshot(path=self.test_path, obj=self.test_obj)
+        self.assertIsNone(under_test)
+        mock_os.makedirs.assert_called_once()
+        mock_open.assert_called_once()
+        mock_pickle.assert_called_once()
+        mock_os.replace.assert_called_once()
+        self.assertEqual(mock_os.replace.call_args.args[1], self.test_path)
+
+    @patch("tools.helpers.open")
+    @patch("tools.helpers.pickle.load")
+    def test_from_snapshot(self, mock_pickle, mock_open):
+        mock_pickle.return_value = self.test_obj
+        under_test = from_snapshot(path=self.test_path)
+        self.assertEqual(under_test, self.test_obj)
+        mock_open.assert_called_once()
+        mock_pickle.assert_called_once()
+
+    @patch("tools.helpers.open")
+    def test_from_snapshot_missing(self, mock_open):
+        mock_open.side_effect = FileNotFoundError()
+        under_test = from_snapshot(path=self.test_path)
+        self.assertIsNone(under_test)
+
     @skip
     def test_to_csv(self):
         raise NotImplementedError
 
+    def test_to_csv_chunks(self):
+        test_chunks = [
+            pd.DataFrame({"some_column": [1, 2], "another_column": ["a", None]}),
+            pd.DataFrame({"some_column": [3], "another_column": ["c"]}),
+        ]
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_file.csv")
+            under_test = to_csv_chunks(path=test_path, chunks=iter(test_chunks))
+            self.assertEqual(under_test, 3)
+            with open(test_path, encoding="utf-8") as fp:
+                self.assertEqual(fp.read(), "some_column,another_column\n1,a\n2,\n3,c\n")
+            self.assertEqual(os.listdir(test_dir), ["some_file.csv"])
+
+    def test_get_csv_rows(self):
+        test_chunk = pd.DataFrame(
+            {"some_column": [1, 2], "another_column": ['some "quoted"\nvalue', "another_value"]}
+        )
+        under_test = get_csv_rows(test_chunk, header=True)
+        self.assertEqual(
+            under_test,
+            [
+                "some_column,another_column\n",
+                '1,"some ""quoted""\nvalue"\n',
+                "2,another_value\n",
+            ],
+        )
+        self.assertEqual(under_test, get_csv_rows(test_chunk[:0], header=True) + get_csv_rows(test_chunk))
+
+    def test_to_csv_rows(self):
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_file.csv")
+            under_test = to_csv_rows(path=test_path, rows=iter(["header\n", "1,a\n", "2,é\n", "3,c\n"]))
+            self.assertEqual(under_test, [(0, 7), (7, 4), (11, 5), (16, 4)])
+
+            # The unchanged rows are copied from the previous file, which can be the same one
+            under_test = to_csv_rows(
+                path=test_path,
+                rows=iter([(0, 7), (7, 4), "2,b\n", (16, 4), "4,d\n"]),
+                previous_path=test_path,
+            )
+            self.assertEqual(under_test, [(0, 7), (7, 4), (11, 4), (15, 4), (19, 4)])
+            with open(test_path, encoding="utf-8") as fp:
+                self.assertEqual(fp.read(), "header\n1,a\n2,b\n3,c\n4,d\n")
+            self.assertEqual(os.listdir(test_dir), ["some_file.csv"])
+
+            self.assertRaises(
+                OSError, to_csv_rows, path=test_path, rows=iter([(0, 7)]), previous_path="missing_path"
+            )
+            self.assertEqual(os.listdir(test_dir), ["some_file.csv"])
+
+    def test_get_file_digest(self):
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_file")
+            with open(test_path, "wb") as fp:
+                fp.write(b"some_content")
+            self.assertEqual(
+                get_file_digest(test_path),
+                "6a96df63699b6fdc947177979dfd37a099c705bc509a715060dbfd3b7b605dbe",
+            )
+            self.assertIsNone(get_file_digest(os.path.join(test_dir, "missing_file")))
+
+    def test_get_json_digest(self):
+        under_test = get_json_digest({"some_key": 1, "another_key": ["some_value"]})
+        self.assertEqual(len(under_test), 64)
+        self.assertEqual(under_test, get_json_digest({"another_key": ["some_value"], "some_key": 1}))
+        self.assertNotEqual(under_test, get_json_digest({"some_key": 2, "another_key": ["some_value"]}))
+
+    def test_flatten_fields(self):
+        test_obj = {
+            "mdb_source_id": 1,
+            "location": {"country_code": "CA", "bounding_box": {"minimum_latitude": 45.0}},
+            "features": ["fares-v2"],
+            "urls": {},
+        }
+        under_test = flatten_fields(test_obj)
+        self.assertEqual(
+            under_test,
+            [
+                ("mdb_source_id", 1),
+                ("location.country_code", "CA"),
+                ("location.bounding_box.minimum_latitude", 45.0),
+                ("features", ["fares-v2"]),
+                ("urls", {}),
+            ],
+        )
+        self.assertEqual(unflatten_fields(under_test), test_obj)
+
+    def test_binary_catalog(self):
+        test_entities = [
+            (
+                3,
+                {
+                    "mdb_source_id": 3,
+                    "data_type": "gtfs",
+                    "location": {
+                        "country_code": "CA",
+                        "bounding_box": {
+                            "minimum_latitude": 45.0,
+                            "maximum_latitude": 46.0,
+                            "minimum_longitude": None,
+                            "maximum_longitude": -73.0,
+                            "extracted_on": "2024-01-01T00:00:00+00:00",
+                        },
+                    },
+                    "features": ["fares-v2", "flex-v2"],
+                },
+            ),
+            (
+                1,
+                {
+                    "mdb_source_id": 1,
+                    "data_type": "gtfs-rt",
+                    "provider": "some_provider_éàç",
+                    "static_reference": [3],
+                    "redirect": [{"id": "2", "comment": "some_comment"}],
+                },
+            ),
+            (2, {"mdb_source_id": 2, "data_type": "gtfs", "location": {"country_code": "CA"}, "features": []}),
+        ]
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_catalog.bin")
+            under_test = to_binary_catalog(test_path, iter(test_entities))
+            self.assertEqual(under_test, 3)
+            self.assertEqual(os.listdir(test_dir), ["some_catalog.bin"])
+            with BinaryCatalog(test_path) as test_catalog:
+                self.assertEqual(len(test_catalog), 3)
+                self.assertEqual(list(test_catalog.ids), [1, 2, 3])
+                for entity_id, entity in test_entities:
+                    self.assertIn(entity_id, test_catalog)
+                    # The entities are decoded with their fields in order
+                    self.assertEqual(json.dumps(test_catalog.get(entity_id)), json.dumps(entity))
+                self.assertNotIn(4, test_catalog)
+                self.assertIsNone(test_catalog.get(4))
+                self.assertEqual(list(test_catalog.bounding_boxes[2][[0, 1, 3]]), [45.0, 46.0, -73.0])
+                self.assertTrue(np.isnan(test_catalog.bounding_boxes[2][2]))
+                self.assertTrue(np.isnan(test_catalog.bounding_boxes[:2]).all())
+                self.assertEqual(test_catalog.dictionaries[test_catalog.fields.index("data_type")], ["gtfs", "gtfs-rt"])
+
+            with open(test_path, "r+b") as fp:
+                fp.write(b"some_file")
+            self.assertRaises(ValueError, BinaryCatalog, test_path)
+
+    @skipIf(pa is None, "pyarrow is not installed")
+    def test_get_arrow_schema(self):
+        under_test = get_arrow_schema(["mdb_source_id", "status", "features", "redirect"])
+        self.assertEqual(under_test.names, ["mdb_source_id", "status", "features", "redirect"])
+        self.assertTrue(pa.types.is_int64(under_test.field("mdb_source_id").type))
+        self.assertTrue(pa.types.is_dictionary(under_test.field("status").type))
+        self.assertTrue(pa.types.is_list(under_test.field("features").type))
+        self.assertTrue(pa.types.is_struct(under_test.field("redirect").type.value_type))
+
+    @skipIf(pa is None, "pyarrow is not installed")
+    def test_to_arrow_chunks(self):
+        test_schema = get_arrow_schema(["mdb_source_id", "is_official", "status", "features"])
+        test_chunks = [
+            {
+                "mdb_source_id": [1, 2],
+                "is_official": ["True", None],
+                "status": ["active", None],
+                "features": [["fares-v2", "flex-v2"], None],
+            },
+            {
+                "mdb_source_id": [3],
+                "is_official": [False],
+                "status": ["deprecated"],
+                "features": [[]],
+            },
+        ]
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_file.arrow")
+            under_test = to_arrow_chunks(path=test_path, chunks=test_chunks, schema=test_schema)
+            self.assertEqual(under_test, 3)
+            with pa.memory_map(test_path) as source:
+                test_table = pa.ipc.open_file(source).read_all()
+            self.assertEqual(test_table.column("is_official").to_pylist(), [True, None, False])
+            self.assertEqual(
+                test_table.column("status").to_pylist(), ["active", None, "deprecated"]
+            )
+            self.assertEqual(
+                test_table.column("features").to_pylist(), [["fares-v2", "flex-v2"], None, []]
+            )
+
+            test_path = os.path.join(test_dir, "some_file.parquet")
+            under_test = to_arrow_chunks(
+                path=test_path, chunks=test_chunks, schema=test_schema, file_format="parquet"
+            )
+            self.assertEqual(under_test, 3)
+            test_table = pq.read_table(test_path, columns=["mdb_source_id", "status"])
+            self.assertEqual(test_table.column_names, ["mdb_source_id", "status"])
+            self.assertEqual(test_table.column("mdb_source_id").to_pylist(), [1, 2, 3])
+            self.assertEqual(pq.ParquetFile(test_path).num_row_groups, 2)
+
+    def test_to_file_stream(self):
+        test_response = Mock(url=self.test_url, headers={"Content-Length": "12"})
+        test_response.iter_content.return_value = [b"some_", b"content"]
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "some_file")
+            under_test = to_file_stream(test_response, test_path, chunk_size=5)
+            self.assertEqual(under_test, (hashlib.sha256(b"some_content").hexdigest(), 12))
+            test_response.iter_content.assert_called_once_with(chunk_size=5)
+            with open(test_path, "rb") as fp:
+                self.assertEqual(fp.read(), b"some_content")
+
+            # The announced size is checked before streaming, and the streamed size while streaming
+            test_response.iter_content.reset_mock()
+            self.assertRaises(ValueError, to_file_stream, test_response, test_path, max_size=11)
+            test_response.iter_content.assert_not_called()
+            test_response.headers = {}
+            self.assertRaises(ValueError, to_file_stream, test_response, test_path, max_size=11)
+            self.assertEqual(os.listdir(test_dir), [])
+
+    @patch("tools.helpers.requests.Session.get")
+    def test_download_dataset_streaming(self, mock_requests):
+        mock_requests.return_value.headers = {}
+        mock_requests.return_value.iter_content.return_value = [b"some_", b"content"]
+        with tempfile.TemporaryDirectory() as test_dir, patch("tools.helpers.os.getcwd", return_value=test_dir):
+            under_test = download_dataset(
+                url=self.test_url, authentication_type=0, chunk_size=5, return_digest=True
+            )
+            self.assertEqual(
+                under_test,
+                (os.path.join(test_dir, os.listdir(test_dir)[0]), hashlib.sha256(b"some_content").hexdigest(), 12),
+            )
+            self.assertTrue(mock_requests.call_args.kwargs["stream"])
+            mock_requests.return_value.iter_content.assert_called_once_with(chunk_size=5)
+            mock_requests.return_value.close.assert_called_once()
+
+            # The size guard is not retried
+            os.remove(under_test[0])
+            self.assertRaises(
+                ValueError, download_dataset, url=self.test_url, authentication_type=0, max_size=11
+            )
+            self.assertEqual(mock_requests.call_count, 2)
+            self.assertEqual(os.listdir(test_dir), [])
+
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_auth_type_empty(
             self, mock_requests, mock_os, mock_uuid4, mock_open
     ):
@@ -423,7 +1231,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_auth_type_0(
             self, mock_requests, mock_os, mock_uuid4, mock_open
     ):
@@ -449,7 +1257,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_auth_type_1(
             self, mock_requests, mock_os, mock_uuid4, mock_open
     ):
@@ -478,7 +1286,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_auth_type_2(
             self, mock_requests, mock_os, mock_uuid4, mock_open
     ):
@@ -507,7 +1315,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_exception(
             self, mock_requests, mock_os, mock_uuid4, mock_open
     ):
@@ -528,12 +1336,13 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_403_fallback_success(self, mock_requests, mock_os, mock_uuid4, mock_open):
         response_403 = Mock(status_code=403)
         response_403.raise_for_status.side_effect = HTTPError(response=response_403)
 
-        response_200 = Mock(status_code=200, content=b"file_content")
+        response_200 = Mock(status_code=200, headers={})
+        response_200.iter_content.return_value = [b"file_content"]
 
         mock_requests.side_effect = [response_403, response_200]
         mock_os.path.join.return_value = self.test_path
@@ -547,7 +1356,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_403_fallback_failure(self, mock_requests, mock_os, mock_uuid4, mock_open):
         test_authentication_type = 0
         test_api_key_parameter_name = None
@@ -568,7 +1377,8 @@ class TestInOutFunctions(TestCase):
                           api_key_parameter_name=test_api_key_parameter_name,
                           api_key_parameter_value=test_api_key_parameter_value)
 
-        self.assertEqual(mock_requests.call_count, 3)
+        # The SSL verification is never disabled after a 403, so the fallback headers are the last attempt
+        self.assertEqual(mock_requests.call_count, 2)
         mock_os.path.join.assert_called_once()
         mock_os.getcwd.assert_called_once()
         mock_uuid4.assert_called_once()
@@ -577,7 +1387,7 @@ class TestInOutFunctions(TestCase):
     @patch("tools.helpers.open")
     @patch("tools.helpers.uuid.uuid4")
     @patch("tools.helpers.os")
-    @patch("tools.helpers.requests.get")
+    @patch("tools.helpers.requests.Session.get")
     def test_download_dataset_ssl_error_fallback(self, mock_requests, mock_os, mock_uuid4, mock_open):
         test_authentication_type = 0
         test_api_key_parameter_name = None
@@ -585,7 +1395,8 @@ class TestInOutFunctions(TestCase):
 
         ssl_error = requests.exceptions.SSLError("SSL Certificate Verification Failed")
 
-        response_200 = Mock(status_code=200, content=b"file_content")
+        response_200 = Mock(status_code=200, headers={})
+        response_200.iter_content.return_value = [b"file_content"]
 
         mock_requests.side_effect = [ssl_error, response_200]
         mock_os.path.join.return_value = self.test_path
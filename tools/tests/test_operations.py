@@ -1,5 +1,6 @@
+from copy import deepcopy
 from unittest import TestCase, skip
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 from tools.operations import (
     ALL,
     add_gtfs_realtime_source,
@@ -7,18 +8,38 @@ from tools.operations import (
     add_gtfs_schedule_source,
     update_gtfs_schedule_source,
     get_sources,
+    merge_sources,
+    query,
+    export_to_csv,
+    export_to_arrow,
+    export_to_binary,
+    iter_sources_ndjson,
+    get_source_kwargs,
+    import_from_ndjson,
+    results_cache,
+    get_results_cache_stats,
     get_sources_by_bounding_box,
+    get_sources_by_bounding_boxes,
     get_sources_by_subdivision_name,
     get_sources_by_country_code,
     get_latest_datasets,
     get_sources_by_feature,
     get_sources_by_status,
     get_sources_by_is_official,
+    get_sources_by_is_stable,
+    get_dependent_realtime_sources,
+    get_referenced_schedule_sources,
     CATALOGS,
+    COUNTRY_CODE,
+    SourcesView,
+    SourcesQuery,
 )
 
 
 class TestOperations(TestCase):
+    def setUp(self):
+        results_cache.clear()
+
     @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
     def test_add_gtfs_realtime_source(self, mock_catalog):
         test_entity_type = ["test_entity_type"]
@@ -192,6 +213,209 @@ class TestOperations(TestCase):
         self.assertEqual(mock_realtime_catalog.call_count, 1)
         self.assertEqual(mock_realtime_catalog().get_sources.call_count, 1)
 
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_query(self, mock_schedule_catalog, mock_realtime_catalog):
+        under_test = query(data_type=ALL)
+        self.assertIsInstance(under_test, SourcesQuery)
+        self.assertEqual(
+            under_test.catalogs,
+            [mock_schedule_catalog.return_value, mock_realtime_catalog.return_value],
+        )
+        under_test = query(data_type="gtfs_rt")
+        self.assertEqual(under_test.catalogs, [mock_realtime_catalog.return_value])
+
+    @patch("tools.operations.SourcesExport", autospec=True)
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_export_to_csv(
+        self, mock_schedule_catalog, mock_realtime_catalog, mock_export
+    ):
+        mock_export.return_value.to_csv.return_value = 2
+        under_test = export_to_csv(path="some_path", data_type=ALL, incremental=True)
+        self.assertEqual(under_test, 2)
+        mock_export.assert_called_once_with(
+            [mock_schedule_catalog.return_value, mock_realtime_catalog.return_value],
+            columns=None,
+        )
+        mock_export.return_value.to_csv.assert_called_once_with("some_path", incremental=True)
+
+    @patch("tools.operations.SourcesExport", autospec=True)
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_export_to_arrow(
+        self, mock_schedule_catalog, mock_realtime_catalog, mock_export
+    ):
+        mock_export.return_value.to_arrow.return_value = 1
+        under_test = export_to_arrow(
+            path="some_path", data_type="gtfs", file_format="parquet"
+        )
+        self.assertEqual(under_test, 1)
+        mock_export.assert_called_once_with(
+            [mock_schedule_catalog.return_value], columns=None
+        )
+        mock_export.return_value.to_arrow.assert_called_once_with(
+            "some_path", file_format="parquet"
+        )
+
+    @patch("tools.operations.SourcesExport", autospec=True)
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_export_to_binary(
+        self, mock_schedule_catalog, mock_realtime_catalog, mock_export
+    ):
+        mock_export.return_value.to_binary.return_value = 1
+        under_test = export_to_binary(path="some_path", data_type="gtfs")
+        self.assertEqual(under_test, 1)
+        mock_export.assert_called_once_with([mock_schedule_catalog.return_value])
+        mock_export.return_value.to_binary.assert_called_once_with("some_path")
+
+    @patch("tools.operations.SourcesExport", autospec=True)
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_iter_sources_ndjson(
+        self, mock_schedule_catalog, mock_realtime_catalog, mock_export
+    ):
+        mock_export.return_value.iter_ndjson.return_value = iter(['{"mdb_source_id": 1}\n'])
+        under_test = list(iter_sources_ndjson(data_type="gtfs_rt"))
+        self.assertEqual(under_test, ['{"mdb_source_id": 1}\n'])
+        mock_export.assert_called_once_with([mock_realtime_catalog.return_value])
+
+    def test_get_source_kwargs(self):
+        test_source_json = {
+            "mdb_source_id": 1,
+            "provider": "some_provider",
+            "location": {
+                "country_code": "CA",
+                "bounding_box": {"minimum_latitude": 45.0},
+            },
+            "urls": {"direct_download": "some_url", "latest": "some_latest_url"},
+        }
+        under_test = get_source_kwargs(test_source_json)
+        self.assertEqual(
+            under_test,
+            {
+                "mdb_source_id": 1,
+                "provider": "some_provider",
+                "country_code": "CA",
+                "direct_download": "some_url",
+            },
+        )
+
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_import_from_ndjson(self, mock_schedule_catalog, mock_realtime_catalog):
+        test_schema = {
+            "mdb_source_id": 1,
+            "data_type": "gtfs-rt",
+            "provider": "some_provider",
+            "note": "some_note",
+            "urls": {"direct_download": "some_url"},
+        }
+        test_source = MagicMock()
+        test_source.mdb_source_id = 1
+        test_source.schematize.side_effect = lambda **kwargs: deepcopy(test_schema)
+        mock_realtime_catalog().get_source.side_effect = lambda source_id: (
+            test_source if source_id == 1 else None
+        )
+
+        # The realtime sources have no is_producer_url_unstable field to update
+        def update(mdb_source_id, **kwargs):
+            test_schema.update({key: kwargs[key] for key in ["provider"] if key in kwargs})
+
+        mock_realtime_catalog().update.side_effect = update
+        test_lines = [
+            '{"mdb_source_id": 1, "data_type": "gtfs-rt", "provider": "some_provider", "note": "some_note", '
+            '"urls": {"direct_download": "some_url"}}\n',
+            '{"mdb_source_id": 1, "data_type": "gtfs-rt", "provider": "another_provider", "note": "some_note", '
+            '"urls": {"direct_download": "some_url"}}\n',
+            "\n",
+            '{"data_type": "gtfs", "provider": "some_provider", "location": {"country_code": "CA"}, '
+            '"urls": {"direct_download": "some_url"}}\n',
+        ]
+        under_test = import_from_ndjson(test_lines)
+        self.assertEqual(under_test, {"added": 1, "updated": 1, "unchanged": 1})
+        mock_realtime_catalog().update.assert_called_once_with(
+            mdb_source_id=1, provider="another_provider"
+        )
+        test_lines = [
+            '{"mdb_source_id": 1, "data_type": "gtfs-rt", "provider": "another_provider", "note": "some_note", '
+            '"is_producer_url_unstable": "True", "urls": {"direct_download": "some_url"}}\n',
+        ]
+        with self.assertWarns(UserWarning):
+            under_test = import_from_ndjson(test_lines)
+        self.assertEqual(under_test, {"added": 0, "updated": 0, "unchanged": 1})
+        test_lines = [
+            '{"mdb_source_id": 1, "data_type": "gtfs-rt", "provider": "another_provider", '
+            '"urls": {"direct_download": "some_url"}}\n',
+        ]
+        with self.assertWarns(UserWarning):
+            under_test = import_from_ndjson(test_lines)
+        self.assertEqual(under_test, {"added": 0, "updated": 0, "unchanged": 1})
+        mock_schedule_catalog().add.assert_called_once_with(
+            provider="some_provider", country_code="CA", direct_download="some_url"
+        )
+        self.assertRaises(
+            ValueError, import_from_ndjson, ['{"data_type": "some_data_type"}\n']
+        )
+
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    def test_get_dependent_realtime_sources(self, mock_realtime_catalog):
+        mock_realtime_catalog().get_dependent_sources.return_value = {10: "some_source"}
+        under_test = get_dependent_realtime_sources(mdb_source_id=1)
+        self.assertEqual(under_test, {10: "some_source"})
+        mock_realtime_catalog().get_dependent_sources.assert_called_once_with(
+            static_source_id=1
+        )
+
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_get_referenced_schedule_sources(
+        self, mock_schedule_catalog, mock_realtime_catalog
+    ):
+        mock_realtime_catalog().find_referenced_source_ids.return_value = {1, 2}
+        mock_schedule_catalog().catalog = {1: "some_source"}
+        mock_schedule_catalog().view_sources.return_value = {1: "some_source"}
+        under_test = get_referenced_schedule_sources(mdb_source_id=10)
+        self.assertEqual(under_test, {1: "some_source"})
+        mock_schedule_catalog().view_sources.assert_called_once_with([1])
+
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_results_cache(self, mock_schedule_catalog, mock_realtime_catalog):
+        mock_schedule_catalog._instance = mock_schedule_catalog.return_value
+        mock_schedule_catalog._instance.generation = 0
+        mock_realtime_catalog._instance = None
+        mock_schedule_catalog().get_sources_by_feature.return_value = {1: "some_source"}
+        under_test = get_sources_by_feature(feature="fares-v2", data_type="gtfs")
+        self.assertEqual(under_test, {1: "some_source"})
+        under_test = get_sources_by_feature("fares-v2", "gtfs")
+        self.assertEqual(under_test, {1: "some_source"})
+        self.assertEqual(mock_schedule_catalog().get_sources_by_feature.call_count, 1)
+        self.assertEqual(get_results_cache_stats()["hits"], 1)
+
+        mock_schedule_catalog._instance.generation = 1
+        get_sources_by_feature(feature="fares-v2", data_type="gtfs")
+        self.assertEqual(mock_schedule_catalog().get_sources_by_feature.call_count, 2)
+        get_sources_by_feature(feature="fares-v1", data_type="gtfs")
+        self.assertEqual(mock_schedule_catalog().get_sources_by_feature.call_count, 3)
+        mock_realtime_catalog().get_sources_by_feature.assert_not_called()
+        self.assertEqual(get_results_cache_stats()["misses"], 3)
+
+    def test_merge_sources(self):
+        under_test = merge_sources(
+            [
+                {1: "some_source", 4: "another_source"},
+                {2: "some_other_source", 3: "yet_another_source"},
+            ]
+        )
+        self.assertEqual(list(under_test.items()), [
+            (1, "some_source"),
+            (2, "some_other_source"),
+            (3, "yet_another_source"),
+            (4, "another_source"),
+        ])
+
     @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
     @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
     def test_get_sources_by_bounding_box(
@@ -217,6 +441,38 @@ class TestOperations(TestCase):
             mock_realtime_catalog().get_sources_by_bounding_box.call_count, 1
         )
 
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_get_sources_by_bounding_boxes(
+        self, mock_schedule_catalog, mock_realtime_catalog
+    ):
+        test_bounding_boxes = [(1.0, 2.0, 3.0, 4.0), (5.0, 6.0, 7.0, 8.0)]
+        mock_schedule_catalog().get_sources_by_bounding_boxes.return_value = [
+            {2: "some_schedule_source"},
+            {},
+        ]
+        mock_realtime_catalog().get_sources_by_bounding_boxes.return_value = [
+            {1: "some_realtime_source"},
+            {3: "another_realtime_source"},
+        ]
+        under_test = get_sources_by_bounding_boxes(
+            bounding_boxes=test_bounding_boxes, data_type=ALL
+        )
+        self.assertEqual(
+            under_test,
+            [
+                {1: "some_realtime_source", 2: "some_schedule_source"},
+                {3: "another_realtime_source"},
+            ],
+        )
+        self.assertEqual(list(under_test[0]), [1, 2])
+        self.assertEqual(
+            mock_schedule_catalog().get_sources_by_bounding_boxes.call_count, 1
+        )
+        self.assertEqual(
+            mock_realtime_catalog().get_sources_by_bounding_boxes.call_count, 1
+        )
+
     @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
     @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
     def test_get_sources_by_subdivision_name(
@@ -253,6 +509,36 @@ class TestOperations(TestCase):
             mock_realtime_catalog().get_sources_by_country_code.call_count, 1
         )
 
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_get_sources_by_country_code_view(
+        self, mock_schedule_catalog, mock_realtime_catalog
+    ):
+        test_country_code = "test_country_code"
+        test_schedule_source = MagicMock()
+        test_schedule_source.as_json.return_value = {"some_key": "some_schedule_value"}
+        test_realtime_source = MagicMock()
+        test_realtime_source.as_json.return_value = {"some_key": "some_realtime_value"}
+        mock_schedule_catalog.return_value.catalog = {3: test_schedule_source}
+        mock_schedule_catalog.return_value.find_source_ids.return_value = {3}
+        mock_schedule_catalog.return_value.sort_source_ids.return_value = [3]
+        mock_realtime_catalog.return_value.catalog = {1: test_realtime_source}
+        mock_realtime_catalog.return_value.find_source_ids.return_value = {1}
+        mock_realtime_catalog.return_value.sort_source_ids.return_value = [1]
+        under_test = get_sources_by_country_code(
+            country_code=test_country_code, data_type=ALL, view=True
+        )
+        self.assertIsInstance(under_test, SourcesView)
+        self.assertEqual(list(under_test), [1, 3])
+        self.assertEqual(under_test[3], {"some_key": "some_schedule_value"})
+        self.assertEqual(under_test[1], {"some_key": "some_realtime_value"})
+        mock_schedule_catalog().find_source_ids.assert_called_once_with(
+            COUNTRY_CODE, test_country_code
+        )
+        mock_schedule_catalog().sort_source_ids.assert_called_once_with({3})
+        mock_schedule_catalog().get_sources_by_country_code.assert_not_called()
+        mock_realtime_catalog().get_sources_by_country_code.assert_not_called()
+
     @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
     @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
     def test_get_latest_datasets(self, mock_schedule_catalog, mock_realtime_catalog):
@@ -290,4 +576,12 @@ class TestOperations(TestCase):
         self.assertEqual(mock_schedule_catalog.call_count, 1)
         self.assertEqual(mock_schedule_catalog().get_sources_by_is_official.call_count, 1)
         self.assertEqual(mock_realtime_catalog.call_count, 1)
-        self.assertEqual(mock_realtime_catalog().get_sources_by_is_official.call_count, 1)
\ No newline at end of file
+        self.assertEqual(mock_realtime_catalog().get_sources_by_is_official.call_count, 1)
+
+    @patch("tools.operations.GtfsRealtimeSourcesCatalog", autospec=True)
+    @patch("tools.operations.GtfsScheduleSourcesCatalog", autospec=True)
+    def test_get_sources_by_is_stable(self, mock_schedule_catalog, mock_realtime_catalog):
+        mock_schedule_catalog().get_sources_by_is_stable.return_value = {1: "some_source", 3: "some_source"}
+        mock_realtime_catalog().get_sources_by_is_stable.return_value = {2: "another_source"}
+        under_test = get_sources_by_is_stable(data_type=ALL)
+        self.assertEqual(list(under_test.items()), [(1, "some_source"), (2, "another_source"), (3, "some_source")])
\ No newline at end of file
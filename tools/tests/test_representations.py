@@ -1,8 +1,16 @@
+import os
+import tempfile
+import numpy as np
+from types import SimpleNamespace
 from unittest import TestCase
 from unittest.mock import patch, MagicMock
 from copy import deepcopy
 from tools.representations import (
     Catalog,
+    LazyEntities,
+    SourcesView,
+    SourcesQuery,
+    SourcesExport,
     SourcesCatalog,
     GtfsScheduleSourcesCatalog,
     GtfsRealtimeSourcesCatalog,
@@ -30,6 +38,7 @@ from tools.representations import (
     URLS,
     LOCATION,
     BOUNDING_BOX,
+    BOUNDING_BOXES,
     STATIC_REFERENCE,
     AUTHENTICATION_TYPE,
     AUTHENTICATION_INFO,
@@ -40,6 +49,23 @@ from tools.representations import (
     STATUS,
     IS_OFFICIAL,
     IS_PRODUCER_URL_UNSTABLE,
+    SNAPSHOT_VERSION,
+    VERSION,
+    FILES,
+    ENTITIES,
+    THREAD,
+    PROCESS,
+    LAZY,
+    CACHE_SIZE,
+    UNKNOWN,
+    REDIRECTS,
+    LOCATION_COUNTRY_CODE,
+    LOCATION_MINIMUM_LATITUDE,
+    URLS_AUTHENTICATION_TYPE,
+    URLS_LATEST,
+    REDIRECTS_ID,
+    REDIRECTS_COMMENT,
+    PARQUET,
     json,
 )
 
@@ -54,6 +80,7 @@ class TestCatalog(TestCase):
         self.test_another_value = "another_value"
         self.test_obj = {self.test_key: self.test_value}
         self.test_another_obj = {self.test_key: self.test_another_value}
+        self.test_snapshot_path = "some_snapshot_path"
 
     @patch("tools.representations.os.walk")
     def test_identify(self, mock_walk):
@@ -108,6 +135,457 @@ class TestCatalog(TestCase):
         self.assertEqual(mock_open.call_count, 2)
         self.assertEqual(mock_json.call_count, 2)
 
+    @patch("tools.representations.os.stat")
+    @patch("tools.representations.os.walk")
+    def test_scan(self, mock_walk, mock_stat):
+        mock_walk.return_value = [
+            (
+                "/catalogs/sources/gtfs/schedule",
+                (),
+                (self.test_filename, self.test_another_filename),
+            ),
+        ]
+        mock_stat.return_value = MagicMock(st_mtime_ns=1, st_size=2)
+        under_test = Catalog.scan(catalog_path=self.test_path)
+        self.assertEqual(
+            under_test,
+            {self.test_filename: (1, 2), self.test_another_filename: (1, 2)},
+        )
+        self.assertEqual(mock_stat.call_count, 2)
+
+    @patch("tools.representations.to_snapshot")
+    @patch("tools.representations.from_snapshot")
+    @patch("tools.representations.Catalog.scan")
+    @patch("tools.representations.open")
+    def test_aggregate_fresh_snapshot(
+        self, mock_open, mock_scan, mock_from_snapshot, mock_to_snapshot
+    ):
+        test_files = {self.test_filename: (1, 2)}
+        mock_scan.return_value = test_files
+        mock_from_snapshot.return_value = {
+            VERSION: SNAPSHOT_VERSION,
+            FILES: test_files,
+            ENTITIES: [(self.test_filename, self.test_obj)],
+        }
+        under_test = Catalog.aggregate(
+            catalog_path=self.test_path,
+            id_key=self.test_key,
+            entity_cls=dict,
+            snapshot_path=self.test_snapshot_path,
+        )
+        self.assertEqual(
+            under_test,
+            {
+                self.test_value: {
+                    FILENAME: self.test_filename,
+                    self.test_key: self.test_value,
+                },
+            },
+        )
+        mock_open.assert_not_called()
+        mock_to_snapshot.assert_not_called()
+
+    @patch("tools.representations.to_snapshot")
+    @patch("tools.representations.from_snapshot")
+    @patch("tools.representations.Catalog.scan")
+    @patch("tools.representations.os.walk")
+    @patch("tools.representations.open")
+    @patch("tools.representations.json.load")
+    def test_aggregate_stale_snapshot(
+        self,
+        mock_json,
+        mock_open,
+        mock_walk,
+        mock_scan,
+        mock_from_snapshot,
+        mock_to_snapshot,
+    ):
+        test_files = {self.test_filename: (1, 2), self.test_another_filename: (3, 4)}
+        mock_scan.return_value = test_files
+        mock_from_snapshot.return_value = {
+            VERSION: SNAPSHOT_VERSION,
+            FILES: {self.test_filename: (1, 2)},
+            ENTITIES: [(self.test_filename, self.test_obj)],
+        }
+        mock_walk.return_value = [
+            (
+                "/catalogs/sources/gtfs/schedule",
+                (),
+                (self.test_filename, self.test_another_filename),
+            ),
+        ]
+        mock_json.side_effect = [self.test_obj, self.test_another_obj]
+        under_test = Catalog.aggregate(
+            catalog_path=self.test_path,
+            id_key=self.test_key,
+            entity_cls=dict,
+            snapshot_path=self.test_snapshot_path,
+        )
+        self.assertEqual(len(under_test), 2)
+        self.assertEqual(mock_json.call_count, 2)
+        mock_to_snapshot.assert_called_once()
+        self.assertEqual(
+            mock_to_snapshot.call_args.kwargs["obj"][FILES], test_files
+        )
+
+    def test_aggregate_parallel(self):
+        with tempfile.TemporaryDirectory() as catalog_path:
+            for index in range(10):
+                with open(os.path.join(catalog_path, f"source-{index}.json"), "w") as fp:
+                    json.dump({self.test_key: index}, fp)
+            expected = Catalog.aggregate(
+                catalog_path=catalog_path, id_key=self.test_key, entity_cls=dict
+            )
+            for test_executor in [THREAD, PROCESS]:
+                under_test = Catalog.aggregate(
+                    catalog_path=catalog_path,
+                    id_key=self.test_key,
+                    entity_cls=dict,
+                    max_workers=2,
+                    executor=test_executor,
+                )
+                self.assertEqual(under_test, expected)
+                self.assertEqual(list(under_test), list(expected))
+
+    @patch("tools.representations.Catalog.read")
+    def test_index(self, mock_read):
+        test_files = {"some-source-gtfs-12.json": (1, 1), "some-source.json": (1, 1)}
+        mock_read.return_value = {self.test_key: 13}
+        under_test = Catalog.index(
+            catalog_path=self.test_path,
+            id_key=self.test_key,
+            entity_cls=dict,
+            files=test_files,
+        )
+        self.assertIsInstance(under_test, LazyEntities)
+        self.assertEqual(
+            under_test.filenames,
+            {12: "some-source-gtfs-12.json", 13: "some-source.json"},
+        )
+        mock_read.assert_called_once()
+
+
+class TestLazyEntities(TestCase):
+    def setUp(self):
+        self.test_catalog_path = "some_path"
+        self.test_filenames = {1: "source-1.json", 2: "source-2.json"}
+
+    @patch("tools.representations.Catalog.read")
+    def test_get_item(self, mock_read):
+        mock_read.return_value = {MDB_SOURCE_ID: 1}
+        instance = LazyEntities(
+            catalog_path=self.test_catalog_path,
+            filenames=dict(self.test_filenames),
+            entity_cls=dict,
+        )
+        self.assertEqual(len(instance), 2)
+        self.assertEqual(list(instance), [1, 2])
+        mock_read.assert_not_called()
+        under_test = instance[1]
+        self.assertEqual(under_test, {FILENAME: "source-1.json", MDB_SOURCE_ID: 1})
+        self.assertIs(instance[1], under_test)
+        mock_read.assert_called_once()
+        self.assertIsNone(instance.get(3))
+
+    @patch("tools.representations.Catalog.read")
+    def test_cache_size(self, mock_read):
+        mock_read.side_effect = lambda path: {MDB_SOURCE_ID: path}
+        instance = LazyEntities(
+            catalog_path=self.test_catalog_path,
+            filenames=dict(self.test_filenames),
+            entity_cls=dict,
+            cache_size=1,
+        )
+        instance[1]
+        instance[2]
+        self.assertEqual(list(instance.entities), [2])
+        instance[1]
+        self.assertEqual(list(instance.entities), [1])
+        self.assertEqual(mock_read.call_count, 3)
+
+    @patch("tools.representations.Catalog.read")
+    def test_peek(self, mock_read):
+        mock_read.side_effect = lambda path: {MDB_SOURCE_ID: path}
+        instance = LazyEntities(
+            catalog_path=self.test_catalog_path,
+            filenames=dict(self.test_filenames),
+            entity_cls=dict,
+            cache_size=1,
+        )
+        test_entity = instance[2]
+        self.assertIs(instance.peek(2), test_entity)
+        under_test = dict(instance.peek_items())
+        self.assertEqual(list(under_test), [1, 2])
+        self.assertIs(under_test[2], test_entity)
+        self.assertEqual(list(instance.entities), [2])
+        self.assertEqual(mock_read.call_count, 2)
+
+    def test_set_and_del_item(self):
+        test_entity = MagicMock(filename="source-3.json")
+        instance = LazyEntities(
+            catalog_path=self.test_catalog_path,
+            filenames=dict(self.test_filenames),
+            entity_cls=dict,
+        )
+        instance[3] = test_entity
+        self.assertIs(instance[3], test_entity)
+        self.assertEqual(instance.filenames[3], "source-3.json")
+        del instance[3]
+        self.assertNotIn(3, instance)
+        self.assertNotIn(3, instance.entities)
+
+
+class TestSourcesView(TestCase):
+    def setUp(self):
+        self.test_source = MagicMock()
+        self.test_source.as_json.return_value = {"some_json_key": "some_json_value"}
+        self.test_another_source = MagicMock()
+        self.test_another_source.as_json.return_value = {"some_json_key": "another_json_value"}
+        self.test_catalogs = [{2: self.test_source}, {1: self.test_another_source}]
+
+    def test_get_item(self):
+        instance = SourcesView(self.test_catalogs, [1, 2])
+        self.assertEqual(instance[2], {"some_json_key": "some_json_value"})
+        self.assertEqual(instance[1], {"some_json_key": "another_json_value"})
+        self.assertRaises(KeyError, instance.__getitem__, 3)
+        instance = SourcesView(self.test_catalogs, [2])
+        self.assertRaises(KeyError, instance.__getitem__, 1)
+
+    def test_iter_and_len(self):
+        instance = SourcesView(self.test_catalogs, [1, 2])
+        self.assertEqual(list(instance), [1, 2])
+        self.assertEqual(len(instance), 2)
+        self.assertIn(1, instance)
+        self.assertNotIn(3, instance)
+        self.assertEqual(
+            dict(instance),
+            {
+                1: {"some_json_key": "another_json_value"},
+                2: {"some_json_key": "some_json_value"},
+            },
+        )
+        self.test_source.as_json.assert_called_once()
+
+
+class TestSourcesQuery(TestCase):
+    def setUp(self):
+        self.test_sources = {source_id: MagicMock() for source_id in range(1, 5)}
+        for source_id, source in self.test_sources.items():
+            source.as_json.return_value = {MDB_SOURCE_ID: source_id}
+            source.is_overlapping_bounding_box.return_value = source_id != 2
+        self.test_catalog = MagicMock()
+        self.test_catalog.catalog = self.test_sources
+        self.test_catalog.get_indexes.return_value = {
+            COUNTRY_CODE: {"CA": {1, 2, 3}, "US": {4}},
+            STATUS: {"active": {1, 2, 4}},
+            FEATURES: {"fares-v2": {2, 3}},
+        }
+        self.test_catalog.sort_source_ids.side_effect = sorted
+        self.test_catalog.find_source_ids_by_bounding_box.return_value = {1, 3}
+
+    def test_where(self):
+        instance = SourcesQuery([self.test_catalog]).where(country_code="CA", status="active")
+        self.assertEqual(instance.find_source_ids(self.test_catalog), {1, 2})
+        instance = instance.where(feature="fares-v2")
+        self.assertEqual(instance.find_source_ids(self.test_catalog), {2})
+        instance = SourcesQuery([self.test_catalog]).where(country_code="some_country_code")
+        self.assertEqual(instance.find_source_ids(self.test_catalog), set())
+        self.assertRaises(ValueError, instance.where, provider="some_provider")
+
+    def test_within_bbox(self):
+        instance = SourcesQuery([self.test_catalog]).within_bbox(1.0, 2.0, 3.0, 4.0)
+        self.assertEqual(instance.find_source_ids(self.test_catalog), {1, 3})
+        self.test_catalog.find_source_ids_by_bounding_box.assert_called_once_with(
+            1.0, 2.0, 3.0, 4.0
+        )
+        instance = instance.where(country_code="CA", status="active")
+        self.assertEqual(instance.find_source_ids(self.test_catalog), {1})
+        # The bounding box is only evaluated on the sources matching the other filters
+        self.test_sources[3].is_overlapping_bounding_box.assert_not_called()
+        self.test_sources[4].is_overlapping_bounding_box.assert_not_called()
+
+    def test_get_sources(self):
+        test_another_catalog = MagicMock()
+        test_another_catalog.catalog = {0: MagicMock(), 5: MagicMock()}
+        test_another_catalog.catalog[0].as_json.return_value = {MDB_SOURCE_ID: 0}
+        test_another_catalog.get_indexes.return_value = {STATUS: {"active": {0}}}
+        test_another_catalog.sort_source_ids.side_effect = sorted
+        instance = SourcesQuery([self.test_catalog, test_another_catalog]).where(
+            status="active"
+        )
+        under_test = instance.get_sources()
+        self.assertEqual(list(under_test), [0, 1, 2, 4])
+        self.assertEqual(under_test[4], {MDB_SOURCE_ID: 4})
+        self.assertEqual(list(instance.view()), [0, 1, 2, 4])
+
+
+class TestSourcesExport(TestCase):
+    def setUp(self):
+        self.test_columns = [MDB_SOURCE_ID, NAME, LOCATION_MINIMUM_LATITUDE, URLS_AUTHENTICATION_TYPE]
+        self.test_catalogs = []
+        for source_ids in [[1, 3, 4], [2]]:
+            test_catalog = MagicMock()
+            test_catalog.catalog = {}
+            for source_id in source_ids:
+                test_catalog.catalog[source_id] = MagicMock()
+                test_catalog.catalog[source_id].get_export_values.return_value = {
+                    MDB_SOURCE_ID: source_id,
+                    NAME: f"some_name_{source_id}",
+                    LOCATION_MINIMUM_LATITUDE: 45.0 if source_id != 2 else None,
+                }
+            test_catalog.get_sorted_ids.return_value = source_ids
+            self.test_catalogs.append(test_catalog)
+
+    def test_iter_chunks(self):
+        instance = SourcesExport(self.test_catalogs, columns=self.test_columns, chunk_size=3)
+        under_test = list(instance.iter_chunks())
+        self.assertEqual([len(chunk) for chunk in under_test], [3, 1])
+        self.assertEqual(list(under_test[0].columns), self.test_columns)
+        self.assertEqual(list(under_test[0][MDB_SOURCE_ID]), [1, 2, 3])
+        self.assertEqual(str(under_test[0][MDB_SOURCE_ID].dtype), "Int64")
+        self.assertEqual(str(under_test[0][LOCATION_MINIMUM_LATITUDE].dtype), "float64")
+        self.assertTrue(np.isnan(under_test[0][LOCATION_MINIMUM_LATITUDE][1]))
+        self.assertTrue(under_test[1][URLS_AUTHENTICATION_TYPE].isna().all())
+
+        instance = SourcesExport([], columns=self.test_columns)
+        under_test = list(instance.iter_chunks())
+        self.assertEqual(len(under_test), 1)
+        self.assertEqual(list(under_test[0].columns), self.test_columns)
+
+    def test_to_csv(self):
+        instance = SourcesExport(self.test_catalogs, columns=self.test_columns, chunk_size=2)
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "sources.csv")
+            under_test = instance.to_csv(test_path)
+            self.assertEqual(under_test, 4)
+            with open(test_path, encoding="utf-8") as fp:
+                self.assertEqual(
+                    fp.read().splitlines(),
+                    [
+                        ",".join(self.test_columns),
+                        "1,some_name_1,45.0,",
+                        "2,some_name_2,,",
+                        "3,some_name_3,45.0,",
+                        "4,some_name_4,45.0,",
+                    ],
+                )
+
+    def test_to_csv_incremental(self):
+        for test_catalog in self.test_catalogs:
+            for source_id, test_source in test_catalog.catalog.items():
+                test_source.json_view = {MDB_SOURCE_ID: source_id}
+        instance = SourcesExport(self.test_catalogs, columns=self.test_columns, chunk_size=2)
+        with tempfile.TemporaryDirectory() as test_dir:
+            test_path = os.path.join(test_dir, "sources.csv")
+            under_test = instance.to_csv(test_path, incremental=True)
+            self.assertEqual(under_test, 4)
+            with open(f"{test_path}.manifest.json", encoding="utf-8") as fp:
+                test_manifest = json.load(fp)
+            self.assertEqual(test_manifest["columns"], self.test_columns)
+            self.assertEqual([row[0] for row in test_manifest["rows"]], [1, 2, 3, 4])
+
+            # Only the changed sources are flattened again
+            test_source = self.test_catalogs[0].catalog[3]
+            test_source.json_view = {MDB_SOURCE_ID: 3, NAME: "another_name_3"}
+            test_source.get_export_values.return_value = {MDB_SOURCE_ID: 3, NAME: 'another "name"\n3'}
+            del self.test_catalogs[0].catalog[4]
+            self.test_catalogs[0].get_sorted_ids.return_value = [1, 3]
+            for test_catalog in self.test_catalogs:
+                for another_source in test_catalog.catalog.values():
+                    another_source.get_export_values.reset_mock()
+            under_test = instance.to_csv(test_path, incremental=True)
+            self.assertEqual(under_test, 3)
+            test_source.get_export_values.assert_called_once()
+            self.test_catalogs[0].catalog[1].get_export_values.assert_not_called()
+            test_rows = [
+                ",".join(self.test_columns) + "\n",
+                "1,some_name_1,45.0,\n",
+                "2,some_name_2,,\n",
+                '3,"another ""name""\n3",,\n',
+            ]
+            with open(test_path, encoding="utf-8", newline="") as fp:
+                self.assertEqual(fp.read(), "".join(test_rows))
+            with open(f"{test_path}.manifest.json", encoding="utf-8") as fp:
+                test_manifest = json.load(fp)
+            test_offsets = [len("".join(test_rows[:index]).encode("utf-8")) for index in range(1, 5)]
+            self.assertEqual(
+                [row[2:] for row in test_manifest["rows"]],
+                [[offset, end - offset] for offset, end in zip(test_offsets, test_offsets[1:])],
+            )
+
+            # The whole file is rebuilt when it no longer matches its manifest
+            with open(test_path, "a", encoding="utf-8") as fp:
+                fp.write("some_row\n")
+            under_test = instance.to_csv(test_path, incremental=True)
+            self.assertEqual(under_test, 3)
+            self.test_catalogs[0].catalog[1].get_export_values.assert_called_once()
+            with open(test_path, encoding="utf-8", newline="") as fp:
+                self.assertEqual(fp.read(), "".join(test_rows))
+
+            # The whole file is rebuilt when the code of the export changed
+            self.test_catalogs[0].catalog[1].get_export_values.reset_mock()
+            instance.to_csv(test_path, incremental=True)
+            self.test_catalogs[0].catalog[1].get_export_values.assert_not_called()
+            with patch.object(SourcesExport, "code_digest", "another_code_digest"):
+                instance.to_csv(test_path, incremental=True)
+            self.test_catalogs[0].catalog[1].get_export_values.assert_called_once()
+            with open(test_path, encoding="utf-8", newline="") as fp:
+                self.assertEqual(fp.read(), "".join(test_rows))
+
+    def test_iter_ndjson(self):
+        test_source = self.test_catalogs[0].catalog[1]
+        test_source.json_view = {MDB_SOURCE_ID: 1, PROVIDER: "some_provider_éàç"}
+        for source_id in [3, 4]:
+            test_source = self.test_catalogs[0].catalog[source_id]
+            test_source.json_view = None
+            test_source.schematize.return_value = {MDB_SOURCE_ID: source_id}
+        self.test_catalogs[1].catalog[2].json_view = {MDB_SOURCE_ID: 2}
+        instance = SourcesExport(self.test_catalogs)
+        under_test = list(instance.iter_ndjson())
+        self.assertEqual(
+            under_test,
+            [
+                '{"mdb_source_id": 1, "provider": "some_provider_éàç"}\n',
+                '{"mdb_source_id": 2}\n',
+                '{"mdb_source_id": 3}\n',
+                '{"mdb_source_id": 4}\n',
+            ],
+        )
+        self.test_catalogs[0].catalog[1].schematize.assert_not_called()
+        # The JSON view is not cached by the export
+        self.assertIsNone(self.test_catalogs[0].catalog[3].json_view)
+
+    @patch("tools.representations.to_arrow_chunks")
+    @patch("tools.representations.get_arrow_schema")
+    def test_to_arrow(self, mock_schema, mock_to_arrow_chunks):
+        mock_to_arrow_chunks.side_effect = lambda path, chunks, **kwargs: sum(
+            len(chunk[MDB_SOURCE_ID]) for chunk in chunks
+        )
+        instance = SourcesExport(self.test_catalogs, chunk_size=3)
+        under_test = instance.to_parquet("some_path")
+        self.assertEqual(under_test, 4)
+        self.assertEqual(mock_to_arrow_chunks.call_args.kwargs["file_format"], PARQUET)
+        # The Arrow export keeps the redirects as a list instead of the pipe-delimited columns
+        self.assertIn(REDIRECTS, mock_schema.call_args.args[0])
+        self.assertNotIn(REDIRECTS_ID, mock_schema.call_args.args[0])
+
+    @patch("tools.representations.to_binary_catalog")
+    def test_to_binary(self, mock_to_binary_catalog):
+        for test_catalog in self.test_catalogs:
+            for source_id, test_source in test_catalog.catalog.items():
+                test_source.json_view = {MDB_SOURCE_ID: source_id}
+        mock_to_binary_catalog.side_effect = lambda path, entities: list(entities)
+        instance = SourcesExport(self.test_catalogs)
+        under_test = instance.to_binary("some_path")
+        self.assertEqual(
+            under_test, [(source_id, {MDB_SOURCE_ID: source_id}) for source_id in [1, 2, 3, 4]]
+        )
+
+
+class IndexedEntity(SimpleNamespace):
+    def get_index_values(self):
+        return {NAME: {getattr(self, NAME, None)}}
+
 
 class TestSourcesCatalog(TestCase):
     def setUp(self):
@@ -143,6 +621,72 @@ class TestSourcesCatalog(TestCase):
         under_test = instance.get_source(self.test_nonexistent_key)
         self.assertIsNone(under_test)
 
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_source_with_string_id(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.get_source(str(self.test_another_source_key))
+        self.assertEqual(under_test, self.test_another_source)
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_sorted_ids(self, mock_aggregate):
+        mock_aggregate.return_value = {
+            self.test_another_source_key: self.test_another_source,
+            self.test_source_key: self.test_source,
+        }
+        instance = SourcesCatalog(**self.test_kwargs)
+        self.assertEqual(instance.get_sorted_ids(), [0, 1])
+        instance.catalog[5] = MagicMock()
+        instance.catalog[3] = MagicMock()
+        instance.reindex(5)
+        instance.reindex(3)
+        instance.reindex(3)
+        self.assertEqual(instance.get_sorted_ids(), [0, 1, 3, 5])
+        del instance.catalog[self.test_another_source_key]
+        instance.reindex(self.test_another_source_key)
+        self.assertEqual(instance.get_sorted_ids(), [0, 3, 5])
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_sort_source_ids(self, mock_aggregate):
+        mock_aggregate.return_value = {source_id: MagicMock() for source_id in range(20, 0, -1)}
+        instance = SourcesCatalog(**self.test_kwargs)
+        self.assertEqual(instance.sort_source_ids({12}), [12])
+        self.assertEqual(instance.sort_source_ids({15, 3, 7, 9}), [3, 7, 9, 15])
+        self.assertEqual(instance.sort_source_ids(instance.catalog.keys()), list(range(1, 21)))
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_view_sources(self, mock_aggregate):
+        mock_aggregate.return_value = {
+            self.test_another_source_key: self.test_another_source,
+            self.test_source_key: self.test_source,
+        }
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.view_sources()
+        self.assertIsInstance(under_test, SourcesView)
+        self.assertEqual(list(under_test), [self.test_source_key, self.test_another_source_key])
+        under_test = instance.view_sources({self.test_another_source_key})
+        self.assertEqual(dict(under_test), {self.test_another_source_key: self.test_json})
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_index_source(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.get_index_values.return_value = {COUNTRY_CODE: {"CA"}}
+        self.test_another_source.get_index_values.return_value = {COUNTRY_CODE: {"CA"}}
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.find_source_ids(COUNTRY_CODE, "CA")
+        self.assertEqual(
+            under_test, {self.test_source_key, self.test_another_source_key}
+        )
+        self.test_source.get_index_values.return_value = {COUNTRY_CODE: {"US"}}
+        instance.index_source(self.test_source_key, self.test_source)
+        self.assertEqual(
+            instance.find_source_ids(COUNTRY_CODE, "CA"), {self.test_another_source_key}
+        )
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "US"), {self.test_source_key})
+        instance.unindex_source(self.test_source_key)
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "US"), set())
+        self.assertNotIn("US", instance.get_indexes()[COUNTRY_CODE])
+
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
@@ -160,7 +704,9 @@ class TestSourcesCatalog(TestCase):
     def test_get_sources_by_bounding_box(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
         self.test_source.is_overlapping_bounding_box.return_value = True
+        self.test_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
         self.test_another_source.is_overlapping_bounding_box.return_value = False
+        self.test_another_source.get_bounding_boxes.return_value = [(45.0, 45.5, -73.0, -72.5)]
         instance = SourcesCatalog(**self.test_kwargs)
         test_minimum_latitude = 43.00000
         test_maximum_latitude = 43.20000
@@ -173,12 +719,108 @@ class TestSourcesCatalog(TestCase):
             maximum_longitude=test_maximum_longitude,
         )
         self.assertEqual(under_test, {self.test_source_key: self.test_json})
+        self.test_source.is_overlapping_bounding_box.assert_called_once()
+        self.test_another_source.is_overlapping_bounding_box.assert_not_called()
+
+    @patch("tools.representations.RtreeIndex", None)
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_sources_by_bounding_box_without_spatial_index(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
+        self.test_another_source.get_bounding_boxes.return_value = [(45.0, 45.5, -73.0, -72.5)]
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.get_sources_by_bounding_box(43.0, 43.2, -81.5, -81.3)
+        self.assertEqual(under_test, {self.test_source_key: self.test_json})
+        self.assertIsNone(instance.spatial_index)
+        self.test_source.is_overlapping_bounding_box.assert_not_called()
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_bounding_box_array(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.get_bounding_boxes.return_value = [
+            (43.1, 43.3, -81.4, -81.2),
+            (45.0, 45.5, -73.0, -72.5),
+        ]
+        self.test_another_source.get_bounding_boxes.return_value = []
+        instance = SourcesCatalog(**self.test_kwargs)
+        source_ids, bounding_boxes = instance.get_bounding_box_array()
+        self.assertEqual(source_ids.tolist(), [0, 0, 1])
+        self.assertEqual(bounding_boxes.shape, (3, 4))
+        self.assertEqual(bounding_boxes[1].tolist(), [45.0, 45.5, -73.0, -72.5])
+        self.assertTrue(np.isnan(bounding_boxes[2]).all())
+        instance.reindex(self.test_another_source_key)
+        self.assertIsNone(instance.bounding_box_array)
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_bounding_boxes_mask(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.get_bounding_boxes.return_value = [
+            (43.1, 43.3, -81.4, -81.2),
+            (45.0, 45.5, -73.0, -72.5),
+        ]
+        self.test_another_source.get_bounding_boxes.return_value = []
+        instance = SourcesCatalog(**self.test_kwargs)
+        source_ids, under_test = instance.get_bounding_boxes_mask(
+            [
+                (43.0, 43.2, -81.5, -81.3),
+                (45.1, 45.2, -72.9, -72.8),
+                (43.3, 44.0, -81.5, -81.3),
+                (None, 44.0, -81.5, -81.3),
+            ]
+        )
+        self.assertEqual(source_ids.tolist(), [0, 1])
+        self.assertEqual(
+            under_test.tolist(),
+            [[True, False], [True, False], [False, False], [False, False]],
+        )
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_get_sources_by_bounding_boxes(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.is_overlapping_bounding_box.return_value = True
+        self.test_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
+        self.test_another_source.is_overlapping_bounding_box.return_value = True
+        self.test_another_source.get_bounding_boxes.return_value = [(45.0, 45.5, -73.0, -72.5)]
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.get_sources_by_bounding_boxes(
+            [(43.0, 43.2, -81.5, -81.3), (45.1, 45.2, -72.9, -72.8), (0.0, 1.0, 0.0, 1.0)]
+        )
+        self.assertEqual(
+            under_test,
+            [
+                {self.test_source_key: self.test_json},
+                {self.test_another_source_key: self.test_json},
+                {},
+            ],
+        )
+
+    @patch("tools.representations.Catalog.aggregate")
+    def test_reindex_spatial_index(self, mock_aggregate):
+        mock_aggregate.return_value = self.test_catalog
+        self.test_source.is_overlapping_bounding_box.return_value = True
+        self.test_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
+        self.test_another_source.get_bounding_boxes.return_value = []
+        instance = SourcesCatalog(**self.test_kwargs)
+        self.assertEqual(
+            instance.find_source_ids_by_bounding_box(43.0, 43.2, -81.5, -81.3),
+            {self.test_source_key},
+        )
+        self.test_source.get_bounding_boxes.return_value = [(10.0, 11.0, 10.0, 11.0)]
+        instance.reindex(self.test_source_key)
+        self.assertEqual(
+            instance.find_source_ids_by_bounding_box(43.0, 43.2, -81.5, -81.3), set()
+        )
+        del instance.catalog[self.test_source_key]
+        instance.reindex(self.test_source_key)
+        self.assertEqual(
+            instance.find_source_ids_by_bounding_box(10.0, 11.0, 10.0, 11.0), set()
+        )
 
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources_by_subdivision_name(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
-        self.test_source.has_subdivision_name.return_value = True
-        self.test_another_source.has_subdivision_name.return_value = False
+        self.test_source.get_index_values.return_value = {SUBDIVISION_NAME: {"Ontario"}}
+        self.test_another_source.get_index_values.return_value = {SUBDIVISION_NAME: {"Quebec"}}
         instance = SourcesCatalog(**self.test_kwargs)
         test_subdivision_name = "Ontario"
         under_test = instance.get_sources_by_subdivision_name(
@@ -189,8 +831,8 @@ class TestSourcesCatalog(TestCase):
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources_by_country_code(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
-        self.test_source.has_country_code.return_value = True
-        self.test_another_source.has_country_code.return_value = False
+        self.test_source.get_index_values.return_value = {COUNTRY_CODE: {"CA"}}
+        self.test_another_source.get_index_values.return_value = {COUNTRY_CODE: {"US"}}
         instance = SourcesCatalog(**self.test_kwargs)
         test_country_code = "CA"
         under_test = instance.get_sources_by_country_code(
@@ -212,8 +854,8 @@ class TestSourcesCatalog(TestCase):
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources_by_feature(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
-        self.test_source.has_feature.return_value = True
-        self.test_another_source.has_feature.return_value = False
+        self.test_source.get_index_values.return_value = {FEATURES: {"flex-v2"}}
+        self.test_another_source.get_index_values.return_value = {FEATURES: {"fares-v2"}}
         instance = SourcesCatalog(**self.test_kwargs)
         test_feature = "flex-v2"
         under_test = instance.get_sources_by_feature(feature=test_feature)
@@ -222,8 +864,8 @@ class TestSourcesCatalog(TestCase):
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources_by_status(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
-        self.test_source.has_status.return_value = True
-        self.test_another_source.has_status.return_value = False
+        self.test_source.get_index_values.return_value = {STATUS: {"active"}}
+        self.test_another_source.get_index_values.return_value = {STATUS: {"inactive"}}
         instance = SourcesCatalog(**self.test_kwargs)
         test_status = "active"
         under_test = instance.get_sources_by_status(status=test_status)
@@ -232,8 +874,8 @@ class TestSourcesCatalog(TestCase):
     @patch("tools.representations.Catalog.aggregate")
     def test_get_sources_by_is_official(self, mock_aggregate):
         mock_aggregate.return_value = self.test_catalog
-        self.test_source.has_is_official.return_value = True
-        self.test_another_source.has_is_official.return_value = False
+        self.test_source.get_index_values.return_value = {IS_OFFICIAL: {"True"}}
+        self.test_another_source.get_index_values.return_value = {IS_OFFICIAL: {"False"}}
         instance = SourcesCatalog(**self.test_kwargs)
         test_is_official = "True"
         under_test = instance.get_sources_by_is_official(is_official=test_is_official)
@@ -272,6 +914,84 @@ class TestSourcesCatalog(TestCase):
         mock_source.assert_called_once()
         mock_save.assert_called_once()
 
+    @patch("tools.representations.json.load")
+    @patch("tools.representations.open")
+    @patch("tools.representations.Catalog.scan")
+    @patch("tools.representations.Catalog.aggregate")
+    def test_refresh(self, mock_aggregate, mock_scan, mock_open, mock_json):
+        test_new_source_key = 2
+        test_new_source = MagicMock()
+        self.test_source.filename = "some-source.json"
+        self.test_another_source.filename = "another-source.json"
+        mock_aggregate.return_value = self.test_catalog
+        mock_scan.side_effect = [
+            {"some-source.json": (1, 1), "another-source.json": (1, 1)},
+            {"some-source.json": (1, 1), "new-source.json": (2, 2)},
+        ]
+        mock_json.return_value = {MDB_SOURCE_ID: test_new_source_key}
+        self.test_entity_cls.return_value = test_new_source
+        instance = SourcesCatalog(**self.test_kwargs)
+        under_test = instance.refresh()
+        self.assertEqual(
+            under_test,
+            {
+                self.test_source_key: self.test_source,
+                test_new_source_key: test_new_source,
+            },
+        )
+        mock_open.assert_called_once()
+        self.test_entity_cls.assert_called_once_with(
+            filename="new-source.json", mdb_source_id=test_new_source_key
+        )
+        self.assertEqual(
+            instance.files, {"some-source.json": (1, 1), "new-source.json": (2, 2)}
+        )
+
+    def test_refresh_changed_id(self):
+        with tempfile.TemporaryDirectory() as test_root:
+            os.makedirs(os.path.join(test_root, self.test_path))
+            test_paths = {}
+            # The filenames do not end with the IDs, which are then read from the files in lazy mode too
+            for source_id, filename in [(1, "some-source.json"), (2, "another-source.json")]:
+                test_paths[source_id] = os.path.join(test_root, self.test_path, filename)
+                with open(test_paths[source_id], "w") as fp:
+                    json.dump({MDB_SOURCE_ID: source_id}, fp)
+            for lazy in [False, True]:
+                test_kwargs = {ENTITY_CLS: IndexedEntity, ROOT: test_root, PATH: self.test_path, LAZY: lazy}
+                instance = SourcesCatalog(**test_kwargs)
+                instance.get_indexes()
+                # The ID of a source is changed in place, then back
+                for source_id, changed_id in [(1, 10), (10, 1)]:
+                    with open(test_paths[1], "w") as fp:
+                        json.dump({MDB_SOURCE_ID: changed_id, NAME: "some_name"}, fp)
+                    os.utime(test_paths[1], ns=(source_id, source_id))
+                    under_test = instance.refresh()
+                    expected_instance = SourcesCatalog(**test_kwargs)
+                    self.assertEqual(instance.get_indexes(), expected_instance.get_indexes())
+                    expected = expected_instance.catalog
+                    self.assertEqual(sorted(under_test), sorted(expected))
+                    self.assertNotIn(source_id, under_test)
+                    self.assertEqual(
+                        {key: under_test[key] for key in under_test},
+                        {key: expected[key] for key in expected},
+                    )
+
+    def test_lazy_indexes(self):
+        with tempfile.TemporaryDirectory() as test_root:
+            os.makedirs(os.path.join(test_root, self.test_path))
+            for source_id in range(10):
+                with open(os.path.join(test_root, self.test_path, f"source-{source_id}.json"), "w") as fp:
+                    json.dump({MDB_SOURCE_ID: source_id, NAME: f"name_{source_id % 2}"}, fp)
+            instance = SourcesCatalog(
+                **{ENTITY_CLS: IndexedEntity, ROOT: test_root, PATH: self.test_path, LAZY: True, CACHE_SIZE: 2}
+            )
+            test_source = instance.get_source(3)
+            under_test = instance.find_source_ids(NAME, "name_1")
+            self.assertEqual(under_test, {1, 3, 5, 7, 9})
+            # Building the indexes kept neither the scanned sources nor evicted the ones in use
+            self.assertEqual(list(instance.catalog.entities), [3])
+            self.assertIs(instance.get_source(3), test_source)
+
     @patch("tools.representations.to_json")
     @patch("tools.representations.Catalog.aggregate")
     def test_save(self, mock_aggregate, mock_func):
@@ -296,6 +1016,51 @@ class TestGtfsRealtimeSourcesCatalog(TestCase):
         under_test = GtfsRealtimeSourcesCatalog()
         self.assertTrue(under_test is test_singleton)
 
+    @patch.object(GtfsRealtimeSourcesCatalog, "_instance", None)
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    @patch("tools.representations.Catalog.aggregate")
+    def test_sync_static_sources(self, mock_aggregate, mock_static_catalog):
+        test_source = MagicMock()
+        test_source.get_index_values.return_value = {COUNTRY_CODE: {"CA"}}
+        mock_aggregate.return_value = {1: test_source}
+        mock_static_catalog.generation = 0
+        instance = GtfsRealtimeSourcesCatalog()
+        test_source.get_static_join.assert_called_once()
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "CA"), {1})
+        test_generation = instance.generation
+
+        test_source.get_index_values.return_value = {COUNTRY_CODE: {"US"}}
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "CA"), {1})
+        mock_static_catalog.generation = 1
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "CA"), set())
+        self.assertEqual(instance.find_source_ids(COUNTRY_CODE, "US"), {1})
+        self.assertEqual(instance.generation, test_generation + 1)
+
+    @patch.object(GtfsRealtimeSourcesCatalog, "_instance", None)
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    @patch("tools.representations.Catalog.aggregate")
+    def test_reference_index(self, mock_aggregate, mock_static_catalog):
+        test_source = MagicMock()
+        test_source.static_reference = ["1", "2"]
+        test_other_source = MagicMock()
+        test_other_source.static_reference = ["2"]
+        mock_aggregate.return_value = {10: test_source, 11: test_other_source}
+        mock_static_catalog.generation = 0
+        instance = GtfsRealtimeSourcesCatalog()
+        self.assertEqual(instance.get_reference_index(), {1: {10}, 2: {10, 11}})
+        self.assertEqual(instance.find_dependent_source_ids(2), {10, 11})
+        self.assertEqual(instance.find_dependent_source_ids("2"), {10, 11})
+        self.assertEqual(instance.find_dependent_source_ids(3), set())
+        self.assertEqual(instance.find_referenced_source_ids(10), {1, 2})
+
+        test_other_source.static_reference = ["3"]
+        instance.reindex(11)
+        self.assertEqual(instance.get_reference_index(), {1: {10}, 2: {10}, 3: {11}})
+        del instance.catalog[10]
+        instance.reindex(10)
+        self.assertEqual(instance.get_reference_index(), {3: {11}})
+        self.assertEqual(instance.find_referenced_source_ids(10), set())
+
 
 class TestGtfsScheduleSource(TestCase):
     def setUp(self):
@@ -466,6 +1231,37 @@ class TestGtfsScheduleSource(TestCase):
         under_test = instance.has_status(status=test_another_status)
         self.assertFalse(under_test)
 
+    def test_get_bounding_boxes(self):
+        instance = GtfsScheduleSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_bounding_boxes()
+        self.assertEqual(
+            under_test,
+            [(self.test_min_lat, self.test_max_lat, self.test_min_lon, self.test_max_lon)],
+        )
+        instance.bbox_min_lat = None
+        under_test = instance.get_bounding_boxes()
+        self.assertEqual(under_test, [])
+
+    def test_get_index_values(self):
+        instance = GtfsScheduleSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_index_values()
+        self.assertEqual(
+            under_test,
+            {
+                COUNTRY_CODE: {self.test_country_code},
+                SUBDIVISION_NAME: {self.test_subdivision_name},
+                FEATURES: {self.test_feature},
+                STATUS: {self.test_status},
+                IS_OFFICIAL: {self.test_is_official},
+                IS_PRODUCER_URL_UNSTABLE: {self.test_is_producer_url_unstable},
+            },
+        )
+        instance.status = None
+        instance.features = None
+        under_test = instance.get_index_values()
+        self.assertEqual(under_test[STATUS], {None, "active"})
+        self.assertEqual(under_test[FEATURES], set())
+
     def test_has_is_official(self):
         test_is_official = self.test_is_official
         test_another_is_official = "some_other_is_official"
@@ -484,7 +1280,7 @@ class TestGtfsScheduleSource(TestCase):
         under_test = instance.has_is_producer_url_unstable(is_producer_url_unstable=test_another_is_producer_url_unstable)
         self.assertFalse(under_test)
 
-    @patch("tools.representations.os")
+    @patch("tools.representations.get_dataset_cache")
     @patch("tools.representations.get_iso_time")
     @patch("tools.representations.extract_gtfs_bounding_box")
     @patch("tools.representations.is_readable")
@@ -495,7 +1291,7 @@ class TestGtfsScheduleSource(TestCase):
         mock_read_func,
         mock_bounding_box,
         mock_time,
-        mock_os,
+        mock_cache,
     ):
         instance = GtfsScheduleSource(filename=self.test_filename, **self.test_schema)
         under_test = instance.update(**{})
@@ -554,8 +1350,10 @@ class TestGtfsScheduleSource(TestCase):
                 SUBDIVISION_NAME: test_subdivision_name,
                 MUNICIPALITY: test_municipality,
                 LICENSE: test_license_url,
+                NOTE: "another_note",
             }
         )
+        self.assertEqual(under_test.note, "another_note")
         self.assertEqual(under_test.direct_download_url, test_direct_download_url)
         self.assertEqual(under_test.authentication_type, test_authentication_type)
         self.assertEqual(
@@ -573,9 +1371,10 @@ class TestGtfsScheduleSource(TestCase):
         self.assertEqual(under_test.subdivision_name, test_subdivision_name)
         self.assertEqual(under_test.municipality, test_municipality)
         self.assertEqual(under_test.license_url, test_license_url)
-        mock_os.remove.assert_called_once()
+        self.assertEqual(mock_download_dataset.call_args.kwargs["cache"], mock_cache.return_value)
+        mock_cache.return_value.release.assert_called_once_with("some_dataset_path")
 
-    @patch("tools.representations.os")
+    @patch("tools.representations.get_dataset_cache")
     @patch("tools.representations.GtfsScheduleSource.schematize")
     @patch("tools.representations.create_latest_url")
     @patch("tools.representations.create_filename")
@@ -592,12 +1391,17 @@ class TestGtfsScheduleSource(TestCase):
         mock_filename,
         mock_latest_url,
         mock_schema,
-        mock_os,
+        mock_cache,
     ):
         mock_download_dataset.return_value = "some_dataset_path"
         mock_read_func.return_value = False
         under_test = GtfsScheduleSource.build(**self.test_kwargs)
         self.assertIsNone(under_test)
+        mock_cache.return_value.release.assert_called_once_with("some_dataset_path")
+        mock_read_func.side_effect = TypeError
+        self.assertRaises(TypeError, GtfsScheduleSource.build, **self.test_kwargs)
+        self.assertEqual(mock_cache.return_value.release.call_count, 2)
+        mock_read_func.side_effect = None
 
         mock_read_func.return_value = True
         mock_bounding_box.return_value = (
@@ -619,7 +1423,7 @@ class TestGtfsScheduleSource(TestCase):
         del self.test_kwargs[LATEST]
         under_test = GtfsScheduleSource.build(**self.test_kwargs)
         self.assertIsNotNone(under_test)
-        mock_os.remove.assert_called_once()
+        self.assertEqual(mock_cache.return_value.release.call_count, 3)
 
         del self.test_kwargs[NAME]
         del self.test_kwargs[LICENSE]
@@ -632,9 +1436,25 @@ class TestGtfsScheduleSource(TestCase):
         mock_schema.return_value = deepcopy(self.test_schema)
         under_test = GtfsScheduleSource.build(**self.test_kwargs)
         self.assertIsNotNone(under_test)
-        # os.remove should have been called twice at this point
-        # because we called build and entered the is_readable condition twice.
-        self.assertEqual(mock_os.remove.call_count, 2)
+        # The dataset should have been released at every call of build, readable or not.
+        self.assertEqual(mock_cache.return_value.release.call_count, 4)
+
+    def test_get_export_values(self):
+        test_schema = deepcopy(self.test_schema)
+        test_schema[REDIRECTS] = [{"id": 1, "comment": " some_comment"}, {"id": "2"}]
+        instance = GtfsScheduleSource(filename=self.test_filename, **test_schema)
+        under_test = instance.get_export_values()
+        self.assertEqual(under_test[MDB_SOURCE_ID], self.test_mdb_source_id)
+        self.assertEqual(under_test[LOCATION_COUNTRY_CODE], self.test_country_code)
+        self.assertEqual(under_test[LOCATION_MINIMUM_LATITUDE], self.test_min_lat)
+        self.assertEqual(under_test[URLS_LATEST], self.test_latest_url)
+        self.assertEqual(under_test[FEATURES], self.test_features)
+        self.assertEqual(
+            under_test[REDIRECTS],
+            [{"id": "1", "comment": " some_comment"}, {"id": "2", "comment": None}],
+        )
+        self.assertEqual(under_test[REDIRECTS_ID], "1|2")
+        self.assertEqual(under_test[REDIRECTS_COMMENT], "some_comment|")
 
     def test_schematize(self):
         under_test = GtfsScheduleSource.schematize(**self.test_kwargs)
@@ -657,16 +1477,26 @@ class TestGtfsScheduleSource(TestCase):
         under_test = GtfsScheduleSource.schematize(**self.test_kwargs)
         self.assertDictEqual(under_test, self.test_schema)
 
-    @patch("tools.representations.GtfsScheduleSource.__str__")
-    @patch("tools.representations.json.loads")
-    def test_as_json(self, mock_json, mock_str):
-        test_json = {"some_json_key": "some_json_value"}
-        mock_json.return_value = test_json
+    def test_slots(self):
+        instance = GtfsScheduleSource(filename=self.test_filename, **self.test_schema)
+        self.assertFalse(hasattr(instance, "__dict__"))
+        self.assertRaises(AttributeError, setattr, instance, "some_attribute", "some_value")
+
+    @patch("tools.representations.GtfsScheduleSource.schematize")
+    def test_as_json(self, mock_schema):
+        test_json = {"some_json_key": ["some_json_value"]}
+        mock_schema.return_value = test_json
         instance = GtfsScheduleSource(filename=self.test_filename, **self.test_schema)
         under_test = instance.as_json()
         self.assertEqual(under_test, test_json)
-        mock_json.assert_called_once()
-        mock_str.assert_called_once()
+        self.assertIs(instance.as_json(), under_test)
+        mock_schema.assert_called_once()
+        self.assertRaises(TypeError, under_test.__setitem__, "some_key", "some_value")
+        self.assertRaises(TypeError, under_test["some_json_key"].append, "some_value")
+
+        instance.update(name="some_updated_name")
+        self.assertIsNot(instance.as_json(), under_test)
+        self.assertEqual(mock_schema.call_count, 2)
 
 
 class TestGtfsRealtimeSource(TestCase):
@@ -796,36 +1626,77 @@ class TestGtfsRealtimeSource(TestCase):
 
     @patch("tools.representations.GtfsRealtimeSource.static_catalog")
     @patch("tools.representations.GtfsRealtimeSource.get_static_sources")
-    @patch("tools.representations.are_overlapping_boxes")
-    def test_is_overlapping_bounding_box(
-        self, mock_overlapping_func, mock_static_sources, mock_static_catalog
-    ):
-        test_minimum_latitude = 43.00000
-        test_maximum_latitude = 43.20000
-        test_minimum_longitude = -81.50000
-        test_maximum_longitude = -81.30000
-        mock_overlapping_func.side_effect = [True, False, False, False]
+    def test_is_overlapping_bounding_box(self, mock_static_sources, mock_static_catalog):
         test_static_source = MagicMock()
+        test_static_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
         test_another_static_source = MagicMock()
+        test_another_static_source.get_bounding_boxes.return_value = [(45.0, 45.5, -73.0, -72.5)]
         mock_static_sources.return_value = [
             test_static_source,
             test_another_static_source,
         ]
         instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
         under_test = instance.is_overlapping_bounding_box(
-            minimum_latitude=test_minimum_latitude,
-            maximum_latitude=test_maximum_latitude,
-            minimum_longitude=test_minimum_longitude,
-            maximum_longitude=test_maximum_longitude,
+            minimum_latitude=43.0,
+            maximum_latitude=43.2,
+            minimum_longitude=-81.5,
+            maximum_longitude=-81.3,
         )
         self.assertTrue(under_test)
+        # Inside the union bounding box, but outside both bounding boxes
         under_test = instance.is_overlapping_bounding_box(
-            minimum_latitude=test_minimum_latitude,
-            maximum_latitude=test_maximum_latitude,
-            minimum_longitude=test_minimum_longitude,
-            maximum_longitude=test_maximum_longitude,
+            minimum_latitude=44.0,
+            maximum_latitude=44.5,
+            minimum_longitude=-78.0,
+            maximum_longitude=-77.0,
+        )
+        self.assertFalse(under_test)
+        under_test = instance.is_overlapping_bounding_box(
+            minimum_latitude=10.0,
+            maximum_latitude=11.0,
+            minimum_longitude=10.0,
+            maximum_longitude=11.0,
         )
         self.assertFalse(under_test)
+        mock_static_sources.assert_called_once()
+
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    @patch("tools.representations.GtfsRealtimeSource.get_static_sources")
+    def test_get_static_join(self, mock_static_sources, mock_static_catalog):
+        test_static_source = MagicMock(
+            country_code="CA", subdivision_name="Ontario", features=["fares-v2"]
+        )
+        test_static_source.get_bounding_boxes.return_value = [(43.1, 43.3, -81.4, -81.2)]
+        test_another_static_source = MagicMock(
+            country_code="CA", subdivision_name="Quebec", features=None
+        )
+        test_another_static_source.get_bounding_boxes.return_value = [(45.0, 45.5, -73.0, -72.5)]
+        mock_static_sources.return_value = [test_static_source, test_another_static_source]
+        mock_static_catalog.generation = 0
+        instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_static_join()
+        self.assertEqual(under_test[COUNTRY_CODE], {"CA"})
+        self.assertEqual(under_test[SUBDIVISION_NAME], {"Ontario", "Quebec"})
+        self.assertEqual(under_test[FEATURES], {"fares-v2"})
+        self.assertEqual(
+            under_test[BOUNDING_BOXES],
+            [(43.1, 43.3, -81.4, -81.2), (45.0, 45.5, -73.0, -72.5)],
+        )
+        self.assertEqual(under_test[BOUNDING_BOX], (43.1, 45.5, -81.4, -72.5))
+        self.assertIs(instance.get_static_join(), under_test)
+        mock_static_sources.assert_called_once()
+
+        # A change of the static catalog invalidates the join
+        mock_static_catalog.generation = 1
+        mock_static_sources.return_value = [test_another_static_source]
+        under_test = instance.get_static_join()
+        self.assertEqual(under_test[SUBDIVISION_NAME], {"Quebec"})
+        self.assertEqual(under_test[BOUNDING_BOX], (45.0, 45.5, -73.0, -72.5))
+
+        # An update of the source invalidates the join
+        instance.update(static_reference=["some_static_reference"])
+        instance.get_static_join()
+        self.assertEqual(mock_static_sources.call_count, 3)
 
     @patch("tools.representations.GtfsRealtimeSource.static_catalog")
     def test_has_latest_dataset(self, mock_static_catalog):
@@ -853,6 +1724,40 @@ class TestGtfsRealtimeSource(TestCase):
         under_test = instance.has_status(status=test_another_status)
         self.assertFalse(under_test)
 
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    def test_get_bounding_boxes(self, mock_static_catalog):
+        test_static_source = MagicMock()
+        test_static_source.get_bounding_boxes.return_value = [(1.0, 2.0, 3.0, 4.0)]
+        test_another_static_source = MagicMock()
+        test_another_static_source.get_bounding_boxes.return_value = []
+        mock_static_catalog.get_source.side_effect = [
+            test_static_source,
+            test_another_static_source,
+        ]
+        instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_bounding_boxes()
+        self.assertEqual(under_test, [(1.0, 2.0, 3.0, 4.0)])
+
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    def test_get_index_values(self, mock_static_catalog):
+        test_static_source = MagicMock(
+            country_code="CA", subdivision_name="Ontario", features=["fares-v2"]
+        )
+        test_another_static_source = MagicMock(
+            country_code="US", subdivision_name="Ohio", features=None
+        )
+        mock_static_catalog.get_source.side_effect = [
+            test_static_source,
+            test_another_static_source,
+        ]
+        instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_index_values()
+        self.assertEqual(under_test[COUNTRY_CODE], {"CA", "US"})
+        self.assertEqual(under_test[SUBDIVISION_NAME], {"Ontario", "Ohio"})
+        self.assertEqual(under_test[FEATURES], {"fares-v2", self.test_feature})
+        self.assertEqual(under_test[STATUS], {self.test_status})
+        self.assertEqual(under_test[IS_OFFICIAL], {self.test_is_official})
+
     @patch("tools.representations.GtfsRealtimeSource.static_catalog")
     def test_has_is_official(self, mock_static_catalog):
         test_is_official = self.test_is_official
@@ -938,6 +1843,22 @@ class TestGtfsRealtimeSource(TestCase):
         under_test = GtfsRealtimeSource.build(**self.test_kwargs)
         self.assertIsNotNone(under_test)
 
+    @patch("tools.representations.GtfsRealtimeSource.static_catalog")
+    def test_get_export_values(self, mock_static_catalog):
+        instance = GtfsRealtimeSource(filename=self.test_filename, **deepcopy(self.test_schema))
+        under_test = instance.get_export_values()
+        self.assertEqual(under_test[ENTITY_TYPE], self.test_entity_type)
+        self.assertEqual(under_test[STATIC_REFERENCE], self.test_static_reference)
+        self.assertEqual(under_test[NOTE], self.test_note)
+        self.assertEqual(under_test[REDIRECTS_ID], "")
+        self.assertNotIn(LOCATION_COUNTRY_CODE, under_test)
+
+        del self.test_schema[STATIC_REFERENCE]
+        instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
+        under_test = instance.get_export_values()
+        self.assertIsNone(under_test[STATIC_REFERENCE])
+        self.assertEqual(under_test[LOCATION_COUNTRY_CODE], UNKNOWN)
+
     @patch("tools.representations.GtfsRealtimeSource.static_catalog")
     def test_schematize(self, mock_static_catalog):
         under_test = GtfsRealtimeSource.schematize(**self.test_kwargs)
@@ -976,13 +1897,17 @@ class TestGtfsRealtimeSource(TestCase):
         self.assertEqual(under_test, [])
 
     @patch("tools.representations.GtfsRealtimeSource.static_catalog")
-    @patch("tools.representations.GtfsRealtimeSource.__str__")
-    @patch("tools.representations.json.loads")
-    def test_as_json(self, mock_json, mock_str, mock_static_catalog):
-        test_json = {"some_json_key": "some_json_value"}
-        mock_json.return_value = test_json
+    @patch("tools.representations.GtfsRealtimeSource.schematize")
+    def test_as_json(self, mock_schema, mock_static_catalog):
+        test_json = {"some_json_key": ["some_json_value"]}
+        mock_schema.return_value = test_json
         instance = GtfsRealtimeSource(filename=self.test_filename, **self.test_schema)
         under_test = instance.as_json()
         self.assertEqual(under_test, test_json)
-        mock_json.assert_called_once()
-        mock_str.assert_called_once()
+        self.assertIs(instance.as_json(), under_test)
+        mock_schema.assert_called_once()
+        self.assertRaises(TypeError, under_test.__setitem__, "some_key", "some_value")
+
+        instance.update(note="some_updated_note")
+        self.assertIsNot(instance.as_json(), under_test)
+        self.assertEqual(mock_schema.call_count, 2)
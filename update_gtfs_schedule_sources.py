@@ -3,7 +3,12 @@ from datetime import datetime, timedelta
 import pandas as pd
 from zipfile import ZipFile
 from tools.operations import get_latest_datasets, update_gtfs_schedule_source
-from tools.helpers import download_dataset
+from tools.helpers import (
+    download_datasets,
+    get_dataset_cache,
+    load_download_validators,
+    save_download_validators,
+)
 from tools.constants import (
     GTFS,
     PATHWAYS_TXT,
@@ -26,6 +31,11 @@ from tools.constants import (
     FLEX_V1,
     FLEX_V2,
     INACTIVE,
+    DOWNLOAD_VALIDATORS_PATH_FROM_ROOT,
+)
+
+DOWNLOAD_VALIDATORS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), DOWNLOAD_VALIDATORS_PATH_FROM_ROOT
 )
 
 
@@ -61,8 +71,8 @@ def has_defined_values(zip_file, extension_file_name, columns):
     return result
 
 
-def has_recent_service_date(zip_file):
-    result = False
+def get_latest_service_date(zip_file):
+    result = None
     if has_extension_file(zip_file=zip_file, extension_file_name=CALENDAR_TXT):
         dataframe = pd.read_csv(zip_file.open(CALENDAR_TXT))
         if END_DATE in dataframe:
@@ -70,73 +80,113 @@ def has_recent_service_date(zip_file):
             dataframe[END_DATE] = pd.to_datetime(
                 dataframe[END_DATE], format=GTFS_DATE_FORMAT, errors="coerce"
             )
-            result = (
-                dataframe[END_DATE]
-                .loc[
-                    dataframe[END_DATE]
-                    > (datetime.now() - timedelta(weeks=SIX_MONTHS_IN_WEEKS))
-                ]
-                .any()
-            )
+            latest_service_date = dataframe[END_DATE].max()
+            result = None if pd.isna(latest_service_date) else latest_service_date.to_pydatetime()
     return result
 
 
+def is_recent_service_date(service_date):
+    return service_date is not None and service_date > (
+        datetime.now() - timedelta(weeks=SIX_MONTHS_IN_WEEKS)
+    )
+
+
+def has_recent_service_date(zip_file):
+    return is_recent_service_date(get_latest_service_date(zip_file))
+
+
 def has_extension_file(zip_file, extension_file_name):
     return extension_file_name in zip_file.namelist()
 
 
-if __name__ == "__main__":
-    latest_datasets = get_latest_datasets(GTFS)
+def analyze_dataset(mdb_source_id, dataset_path, validator, dataset_cache):
+    dataset_zip = ZipFile(dataset_path)
+
+    dataset_features = []
+    if has_at_least_2_rows(zip_file=dataset_zip, extension_file_name=PATHWAYS_TXT):
+        dataset_features.append(PATHWAYS)
+    if has_at_least_2_rows(
+        zip_file=dataset_zip, extension_file_name=FARES_ATTRIBUTES_TXT
+    ):
+        dataset_features.append(FARES_V1)
+    if has_at_least_2_rows(
+        zip_file=dataset_zip, extension_file_name=FARES_PRODUCTS_TXT
+    ):
+        dataset_features.append(FARES_V2)
+    if has_extension_file(
+        zip_file=dataset_zip, extension_file_name=AREAS_TXT
+    ) and has_defined_values(
+        zip_file=dataset_zip,
+        extension_file_name=STOP_TIMES_TXT,
+        columns=[START_SERVICE_AREA_ID, START_SERVICE_AREA_RADIUS],
+    ):
+        dataset_features.append(FLEX_V1)
+    if (
+        has_at_least_2_rows(
+            zip_file=dataset_zip, extension_file_name=LOCATION_GROUPS_TXT
+        )
+        or has_at_least_2_rows(
+            zip_file=dataset_zip, extension_file_name=LOCATIONS_GEOJSON
+        )
+        or has_at_least_4_rows(
+            zip_file=dataset_zip, extension_file_name=BOOKINGS_RULES_TXT
+        )
+    ):
+        dataset_features.append(FLEX_V2)
+    # If no feature is found, we assign None so we don't update the source features.
+    if len(dataset_features) == 0:
+        dataset_features = None
+
+    # The latest service date is kept to update the status while the dataset is unchanged
+    latest_service_date = get_latest_service_date(zip_file=dataset_zip)
+    validator[END_DATE] = (
+        latest_service_date.strftime(GTFS_DATE_FORMAT)
+        if latest_service_date is not None
+        else None
+    )
+    dataset_status = None
+    if not is_recent_service_date(latest_service_date):
+        dataset_status = INACTIVE
+
+    # Release the downloaded dataset because we don't need it anymore
+    dataset_cache.release(dataset_path)
+
+    # Update the source
+    update_gtfs_schedule_source(
+        mdb_source_id=mdb_source_id,
+        features=dataset_features,
+        status=dataset_status,
+    )
 
-    for mdb_source_id, latest_url in latest_datasets.items():
-        dataset_path = download_dataset(latest_url, None, None, None)
-        dataset_zip = ZipFile(dataset_path)
 
-        dataset_features = []
-        if has_at_least_2_rows(zip_file=dataset_zip, extension_file_name=PATHWAYS_TXT):
-            dataset_features.append(PATHWAYS)
-        if has_at_least_2_rows(
-            zip_file=dataset_zip, extension_file_name=FARES_ATTRIBUTES_TXT
-        ):
-            dataset_features.append(FARES_V1)
-        if has_at_least_2_rows(
-            zip_file=dataset_zip, extension_file_name=FARES_PRODUCTS_TXT
-        ):
-            dataset_features.append(FARES_V2)
-        if has_extension_file(
-            zip_file=dataset_zip, extension_file_name=AREAS_TXT
-        ) and has_defined_values(
-            zip_file=dataset_zip,
-            extension_file_name=STOP_TIMES_TXT,
-            columns=[START_SERVICE_AREA_ID, START_SERVICE_AREA_RADIUS],
-        ):
-            dataset_features.append(FLEX_V1)
-        if (
-            has_at_least_2_rows(
-                zip_file=dataset_zip, extension_file_name=LOCATION_GROUPS_TXT
-            )
-            or has_at_least_2_rows(
-                zip_file=dataset_zip, extension_file_name=LOCATIONS_GEOJSON
-            )
-            or has_at_least_4_rows(
-                zip_file=dataset_zip, extension_file_name=BOOKINGS_RULES_TXT
-            )
+if __name__ == "__main__":
+    latest_datasets = get_latest_datasets(GTFS)
+    # Only the validators of the datasets analyzed by a previous run are kept, with their latest service date
+    validators = {
+        url: validator
+        for url, validator in load_download_validators(DOWNLOAD_VALIDATORS_PATH).items()
+        if END_DATE in validator
+    }
+    dataset_cache = get_dataset_cache()
+
+    # The datasets are analyzed as soon as they are downloaded, while the next ones download
+    try:
+        for mdb_source_id, dataset_path in download_datasets(
+            latest_datasets, validators=validators, cache=dataset_cache
         ):
-            dataset_features.append(FLEX_V2)
-        # If no feature is found, we assign None so we don't update the source features.
-        if len(dataset_features) == 0:
-            dataset_features = None
-
-        dataset_status = None
-        if not has_recent_service_date(zip_file=dataset_zip):
-            dataset_status = INACTIVE
-
-        # Delete the downloaded dataset because we don't need it anymore
-        os.remove(dataset_path)
-
-        # Update the source
-        update_gtfs_schedule_source(
-            mdb_source_id=mdb_source_id,
-            features=dataset_features,
-            status=dataset_status,
-        )
+            validator = validators.get(latest_datasets[mdb_source_id], {})
+            # The datasets unchanged since their last analysis, or which failed to download, are not analyzed
+            # again, but they become inactive once their latest service date is old enough
+            if dataset_path is None:
+                if END_DATE in validator:
+                    latest_service_date = validator[END_DATE]
+                    if not is_recent_service_date(
+                        datetime.strptime(latest_service_date, GTFS_DATE_FORMAT)
+                        if latest_service_date is not None
+                        else None
+                    ):
+                        update_gtfs_schedule_source(mdb_source_id=mdb_source_id, features=None, status=INACTIVE)
+                continue
+            analyze_dataset(mdb_source_id, dataset_path, validator, dataset_cache)
+    finally:
+        save_download_validators(DOWNLOAD_VALIDATORS_PATH, validators)